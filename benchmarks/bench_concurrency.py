@@ -0,0 +1,54 @@
+"""
+Compare how the threaded sync workers and the ASGI app scale with the
+number of concurrent clients, on the read endpoints that have async views.
+
+    python benchmarks/bench_concurrency.py --rows 100000
+    python benchmarks/bench_concurrency.py --rows 100000 --workers 2 --concurrency 1,16,256
+
+Both servers get the same number of gunicorn workers. The sync one runs
+--threads threads per worker (gunicorn.conf.py sets as many as workers),
+the ASGI one a single event loop per worker.
+"""
+
+import argparse
+from types import SimpleNamespace
+
+from endpoints import endpoints
+from load import percentile, run_endpoint, start_server
+
+READ_ENDPOINTS = ("list-tests", "get-test", "list-executions", "list-executions-failed", "asset-status")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="executions in the seeded database")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4, help="threads per sync worker")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="comma separated client counts")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per endpoint and client count")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache on")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    selected = [endpoint for endpoint in endpoints(args.rows) if endpoint[0] in READ_ENDPOINTS]
+
+    print(f"{'mode':<6}{'endpoint':<24}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for asgi in (False, True):
+        mode = "asgi" if asgi else "sync"
+        server, url = start_server(SimpleNamespace(**vars(args), asgi=asgi))
+        try:
+            for endpoint in selected:
+                for level in levels:
+                    latencies, errors, elapsed = run_endpoint(url, endpoint, args.duration, level)
+                    print(
+                        f"{mode:<6}{endpoint[0]:<24}{level:>8}{len(latencies) / elapsed:>10.0f}"
+                        f"{percentile(latencies, 0.50) * 1000:>10.2f}{percentile(latencies, 0.99) * 1000:>10.2f}"
+                        f"{errors:>8}"
+                    )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
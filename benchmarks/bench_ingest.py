@@ -0,0 +1,54 @@
+"""
+Compare execution ingestion throughput of POST /executions (one row per
+request) against POST /executions/batch.
+
+    python benchmarks/bench_ingest.py --rows 2000
+
+A throwaway SQLite database is used, the bundled testdb.db is untouched.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_FILENAME"] = os.path.join(workdir, "bench.db")
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+    from flaskapp import create_app
+    from flaskapp.database.models import Asset, TestCase
+
+    app = create_app()
+    with app.app_context():
+        Asset("Bench Asset").insert()
+        TestCase("Bench Test Case", None).insert()
+
+    client = app.test_client()
+    payload = {"asset_id": 1, "test_case_id": 1, "status": True, "details": "Success"}
+
+    start = time.perf_counter()
+    for _ in range(args.rows):
+        client.post("/executions?with_total=false", json=payload)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = client.post("/executions/batch?with_total=false", json=[payload] * args.rows)
+    batch = time.perf_counter() - start
+    assert response.get_json()["inserted"] == args.rows
+
+    print(f"single-row: {args.rows / single:10.0f} rows/s ({single:.2f}s)")
+    print(f"batch:      {args.rows / batch:10.0f} rows/s ({batch:.2f}s)")
+    print(f"speedup:    {single / batch:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
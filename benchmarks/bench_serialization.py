@@ -0,0 +1,74 @@
+"""
+Compare the old list serialization path (format() dicts + stdlib jsonify)
+with the compiled serializers and the orjson provider.
+
+    python benchmarks/bench_serialization.py --rows 10000
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from flask import Flask  # noqa: E402
+
+from flaskapp.database.models import Execution, TestCase  # noqa: E402
+from flaskapp.serialization import JSONProvider, OrjsonProvider, model_serializer, orjson  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    test_cases = []
+    for i in range(args.rows):
+        test_case = TestCase(f"Test case {i}", "A description of the test case " * 5)
+        test_case.id = i
+        test_cases.append(test_case)
+    history = [
+        SimpleNamespace(
+            id=i,
+            status=bool(i % 2),
+            details="Success",
+            timestamp=datetime(2024, 3, 2, 17, 35, 30),
+            test_case_id=i,
+            test_case_name=f"Test case {i}",
+        )
+        for i in range(args.rows)
+    ]
+
+    app = Flask(__name__)
+    providers = {"stdlib": JSONProvider(app)}
+    if orjson is not None:
+        providers["orjson"] = OrjsonProvider(app)
+        iso_app = Flask(__name__)
+        iso_app.config["JSON_DATETIME_FORMAT"] = "iso"
+        providers["orjson iso"] = OrjsonProvider(iso_app)
+
+    serialize = model_serializer(TestCase)
+    cases = {
+        "tests: format() + stdlib": lambda: providers["stdlib"].response([t.format() for t in test_cases]),
+        "tests: serializer + stdlib": lambda: providers["stdlib"].response([serialize(t) for t in test_cases]),
+        "history: stdlib": lambda: providers["stdlib"].response([Execution.format_history(r) for r in history]),
+    }
+    if "orjson" in providers:
+        cases["tests: serializer + orjson"] = lambda: providers["orjson"].response([serialize(t) for t in test_cases])
+        cases["history: orjson"] = lambda: providers["orjson"].response([Execution.format_history(r) for r in history])
+        cases["history: orjson iso dates"] = lambda: providers["orjson iso"].response(
+            [Execution.format_history(r) for r in history]
+        )
+
+    with app.app_context():
+        for name, case in cases.items():
+            best = min(timeit.repeat(case, number=1, repeat=args.repeat))
+            print(f"{name:<30} {best * 1000:8.1f} ms  {args.rows / best:12.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Measure what starting a worker costs: importing the app, create_app() with
+DATABASE_SCHEMA_INIT = "create_all" and "none", and the time a gunicorn
+worker takes from fork to ready. Workers are forked from the app the master
+preloaded and recycled after --max-requests requests, so their replacements
+are timed as well.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --workers 4 --requests 400
+
+Every measurement runs in fresh processes on the seeded benchmark database,
+which already has its whole schema. Medians are reported.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from endpoints import ROOT, seeded_database
+from load import connect, free_port, request
+
+# Importing the package builds the app, a second create_app() in the same
+# process tells how much of that was the app rather than the imports.
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import flaskapp
+imported = time.perf_counter()
+flaskapp.create_app()
+print(json.dumps({"import": imported - start, "create_app": time.perf_counter() - imported}))
+"""
+READY = re.compile(r"Worker \d+ ready in (\d+) ms")
+
+
+def environment(database, **extra):
+    return {
+        **os.environ,
+        "RUNNING_IN_PRODUCTION": "1",
+        "DATABASE_FILENAME": str(database),
+        "PYTHONPATH": str(ROOT / "src"),
+        **extra,
+    }
+
+
+def median_ms(values):
+    return statistics.median(values) * 1000
+
+
+def time_python(runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        timings.append(time.perf_counter() - start)
+    return median_ms(timings)
+
+
+def time_create_app(database, mode, runs):
+    env = environment(database, DATABASE_SCHEMA_INIT=mode)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", CHILD], env=env, check=True, capture_output=True, text=True)
+        timings.append({"process": time.perf_counter() - start, **json.loads(output.stdout)})
+    return {key: median_ms([timing[key] for timing in timings]) for key in timings[0]}
+
+
+def time_gunicorn(database, args):
+    """
+    time_gunicorn(database, args)
+    starts gunicorn, sends --requests requests so workers get recycled and
+    returns the time to the first response with the fork to ready time of
+    every worker, as logged by gunicorn.conf.py
+    """
+    port = free_port()
+    command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--workers", str(args.workers)]
+    command += ["--max-requests", str(args.max_requests), "--max-requests-jitter", "0"]
+    command += ["--bind", f"127.0.0.1:{port}", "--log-level", "info", "flaskapp:create_app()"]
+    env = environment(database, RESPONSE_CACHE_ENABLED="false")
+    start = time.perf_counter()
+    server = subprocess.Popen(command, cwd=ROOT / "src", env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    try:
+        url = f"http://127.0.0.1:{port}"
+        while True:
+            try:
+                if request(connect(url), "GET", "/", None)[0] == 200:
+                    break
+            except OSError:
+                if time.perf_counter() - start > 30:
+                    raise SystemExit("gunicorn did not start.")
+                time.sleep(0.01)
+        first_response = time.perf_counter() - start
+        for _ in range(args.requests):
+            # A new connection per request spreads them over the workers.
+            request(connect(url), "GET", "/", None)
+    finally:
+        server.terminate()
+        log = server.communicate(timeout=30)[0].decode()
+    ready = [int(ms) for ms in READY.findall(log)]
+    return first_response * 1000, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-requests", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    database = seeded_database(args.rows)
+    print(f"python startup: {time_python(args.runs):.0f} ms")
+    for mode in ("create_all", "none"):
+        timing = time_create_app(database, mode, args.runs)
+        print(
+            f"DATABASE_SCHEMA_INIT={mode}: process {timing['process']:.0f} ms, "
+            f"import flaskapp {timing['import']:.0f} ms, create_app() {timing['create_app']:.1f} ms"
+        )
+    first_response, ready = time_gunicorn(database, args)
+    print(
+        f"gunicorn: first response {first_response:.0f} ms, "
+        f"{len(ready)} workers ready in {statistics.median(ready):.0f} ms (median), {max(ready)} ms (max)"
+    )
+
+
+if __name__ == "__main__":
+    main()
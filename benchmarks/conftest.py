@@ -0,0 +1,21 @@
+import pytest
+from endpoints import endpoints, seeded_database
+
+
+def pytest_addoption(parser):
+    parser.addoption("--rows", type=int, default=1000, help="Executions in the benchmark database.")
+
+
+@pytest.fixture(scope="session")
+def bench_app(request):
+    from flaskapp import create_app
+
+    path = seeded_database(request.config.getoption("--rows"))
+    # Measure the database work, not cache hits.
+    return create_app({"DATABASE_URI": f"sqlite:///{path}", "RESPONSE_CACHE_ENABLED": False})
+
+
+def pytest_generate_tests(metafunc):
+    if "endpoint" in metafunc.fixturenames:
+        cases = endpoints(metafunc.config.getoption("--rows"))
+        metafunc.parametrize("endpoint", cases, ids=[case[0] for case in cases])
@@ -0,0 +1,108 @@
+"""
+Endpoints and synthetic databases shared by the benchmark suite.
+
+Databases are seeded once per size with `flask seed` logic and kept under
+benchmarks/.data, seeding 10M executions takes several minutes.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(os.environ.get("BENCH_DATA_DIR", ROOT / "benchmarks" / ".data"))
+
+sys.path.insert(0, str(ROOT / "src"))
+
+EXECUTION = {"asset_id": 1, "test_case_id": 1, "status": True, "details": "Success"}
+BATCH_SIZE = 100
+CREATED_BATCH = "{created_batch}"
+# Served only with EXECUTION_INGEST_MODE=queued.
+QUEUED_ENDPOINTS = ("add-execution-queued", "execution-ticket")
+
+# name, method, path, JSON body. {created} is a test case made for the request
+# and a CREATED_BATCH body {"id": ...} items for BATCH_SIZE of them, {cursor} and {page}
+# point to the middle of the test case list, {ticket} is a queued execution.
+ENDPOINTS = [
+    ("index", "GET", "/", None),
+    ("list-tests", "GET", "/tests?per_page=50", None),
+    ("list-tests-cursor", "GET", "/tests?per_page=50&cursor={cursor}", None),
+    ("list-tests-deep-page", "GET", "/tests?per_page=50&page={page}", None),
+    ("list-tests-fields", "GET", "/tests?per_page=50&fields=id,name", None),
+    ("get-test", "GET", "/tests/1", None),
+    ("list-executions", "GET", "/executions/1?per_page=50", None),
+    ("list-executions-failed", "GET", "/executions/1?per_page=50&status=false&order=desc", None),
+    ("stream-executions", "GET", "/executions/1?stream=1", None),
+    ("asset-status", "GET", "/assets/1/status?per_page=50", None),
+    ("asset-stats", "GET", "/stats/assets/1", None),
+    ("asset-stats-history", "GET", "/stats/assets/1/history?bucket=week", None),
+    ("test-stats", "GET", "/stats/tests/1", None),
+    ("test-stats-history", "GET", "/stats/tests/1/history", None),
+    ("export-executions", "GET", "/export/executions?asset_id=1", None),
+    ("search-tests", "GET", "/search?q=generated&per_page=50", None),
+    ("search-executions", "GET", "/search?q=timed+device&type=executions&per_page=50", None),
+    ("execution-ticket", "GET", "/executions/tickets/{ticket}", None),
+    ("metrics", "GET", "/metrics", None),
+    ("create-test", "POST", "/tests?with_total=false", {"name": "Benchmark Test", "description": "Load"}),
+    ("update-test", "PATCH", "/tests/1?with_total=false", {"name": "First Test", "description": "Updated"}),
+    ("delete-test", "DELETE", "/tests/{created}?with_total=false", None),
+    ("add-execution", "POST", "/executions?with_total=false", EXECUTION),
+    ("add-executions-batch", "POST", "/executions/batch?with_total=false", [EXECUTION] * BATCH_SIZE),
+    ("add-execution-queued", "POST", "/executions?with_total=false", EXECUTION),
+    (
+        "upsert-tests-batch",
+        "POST",
+        "/tests/batch?with_total=false",
+        [{"name": f"Benchmark Test {number}", "description": "Load"} for number in range(BATCH_SIZE)],
+    ),
+    (
+        "update-tests-batch",
+        "PATCH",
+        "/tests/batch?with_total=false",
+        [{"id": test_case_id, "description": "Updated"} for test_case_id in range(1, BATCH_SIZE + 1)],
+    ),
+    ("delete-tests-batch", "DELETE", "/tests/batch?with_total=false", CREATED_BATCH),
+]
+
+
+def seed_sizes(rows):
+    """Executions, test cases and assets of a benchmark database."""
+    return {"executions": rows, "test_cases": max(rows // 1000, 100), "assets": max(rows // 10000, 3)}
+
+
+def endpoints(rows):
+    """ENDPOINTS with the list positions filled in for a database size."""
+    test_cases = seed_sizes(rows)["test_cases"]
+    positions = {
+        "cursor": test_cases // 2,
+        "page": max(test_cases // 100, 1),
+        "created": "{created}",
+        "ticket": "{ticket}",
+    }
+    return [(name, method, path.format(**positions), body) for name, method, path, body in ENDPOINTS]
+
+
+def seeded_database(rows):
+    """
+    Path of a database holding `rows` synthetic executions, seeding it on
+    first use.
+    """
+    path = DATA_DIR / f"seed-{rows}.db"
+    if path.exists():
+        return path
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    partial.unlink(missing_ok=True)
+
+    from flaskapp import create_app
+    from flaskapp.database.models import db
+    from flaskapp.seed import seed_database
+
+    app = create_app({"DATABASE_URI": f"sqlite:///{partial}", "DATABASE_READER_ENABLED": False})
+    with app.app_context():
+        sizes = seed_sizes(rows)
+        seed_database(sizes["test_cases"], sizes["assets"], sizes["executions"], seed=rows)
+        db.engine.dispose()
+    partial.rename(path)
+    return path
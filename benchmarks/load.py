@@ -0,0 +1,225 @@
+"""
+wrk-style load runner: starts gunicorn on a seeded database (or targets a
+running server with --url), hammers every endpoint for --duration seconds
+from --concurrency keep-alive connections and reports p50/p99 latency and
+throughput.
+
+    python benchmarks/load.py --rows 100000
+    python benchmarks/load.py --rows 10000000 --workers 8 --concurrency 64 -k stats
+    python benchmarks/load.py --url http://127.0.0.1:5000 --rows 1000
+    python benchmarks/load.py --rows 100000 --asgi
+    python benchmarks/load.py --rows 100000 --queued
+
+The client is pure Python. Past a few thousand requests per second, point
+wrk or another native tool at the server this script starts (--keep-running).
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from endpoints import BATCH_SIZE, CREATED_BATCH, EXECUTION, QUEUED_ENDPOINTS, ROOT, endpoints, seeded_database
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(args, port):
+    """
+    server_command(args, port)
+    gunicorn with threaded sync workers, or uvicorn workers serving the
+    ASGI app with --asgi
+    """
+    command = [sys.executable, "-m", "gunicorn", "--workers", str(args.workers)]
+    if args.asgi:
+        command += ["-c", "gunicorn.asgi.conf.py"]
+    else:
+        command += ["-c", "gunicorn.conf.py", "--threads", str(args.threads)]
+    command += ["--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+    command.append("flaskapp.asgi:app" if args.asgi else "flaskapp:create_app()")
+    return command
+
+
+def start_server(args):
+    port = free_port()
+    database = seeded_database(args.rows)
+    env = {
+        **os.environ,
+        "RUNNING_IN_PRODUCTION": "1",
+        "DATABASE_FILENAME": str(database),
+        "RESPONSE_CACHE_ENABLED": "true" if args.cache else "false",
+        "EXECUTION_INGEST_MODE": "queued" if getattr(args, "queued", False) else "sync",
+        "METRICS_DIR": tempfile.mkdtemp(prefix="flaskapp-metrics-"),
+    }
+    command = server_command(args, port)
+    server = subprocess.Popen(command, cwd=ROOT / "src", env=env)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            status, _ = request(connect(url), "GET", "/", None)
+            if status == 200:
+                return server, url
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("gunicorn did not start.")
+
+
+def connect(url):
+    parts = urlsplit(url)
+    return http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+
+
+def request(connection, method, path, body):
+    headers = {"Accept-Encoding": "identity"}
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode()
+        headers["Content-Type"] = "application/json"
+    connection.request(method, path, body=data, headers=headers)
+    response = connection.getresponse()
+    payload = response.read()
+    return response.status, payload
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def create_test_cases(url, count):
+    connection = connect(url)
+    ids = []
+    for _ in range(count):
+        _, payload = request(connection, "POST", "/tests?with_total=false", {"name": "Disposable"})
+        ids.append(json.loads(payload)["test_case"]["id"])
+    return iter(ids)
+
+
+def create_test_case_batches(url, count):
+    connection = connect(url)
+    batches = []
+    for number in range(count):
+        items = [{"name": f"Disposable {number * BATCH_SIZE + offset}"} for offset in range(BATCH_SIZE)]
+        _, payload = request(connection, "POST", "/tests/batch?with_total=false", items)
+        batches.append([{"id": result["id"]} for result in json.loads(payload)["results"]])
+    return iter(batches)
+
+
+def run_endpoint(url, endpoint, duration, concurrency):
+    """
+    Sends requests from `concurrency` threads for `duration` seconds and
+    returns (latencies, errors, elapsed).
+    """
+    _, method, path, body = endpoint
+    created = None
+    if "{created}" in path:
+        created = create_test_cases(url, concurrency * 200)
+    elif body == CREATED_BATCH:
+        created = create_test_case_batches(url, concurrency * 20)
+    if "{ticket}" in path:
+        _, payload = request(connect(url), "POST", "/executions", EXECUTION)
+        path = path.format(ticket=json.loads(payload)["ticket"])
+    created_lock = threading.Lock()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        connection = connect(url)
+        own_latencies = []
+        own_errors = 0
+        while time.monotonic() < deadline:
+            target, payload = path, body
+            if created is not None:
+                with created_lock:
+                    disposable = next(created, None)
+                if disposable is None:
+                    break
+                if body == CREATED_BATCH:
+                    payload = disposable
+                else:
+                    target = path.format(created=disposable)
+            start = time.perf_counter()
+            try:
+                status, _ = request(connection, method, target, payload)
+            except (OSError, http.client.HTTPException):
+                own_errors += 1
+                connection = connect(url)
+                continue
+            own_latencies.append(time.perf_counter() - start)
+            if not 200 <= status < 300:
+                own_errors += 1
+        with lock:
+            latencies.extend(own_latencies)
+            errors[0] += own_errors
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), errors[0], time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="executions in the seeded database")
+    parser.add_argument("--url", help="benchmark a running server instead of starting gunicorn")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per endpoint")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache on")
+    parser.add_argument("--asgi", action="store_true", help="serve flaskapp.asgi:app with uvicorn workers")
+    parser.add_argument("--queued", action="store_true", help="queue executions, run only the queued endpoints")
+    parser.add_argument("-k", dest="keyword", help="only endpoints whose name contains this")
+    parser.add_argument("--keep-running", action="store_true", help="leave gunicorn up after the run")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server(args)
+
+    try:
+        print(f"{'endpoint':<26}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for endpoint in endpoints(args.rows):
+            if args.keyword and args.keyword not in endpoint[0]:
+                continue
+            if (endpoint[0] in QUEUED_ENDPOINTS) != args.queued:
+                continue
+            latencies, errors, elapsed = run_endpoint(url, endpoint, args.duration, args.concurrency)
+            print(
+                f"{endpoint[0]:<26}{len(latencies):>10}{errors:>8}{len(latencies) / elapsed:>10.0f}"
+                f"{percentile(latencies, 0.50) * 1000:>10.2f}{percentile(latencies, 0.99) * 1000:>10.2f}"
+            )
+        if args.keep_running and server is not None:
+            print(f"gunicorn is still serving {url}, Ctrl+C to stop.")
+            server.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Per-endpoint latency with pytest-benchmark, in process through the Flask
+test client, against a seeded database of --rows executions.
+
+    python -m pytest --no-cov benchmarks --rows 100000
+    python -m pytest --no-cov benchmarks --rows 10000000 -k "list or stats"
+
+Every request runs in a transaction that is rolled back, so write
+endpoints do not grow the database between rounds.
+"""
+
+import itertools
+
+import pytest
+from endpoints import BATCH_SIZE, CREATED_BATCH, EXECUTION, QUEUED_ENDPOINTS
+
+pytest.importorskip("pytest_benchmark")
+
+disposable_numbers = itertools.count()
+
+
+@pytest.fixture
+def client(bench_app):
+    from flaskapp.database.models import db
+
+    with bench_app.app_context():
+        engine = db.engines[None]
+        connection = engine.connect()
+        transaction = connection.begin()
+        db.engines[None] = connection
+        try:
+            yield bench_app.test_client()
+        finally:
+            transaction.rollback()
+            connection.close()
+            db.engines[None] = engine
+
+
+def create_batch(client):
+    items = [{"name": f"Disposable {next(disposable_numbers)}"} for _ in range(BATCH_SIZE)]
+    results = client.post("/tests/batch?with_total=false", json=items).get_json()["results"]
+    return [{"id": result["id"]} for result in results]
+
+
+def test_endpoint(benchmark, bench_app, client, endpoint, monkeypatch):
+    name, method, path, body = endpoint
+    if name in QUEUED_ENDPOINTS:
+        # No writer drains the spool here, it only grows within the transaction.
+        monkeypatch.setitem(bench_app.config, "EXECUTION_INGEST_MODE", "queued")
+        monkeypatch.setitem(bench_app.config, "INGEST_QUEUE_MAX_PENDING", 10**9)
+    if "{ticket}" in path:
+        path = path.format(ticket=client.post("/executions", json=EXECUTION).get_json()["ticket"])
+
+    if "{created}" in path:
+
+        def setup():
+            test_case = client.post("/tests?with_total=false", json={"name": "Disposable"}).get_json()
+            return (path.format(created=test_case["test_case"]["id"]),), {}
+
+        response = benchmark.pedantic(lambda url: client.open(url, method=method), setup=setup, rounds=200)
+    elif body == CREATED_BATCH:
+
+        def setup():
+            return (create_batch(client),), {}
+
+        response = benchmark.pedantic(lambda ids: client.open(path, method=method, json=ids), setup=setup, rounds=50)
+    else:
+        # Buffered, so streamed responses are timed until their last byte.
+        response = benchmark(client.open, path, method=method, json=body, buffered=True)
+
+    assert 200 <= response.status_code < 300, response.get_data(as_text=True)
+    if body == CREATED_BATCH:
+        assert response.get_json()["failed"] == 0
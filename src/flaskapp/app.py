@@ -1,27 +1,130 @@
 import logging
 import os
+from functools import partial
 
 from flask import Flask, abort, jsonify, request
+from sqlalchemy import func, select
+from werkzeug.exceptions import ServiceUnavailable
 
+from flaskapp.cache import cached, cached_row, init_response_cache
+from flaskapp.catalog import delete_test_cases, update_test_cases, upsert_test_cases
+from flaskapp.commands import register_commands
+from flaskapp.compression import init_compression
 from flaskapp.database.models import (
     Asset,
     Execution,
+    ExecutionRollup,
+    ExecutionSpool,
+    LatestExecution,
     TestCase,
+    count_rows,
+    db,
     setup_db,
 )
+from flaskapp.export import export_format, export_query, export_response
+from flaskapp.filters import asset_criteria, execution_criteria, execution_order
+from flaskapp.ingest import MAX_DETAILS_LENGTH, ingest_executions, parse_batch, parse_id
+from flaskapp.metrics import init_metrics
+from flaskapp.pagination import paginate, paginate_ranked
+from flaskapp.partitions import partition_criteria
+from flaskapp.search import execution_search, search_options, search_terms, test_case_search
+from flaskapp.serialization import json_provider, model_serializer, requested_fields
+from flaskapp.spool import SpoolFull, enqueue_execution, init_spool
+from flaskapp.stats import BUCKET_FORMATS, day_range, rollup_buckets, rollup_totals
+from flaskapp.streaming import stream_ndjson, wants_stream
 
-PAGINATION_PER_PAGE = 2
 
+def wants_total(flask_request):
+    """
+    wants_total(flask_request)
+    clients can skip the total counts with ?with_total=false
+    """
+    return flask_request.args.get("with_total", "true").lower() not in ("false", "0", "no")
 
-def paginate_results(flask_request, selection):
-    page = flask_request.args.get("page", 1, type=int)
-    start = (page - 1) * PAGINATION_PER_PAGE
-    end = start + PAGINATION_PER_PAGE
 
-    results = [result.format() for result in selection]
-    paginated_results = results[start:end]
+def sparse_fields(flask_request, allowed):
+    """
+    sparse_fields(flask_request, allowed)
+    the fields asked for with ?fields=, None for all of them, 400 for a
+    field outside allowed
+    """
+    try:
+        return requested_fields(flask_request, allowed)
+    except ValueError as e:
+        abort(400, str(e))
 
-    return paginated_results
+
+TEST_CASE_FIELDS = ("id", "name", "description")
+
+
+# ----------------------------------------------------------------------------#
+# Read views, shared with the async views of flaskapp.asgi: they build the
+# same statements and response bodies, only the session running them differs.
+# ----------------------------------------------------------------------------#
+
+
+def require(row, name):
+    """
+    require(row, name)
+    the row, 404 naming the requested test case or asset when it is missing
+    """
+    if not row:
+        abort(404, f"The requested {name} was not found in the database.")
+    return row
+
+
+def test_case_query(fields=None):
+    """
+    test_case_query(fields=None)
+    selects the test case columns, only the ?fields= ones and the id the
+    list is paginated by, as rows model_serializer() formats like models
+    """
+    return select(*(getattr(TestCase, field) for field in dict.fromkeys(("id",) + (fields or TEST_CASE_FIELDS))))
+
+
+def execution_count_query(asset_id, criteria):
+    return select(func.count()).select_from(Execution).where(Execution.asset_id == asset_id, *criteria)
+
+
+def test_cases_response(page, fields):
+    """
+    test_cases_response(page, fields)
+    the body of a test case list page, 404 when the page is empty. The
+    views add total_test_cases, counted on their own session.
+    """
+    serialize = model_serializer(TestCase, fields)
+    test_cases = [serialize(row) for row in page.items]
+    if len(test_cases) == 0:
+        abort(404, "No data found in the database.")
+
+    return {"success": True, "test_cases": test_cases, "next_cursor": page.next_cursor}
+
+
+def test_case_response(row, fields):
+    require(row, "test case")
+    return {"success": True, "test_case": model_serializer(TestCase, fields)(row)}
+
+
+def executions_response(asset, page, fields):
+    """
+    executions_response(asset, page, fields)
+    the body of an execution history page, 404 when the page is empty. The
+    views add total_executions from execution_count_query().
+    """
+    executions = [Execution.format_history(row, fields) for row in page.items]
+    if len(executions) == 0:
+        abort(404, "No data found in the database.")
+
+    return {"success": True, "executions": executions, "asset": asset, "next_cursor": page.next_cursor}
+
+
+def asset_status_response(asset, page, fields):
+    return {
+        "success": True,
+        "asset": asset,
+        "test_cases": [LatestExecution.format_status(row, fields) for row in page.items],
+        "next_cursor": page.next_cursor,
+    }
 
 
 def create_app(test_config=None):
@@ -33,15 +136,24 @@ def create_app(test_config=None):
     if not is_prod_env:
         logging.info("Loading config.development.")
         app.config.from_object("flaskapp.config.development")
-        setup_db(app)
-
-        # db_drop_and_create_all(app)
     else:
         logging.info("Loading config.production.")
         app.config.from_object("flaskapp.config.production")
-        setup_db(app)
 
-        # db_drop_and_create_all(app)
+    if test_config is not None:
+        app.config.from_mapping(test_config)
+
+    app.json = json_provider(app)
+
+    setup_db(app)
+
+    # db_drop_and_create_all(app)
+
+    register_commands(app)
+    init_response_cache(app)
+    init_compression(app)
+    init_metrics(app)
+    init_spool(app)
 
     # ----------------------------------------------------------------------------#
     # Routes.
@@ -58,20 +170,15 @@ def create_app(test_config=None):
     # ----------------------------------------------------------------------------#
 
     @app.route("/tests", methods=["GET"])
+    @cached(TestCase.__tablename__)
     def get_tests():
-        selection = TestCase.query.order_by(TestCase.id).all()
-        current_test_cases = paginate_results(request, selection)
+        fields = sparse_fields(request, TEST_CASE_FIELDS)
+        page = paginate(request, test_case_query(fields), TestCase.id, scalars=False)
+        response = test_cases_response(page, fields)
+        if wants_total(request):
+            response["total_test_cases"] = count_rows(TestCase)
 
-        if len(current_test_cases) == 0:
-            abort(404, "No data found in the database.")
-
-        return jsonify(
-            {
-                "success": True,
-                "test_cases": current_test_cases,
-                "total_test_cases": len(TestCase.query.all()),
-            }
-        )
+        return jsonify(response)
 
     @app.route("/tests", methods=["POST"])
     def create_test():
@@ -84,24 +191,20 @@ def create_app(test_config=None):
             test_case = TestCase(name=req_name, description=req_description)
             test_case.insert()
 
-            return jsonify(
-                {
-                    "success": True,
-                    "test_case": test_case.format(),
-                    "total_test_cases": len(TestCase.query.all()),
-                }
-            )
+            response = {"success": True, "test_case": test_case.format()}
+            if wants_total(request):
+                response["total_test_cases"] = count_rows(TestCase)
+
+            return jsonify(response)
         except Exception as e:
             abort(422, str(e))
 
     @app.route("/tests/<int:test_case_id>", methods=["GET"])
+    @cached(TestCase.__tablename__)
     def get_test(test_case_id: int):
-        test_case = TestCase.get(test_case_id)
-
-        if not test_case:
-            abort(404, "The requested test case was not found in the database.")
-
-        return jsonify({"success": True, "test_case": test_case.format()})
+        fields = sparse_fields(request, TEST_CASE_FIELDS)
+        test_case = db.session.execute(test_case_query(fields).where(TestCase.id == test_case_id)).first()
+        return jsonify(test_case_response(test_case, fields))
 
     @app.route("/tests/<int:test_case_id>", methods=["PATCH"])
     def update_test(test_case_id: int):
@@ -121,13 +224,11 @@ def create_app(test_config=None):
             if req_description:
                 test_case.description = req_description
             test_case.update()
-            return jsonify(
-                {
-                    "success": True,
-                    "test_case": test_case.format(),
-                    "total_test_cases": len(TestCase.query.all()),
-                }
-            )
+            response = {"success": True, "test_case": test_case.format()}
+            if wants_total(request):
+                response["total_test_cases"] = count_rows(TestCase)
+
+            return jsonify(response)
         except Exception as e:
             abort(422, str(e))
 
@@ -140,60 +241,91 @@ def create_app(test_config=None):
 
         try:
             test_case.delete()
-            if not TestCase.get(test_case_id):
-                return jsonify(
-                    {
-                        "success": True,
-                        "deleted_test_case_id": test_case_id,
-                        "total_test_cases": len(TestCase.query.all()),
-                    }
-                )
         except Exception as e:
             abort(500, str(e))
 
+        # delete() commits or raises, there is no need to look the row up again.
+        response = {"success": True, "deleted_test_case_id": test_case_id}
+        if wants_total(request):
+            response["total_test_cases"] = count_rows(TestCase)
+
+        return jsonify(response)
+
+    def run_test_case_batch(operation):
+        try:
+            items = parse_batch(request)
+        except ValueError as e:
+            abort(400, str(e))
+
+        max_items = app.config.get("TEST_CASE_BATCH_MAX_ITEMS", 10000)
+        if len(items) > max_items:
+            abort(400, f"A batch can contain at most {max_items} test cases.")
+
+        try:
+            results = operation(items)
+        except Exception as e:
+            abort(422, str(e))
+
+        succeeded = sum(1 for result in results if result["success"])
+        response = {
+            "success": True,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results,
+        }
+        if wants_total(request):
+            response["total_test_cases"] = count_rows(TestCase)
+
+        return jsonify(response)
+
+    @app.route("/tests/batch", methods=["POST"])
+    def upsert_tests_batch():
+        return run_test_case_batch(upsert_test_cases)
+
+    @app.route("/tests/batch", methods=["PATCH"])
+    def update_tests_batch():
+        return run_test_case_batch(update_test_cases)
+
+    @app.route("/tests/batch", methods=["DELETE"])
+    def delete_tests_batch():
+        return run_test_case_batch(delete_test_cases)
+
     # ----------------------------------------------------------------------------#
     # Execution result.
     # ----------------------------------------------------------------------------#
 
     @app.route("/executions/<int:asset_id>", methods=["GET"])
+    @cached(Asset.__tablename__, Execution.__tablename__, TestCase.__tablename__)
     def get_executions(asset_id: int):
-        asset = Asset.get(asset_id)
-        if not asset:
-            abort(404, "The requested asset was not found in the database.")
-
-        executions = (
-            Execution.query.filter(Execution.asset_id == asset_id)
-            .join(Execution.test_case)
-            .order_by(Execution.id)
-            .all()
-        )
-
-        current_executions = []
-        for execution in executions:
-            current_executions.append(
-                {
-                    "id": execution.id,
-                    "status": execution.status,
-                    "details": execution.details,
-                    "execution_date": execution.timestamp,
-                    "test_case": {
-                        "id": execution.test_case.id,
-                        "name": execution.test_case.name,
-                    },
-                }
-            )
-
-        if len(executions) == 0:
-            abort(404, "No data found in the database.")
+        asset = require(cached_row(Asset, asset_id), "asset")
+        try:
+            criteria = execution_criteria(request) + partition_criteria(request)
+            descending = execution_order(request) == "desc"
+        except ValueError as e:
+            abort(400, str(e))
+
+        fields = sparse_fields(request, Execution.HISTORY_FIELDS)
+        stmt = Execution.history_query(asset_id, fields).where(*criteria)
+        if wants_stream(request):
+            order = Execution.id.desc() if descending else Execution.id
+            return stream_ndjson(stmt.order_by(order), partial(Execution.format_history, fields=fields))
+
+        page = paginate(request, stmt, Execution.id, scalars=False, descending=descending)
+        response = executions_response(asset, page, fields)
+        if wants_total(request):
+            response["total_executions"] = db.session.scalar(execution_count_query(asset_id, criteria))
+
+        return jsonify(response)
+
+    @app.route("/export/executions", methods=["GET"])
+    def export_executions():
+        try:
+            name = export_format(request)
+            criteria = execution_criteria(request) + asset_criteria(request) + partition_criteria(request)
+        except ValueError as e:
+            abort(400, str(e))
 
-        return jsonify(
-            {
-                "success": True,
-                "executions": current_executions,
-                "asset": asset.format(),
-                "total_executions": len(executions),
-            }
-        )
+        return export_response(export_query(*criteria), name)
 
     @app.route("/executions", methods=["POST"])
     def add_execution():
@@ -213,37 +345,185 @@ def create_app(test_config=None):
             req_status = body.get("status")
             if req_status not in [True, False]:
                 abort(400, "The status field must be a boolean.")
-            req_asset_id = body.get("asset_id")
-            req_test_case_id = body.get("test_case_id")
+            req_asset_id = parse_id(body.get("asset_id"))
+            req_test_case_id = parse_id(body.get("test_case_id"))
 
-            asset = Asset.get(req_asset_id)
-            if not asset:
+            if not cached_row(Asset, req_asset_id):
                 abort(404, "The asset was not found in the database.")
 
-            test_case = TestCase.get(req_test_case_id)
-            if not test_case:
+            if not cached_row(TestCase, req_test_case_id):
                 abort(404, "The test case was not found in the database.")
 
-            req_details = body.get("details", "No details provided.")
+            req_details = body.get("details")
+            if app.config.get("EXECUTION_INGEST_MODE", "sync") != "queued":
+                execution = Execution(
+                    asset_id=req_asset_id,
+                    test_case_id=req_test_case_id,
+                    status=req_status,
+                    details=req_details,
+                )
+                execution.insert()
 
-            execution = Execution(
-                asset_id=req_asset_id,
-                test_case_id=req_test_case_id,
-                status=req_status,
-                details=req_details,
-            )
-            execution.insert()
+                response = {"success": True, "execution": execution.format()}
+                if wants_total(request):
+                    response["total_executions"] = count_rows(Execution)
 
-            return jsonify(
+                return jsonify(response)
+        except Exception as e:
+            abort(422, str(e))
+
+        # The spool writer only gets to the payload later, check it like a batch item.
+        if not isinstance(req_details, str) or len(req_details) > MAX_DETAILS_LENGTH:
+            abort(400, f"The details field must be a string of at most {MAX_DETAILS_LENGTH} characters.")
+
+        try:
+            ticket = enqueue_execution(
                 {
-                    "success": True,
-                    "execution": execution.format(),
-                    "total_executions": len(Execution.query.all()),
+                    "asset_id": req_asset_id,
+                    "test_case_id": req_test_case_id,
+                    "status": req_status,
+                    "details": req_details,
                 }
             )
+        except SpoolFull:
+            raise ServiceUnavailable(
+                "Too many executions are waiting to be written, retry later.",
+                retry_after=app.config.get("INGEST_RETRY_AFTER", 1),
+            )
+
+        return jsonify({"success": True, "ticket": ticket, "status": "queued"}), 202
+
+    @app.route("/executions/tickets/<ticket>", methods=["GET"])
+    def get_execution_ticket(ticket: str):
+        entry = ExecutionSpool.get_by_ticket(ticket)
+        if not entry:
+            abort(404, "The requested ticket was not found.")
+
+        return jsonify({"success": True, **entry.format()})
+
+    @app.route("/executions/batch", methods=["POST"])
+    def add_executions_batch():
+        try:
+            items = parse_batch(request)
+        except ValueError as e:
+            abort(400, str(e))
+
+        max_items = app.config.get("EXECUTION_BATCH_MAX_ITEMS", 10000)
+        if len(items) > max_items:
+            abort(400, f"A batch can contain at most {max_items} executions.")
+
+        try:
+            results = ingest_executions(items)
         except Exception as e:
             abort(422, str(e))
 
+        inserted = sum(1 for result in results if result["success"])
+        response = {
+            "success": True,
+            "inserted": inserted,
+            "failed": len(results) - inserted,
+            "results": results,
+        }
+        if wants_total(request):
+            response["total_executions"] = count_rows(Execution)
+
+        return jsonify(response)
+
+    # ----------------------------------------------------------------------------#
+    # Asset status.
+    # ----------------------------------------------------------------------------#
+
+    @app.route("/assets/<int:asset_id>/status", methods=["GET"])
+    @cached(Asset.__tablename__, Execution.__tablename__, TestCase.__tablename__)
+    def get_asset_status(asset_id: int):
+        asset = require(cached_row(Asset, asset_id), "asset")
+        fields = sparse_fields(request, LatestExecution.STATUS_FIELDS)
+        page = paginate(
+            request, LatestExecution.status_query(asset_id, fields), LatestExecution.test_case_id, scalars=False
+        )
+        return jsonify(asset_status_response(asset, page, fields))
+
+    # ----------------------------------------------------------------------------#
+    # Statistics.
+    # ----------------------------------------------------------------------------#
+
+    def stats_criteria():
+        try:
+            return day_range(request)
+        except ValueError:
+            abort(400, "The since and until arguments must be ISO dates.")
+
+    def stats_bucket():
+        bucket = request.args.get("bucket", "day")
+        if bucket not in BUCKET_FORMATS:
+            abort(400, f"The bucket argument must be one of {', '.join(BUCKET_FORMATS)}.")
+        return bucket
+
+    @app.route("/stats/assets/<int:asset_id>", methods=["GET"])
+    @cached(Asset.__tablename__, Execution.__tablename__)
+    def get_asset_stats(asset_id: int):
+        asset = require(cached_row(Asset, asset_id), "asset")
+        stats = rollup_totals(ExecutionRollup.asset_id == asset_id, *stats_criteria())
+        return jsonify({"success": True, "asset": asset, "stats": stats})
+
+    @app.route("/stats/assets/<int:asset_id>/history", methods=["GET"])
+    @cached(Asset.__tablename__, Execution.__tablename__)
+    def get_asset_stats_history(asset_id: int):
+        asset = require(cached_row(Asset, asset_id), "asset")
+        bucket = stats_bucket()
+        history = rollup_buckets(bucket, ExecutionRollup.asset_id == asset_id, *stats_criteria())
+        return jsonify({"success": True, "asset": asset, "bucket": bucket, "history": history})
+
+    @app.route("/stats/tests/<int:test_case_id>", methods=["GET"])
+    @cached(TestCase.__tablename__, Execution.__tablename__)
+    def get_test_stats(test_case_id: int):
+        test_case = require(cached_row(TestCase, test_case_id), "test case")
+        stats = rollup_totals(ExecutionRollup.test_case_id == test_case_id, *stats_criteria())
+        return jsonify({"success": True, "test_case": test_case, "stats": stats})
+
+    @app.route("/stats/tests/<int:test_case_id>/history", methods=["GET"])
+    @cached(TestCase.__tablename__, Execution.__tablename__)
+    def get_test_stats_history(test_case_id: int):
+        test_case = require(cached_row(TestCase, test_case_id), "test case")
+        bucket = stats_bucket()
+        history = rollup_buckets(bucket, ExecutionRollup.test_case_id == test_case_id, *stats_criteria())
+        return jsonify({"success": True, "test_case": test_case, "bucket": bucket, "history": history})
+
+    # ----------------------------------------------------------------------------#
+    # Search.
+    # ----------------------------------------------------------------------------#
+
+    @app.route("/search", methods=["GET"])
+    @cached(TestCase.__tablename__, Execution.__tablename__)
+    def search():
+        try:
+            terms = search_terms(request)
+            search_type, order = search_options(request)
+            if search_type == "tests":
+                stmt, fts = test_case_search(terms)
+            else:
+                stmt, fts = execution_search(terms, *execution_criteria(request), *asset_criteria(request))
+                # The id range of the requested months, on the FTS5 rowid so the match seeks to it.
+                stmt = stmt.where(*partition_criteria(request, fts.c.rowid))
+        except ValueError as e:
+            abort(400, str(e))
+
+        model, key = (TestCase, "test_cases") if search_type == "tests" else (Execution, "executions")
+        response = {"success": True}
+        if order == "rank":
+            page = paginate_ranked(request, stmt, fts.c.rank, fts.c.rowid)
+            response["next_page"] = page.next_page
+        else:
+            page = paginate(request, stmt, stmt.selected_columns.id, scalars=False, descending=True)
+            response["next_cursor"] = page.next_cursor
+
+        serialize = model_serializer(model)
+        response[key] = [serialize(row) for row in page.items]
+        if len(response[key]) == 0:
+            abort(404, "No data found in the database.")
+
+        return jsonify(response)
+
     # ----------------------------------------------------------------------------#
     # Errors.
     # ----------------------------------------------------------------------------#
@@ -284,6 +564,14 @@ def create_app(test_config=None):
             error.code,
         )
 
+    @app.errorhandler(503)
+    def service_unavailable(error):
+        return (
+            jsonify({"success": False, "error": error.code, "message": error.description}),
+            error.code,
+            {"Retry-After": str(error.retry_after)} if getattr(error, "retry_after", None) else {},
+        )
+
     @app.errorhandler(500)
     def internal_server_error(error):
         return (
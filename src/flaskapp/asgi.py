@@ -0,0 +1,243 @@
+"""
+ASGI entry point with async views for the read endpoints
+
+    gunicorn -c gunicorn.asgi.conf.py flaskapp.asgi:app
+    uvicorn --app-dir src flaskapp.asgi:app
+
+The hot GET endpoints (test case lists and lookups, execution history and
+asset status) run as coroutines on an AsyncSession over aiosqlite, so one
+worker keeps many of them in flight on its event loop. Every other route,
+the NDJSON streams and all writes, goes to the WSGI app through asgiref's
+thread pool, so the API is the same whichever way it is served.
+Needs the `asgi` extra (asgiref, aiosqlite and uvicorn).
+"""
+
+import io
+import sys
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import abort, jsonify, request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from flaskapp import app as wsgi_app
+from flaskapp.app import (
+    TEST_CASE_FIELDS,
+    asset_status_response,
+    create_app,
+    execution_count_query,
+    executions_response,
+    require,
+    sparse_fields,
+    test_case_query,
+    test_case_response,
+    test_cases_response,
+    wants_total,
+)
+from flaskapp.cache import async_cached, async_cached_row
+from flaskapp.database.models import Asset, Execution, LatestExecution, TestCase, async_count_rows
+from flaskapp.database.routing import register_query_only
+from flaskapp.database.sqlite import register_sqlite_pragmas
+from flaskapp.filters import execution_criteria, execution_order
+from flaskapp.metrics import instrument_engine
+from flaskapp.pagination import async_paginate
+from flaskapp.partitions import async_partition_criteria
+from flaskapp.streaming import wants_stream
+
+
+def async_database_uri(config):
+    """
+    async_database_uri(config)
+    ASYNC_DATABASE_URI when set, otherwise the reader (or primary) database
+    with its SQLite driver swapped for aiosqlite
+    """
+    if config.get("ASYNC_DATABASE_URI"):
+        return config["ASYNC_DATABASE_URI"]
+    url = make_url(config.get("DATABASE_READER_URI") or config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def build_environ(scope):
+    """
+    build_environ(scope)
+    the WSGI environ of a bodiless ASGI http request, enough for Flask to
+    build its request object and match the URL
+    """
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": scope["client"][0] if scope.get("client") else "",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = f"HTTP_{key}"
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def send_response(send, response):
+    body = b"" if response.status_code == 304 else response.get_data()
+    headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in response.headers.items()]
+    await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+    response.close()
+
+
+# ----------------------------------------------------------------------------#
+# Async views, named after the Flask endpoints they replace.
+# ----------------------------------------------------------------------------#
+
+
+@async_cached(TestCase.__tablename__)
+async def get_tests(session):
+    fields = sparse_fields(request, TEST_CASE_FIELDS)
+    page = await async_paginate(session, request, test_case_query(fields), TestCase.id, scalars=False)
+    response = test_cases_response(page, fields)
+    if wants_total(request):
+        response["total_test_cases"] = await async_count_rows(session, TestCase)
+
+    return jsonify(response)
+
+
+@async_cached(TestCase.__tablename__)
+async def get_test(session, test_case_id: int):
+    fields = sparse_fields(request, TEST_CASE_FIELDS)
+    test_case = (await session.execute(test_case_query(fields).where(TestCase.id == test_case_id))).first()
+    return jsonify(test_case_response(test_case, fields))
+
+
+@async_cached(Asset.__tablename__, Execution.__tablename__, TestCase.__tablename__)
+async def get_executions(session, asset_id: int):
+    # NDJSON streams are left to the sync app and its server-side cursor.
+    if wants_stream(request):
+        return None
+
+    asset = require(await async_cached_row(session, Asset, asset_id), "asset")
+    try:
+        criteria = execution_criteria(request) + await async_partition_criteria(session, request)
+        descending = execution_order(request) == "desc"
+    except ValueError as e:
+        abort(400, str(e))
+
+    fields = sparse_fields(request, Execution.HISTORY_FIELDS)
+    stmt = Execution.history_query(asset_id, fields).where(*criteria)
+    page = await async_paginate(session, request, stmt, Execution.id, scalars=False, descending=descending)
+    response = executions_response(asset, page, fields)
+    if wants_total(request):
+        response["total_executions"] = await session.scalar(execution_count_query(asset_id, criteria))
+
+    return jsonify(response)
+
+
+@async_cached(Asset.__tablename__, Execution.__tablename__, TestCase.__tablename__)
+async def get_asset_status(session, asset_id: int):
+    asset = require(await async_cached_row(session, Asset, asset_id), "asset")
+    fields = sparse_fields(request, LatestExecution.STATUS_FIELDS)
+    page = await async_paginate(
+        session, request, LatestExecution.status_query(asset_id, fields), LatestExecution.test_case_id, scalars=False
+    )
+    return jsonify(asset_status_response(asset, page, fields))
+
+
+ASYNC_VIEWS = {view.__name__: view for view in (get_tests, get_test, get_executions, get_asset_status)}
+
+
+class AsyncApp:
+    """
+    ASGI application wrapping a Flask app. GET requests routed to one of
+    ASYNC_VIEWS run on the event loop with their own AsyncSession, inside
+    the Flask request context, so the before/after request hooks, error
+    handlers, cache and compression all apply as usual. Everything else
+    goes through WsgiToAsgi.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+
+        config = flask_app.config
+        # aiosqlite defaults to NullPool, keep connections (and their page
+        # cache) open across requests like the sync engines do.
+        self.engine = create_async_engine(
+            async_database_uri(config),
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=config.get("DATABASE_READER_POOL_SIZE", 5),
+        )
+        # The async views only read, like the reader engine of the sync app.
+        register_sqlite_pragmas(self.engine.sync_engine, config)
+        register_query_only(self.engine.sync_engine)
+        if "metrics" in flask_app.extensions:
+            instrument_engine(self.engine.sync_engine)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] == "http" and scope["method"] == "GET":
+            response = await self.handle(scope)
+            if response is not None:
+                await send_response(send, response)
+                return
+        await self.wsgi(scope, receive, send)
+
+    async def handle(self, scope):
+        """
+        handle(scope)
+        the response of an async view, or None when the request belongs to
+        the sync app
+        """
+        app = self.flask_app
+        with app.request_context(build_environ(scope)):
+            view = ASYNC_VIEWS.get(request.url_rule.endpoint) if request.url_rule else None
+            if view is None:
+                return None
+            try:
+                try:
+                    rv = app.preprocess_request()
+                    if rv is None:
+                        async with self.sessions() as session:
+                            rv = await view(session, **request.view_args)
+                        if rv is None:
+                            return None
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                return app.finalize_request(rv)
+            except Exception as e:
+                return app.handle_exception(e)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app(test_config=None):
+    return AsyncApp(create_app(test_config))
+
+
+# The package already builds the WSGI app on import, serve that one.
+app = AsyncApp(wsgi_app)
@@ -0,0 +1,326 @@
+"""
+Response and lookup caching with ETag revalidation
+
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+
+from flaskapp.compression import apply_encoding, choose_encoding, compress, compressible, large_enough
+from flaskapp.database.versions import (
+    database_digest,
+    init_table_versions,
+    private_directory,
+    runtime_path,
+    table_versions,
+)
+
+EXTENSION_KEY = "response_cache"
+
+
+class CacheEntry:
+    def __init__(self, response):
+        self.body = response.get_data()
+        self.mimetype = response.mimetype
+        self.etag = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+        # Compressed bodies by encoding, filled the first time one is asked for.
+        self.encoded = {}
+
+    def to_response(self):
+        response = current_app.response_class(self.body, mimetype=self.mimetype)
+        response.set_etag(self.etag)
+        return response
+
+
+def key_digest(key):
+    return hashlib.blake2b(repr(key).encode(), digest_size=20).hexdigest()
+
+
+class MemoryCache:
+    """
+    A thread-safe LRU mapping whose entries also expire after `ttl` seconds,
+    private to the process.
+    """
+
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FileCache:
+    """
+    Entries pickled into one file each under a directory shared by all the
+    processes of the user, /dev/shm keeps it in memory where available.
+    The directory must not be writable by anyone else. Expired files are
+    removed when read and every `prune_every` writes.
+    """
+
+    def __init__(self, directory, ttl=30, prune_every=256):
+        self.directory = directory
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self._writes = 0
+        private_directory(directory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key_digest(key))
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires, entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires < time.time():
+            self._remove(path)
+            return None
+        return entry
+
+    def set(self, key, entry):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((time.time() + self.ttl, entry), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))
+
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+        return entry
+
+    def prune(self):
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime + self.ttl < now:
+                    self._remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class RedisCache:
+    """
+    Entries stored in Redis or any server speaking its protocol, shared by
+    every process that can reach it.
+    """
+
+    def __init__(self, url, ttl=30, prefix="flaskapp:cache:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key_digest(key))
+        return None if value is None else pickle.loads(value)
+
+    def set(self, key, entry):
+        self.client.set(self.prefix + key_digest(key), pickle.dumps(entry), ex=self.ttl)
+        return entry
+
+    def clear(self):
+        for name in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(name)
+
+
+"""
+    init_response_cache(app)
+    builds the cache backend named by CACHE_BACKEND ("memory", "file" or
+    "redis") and sets up the table version counters it is keyed on
+"""
+
+
+def init_response_cache(app):
+    init_table_versions(app)
+    if not app.config.get("RESPONSE_CACHE_ENABLED", False):
+        return
+
+    backend = app.config.get("CACHE_BACKEND", "memory")
+    if backend != "memory" and app.config.get("TABLE_VERSIONS", "local") == "local":
+        # Other processes would never see this one's invalidations.
+        raise RuntimeError(f"CACHE_BACKEND '{backend}' needs TABLE_VERSIONS set to 'shared' or 'redis'.")
+
+    ttl = app.config.get("RESPONSE_CACHE_TTL", 30)
+    if backend == "file":
+        cache = FileCache(app.config.get("CACHE_DIR") or runtime_path(app, "cache"), ttl=ttl)
+    elif backend == "redis":
+        cache = RedisCache(app.config["CACHE_REDIS_URL"], ttl=ttl, prefix=f"flaskapp:{database_digest(app)}:cache:")
+    else:
+        cache = MemoryCache(max_entries=app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024), ttl=ttl)
+    app.extensions[EXTENSION_KEY] = cache
+
+
+"""
+    cached_row(model, row_id)
+    returns the format() dict of a row, or None when it does not exist,
+    going through the cache so hot lookups skip the database. Entries are
+    keyed on the table version, any write to the table invalidates them.
+    async_cached_row(session, model, row_id) reads through an AsyncSession.
+"""
+
+
+def row_key(model, row_id):
+    return ("row", model.__tablename__, row_id, table_versions.get((model.__tablename__,)))
+
+
+def cached_row(model, row_id):
+    cache = current_app.extensions.get(EXTENSION_KEY)
+    if cache is None:
+        row = model.get(row_id)
+        return row.format() if row else None
+
+    key = row_key(model, row_id)
+    entry = cache.get(key)
+    if entry is None:
+        row = model.get(row_id)
+        # False marks a missing row, None already means a cache miss.
+        entry = cache.set(key, row.format() if row else False)
+    return entry or None
+
+
+async def async_cached_row(session, model, row_id):
+    cache = current_app.extensions.get(EXTENSION_KEY)
+    entry = None if cache is None else cache.get(row_key(model, row_id))
+    if entry is None:
+        row = await session.get(model, row_id)
+        entry = row.format() if row else False
+        if cache is not None:
+            cache.set(row_key(model, row_id), entry)
+    return entry or None
+
+
+def response_key(tables):
+    return (
+        request.path,
+        tuple(sorted(request.args.items(multi=True))),
+        request.headers.get("Accept"),
+        table_versions.get(tables),
+    )
+
+
+def cached_response(cache, key, entry):
+    """
+    cached_response(cache, key, entry)
+    answers the request from a cache entry: 304 when the ETag matches,
+    otherwise the body in the best encoding the client accepts
+    """
+    response = entry.to_response().make_conditional(request)
+    if not compressible(response):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(request) if large_enough(len(entry.body)) else None
+    if encoding is None:
+        return response
+    if encoding not in entry.encoded:
+        entry.encoded[encoding] = compress(entry.body, encoding)
+        # Store it again so shared backends keep the compressed bytes too.
+        cache.set(key, entry)
+    return apply_encoding(response, encoding, entry.encoded[encoding])
+
+
+"""
+    cached(*tables)
+    caches the successful responses of a GET view, keyed by path, query
+    arguments, Accept header and the versions of the tables the view reads.
+    A write to any of those tables bumps its version, so stale entries are
+    never looked up again. Clients sending a matching If-None-Match get a
+    304 straight from the cache, without touching the database. Compressed
+    bodies are kept in the entry, so hits are not compressed again.
+    async_cached(*tables) is the same for the coroutine views of the ASGI
+    app, which may return None to hand the request back to the sync app.
+"""
+
+
+def cached(*tables):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get(EXTENSION_KEY)
+            if cache is None:
+                return view(*args, **kwargs)
+
+            key = response_key(tables)
+            entry = cache.get(key)
+            if entry is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                entry = cache.set(key, CacheEntry(response))
+            return cached_response(cache, key, entry)
+
+        return wrapper
+
+    return decorator
+
+
+def async_cached(*tables):
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get(EXTENSION_KEY)
+            if cache is None:
+                return await view(*args, **kwargs)
+
+            key = response_key(tables)
+            entry = cache.get(key)
+            if entry is None:
+                rv = await view(*args, **kwargs)
+                if rv is None:
+                    return None
+                response = current_app.make_response(rv)
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                entry = cache.set(key, CacheEntry(response))
+            return cached_response(cache, key, entry)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,197 @@
+"""
+Bulk changes to the test case catalog
+
+"""
+
+from sqlalchemy import delete, func, insert, select, update
+
+from flaskapp.database.models import Execution, TestCase, adjust_row_count, db, index_search_rows
+from flaskapp.database.versions import table_versions
+from flaskapp.ingest import existing_ids
+
+NAME_LENGTH = TestCase.__table__.c.name.type.length
+DESCRIPTION_LENGTH = TestCase.__table__.c.description.type.length
+
+
+def failure(index, error):
+    return {"index": index, "success": False, "error": error}
+
+
+def validate_text(item, field, length, required):
+    if field not in item:
+        if required:
+            raise ValueError(f"The item must contain a '{field}' field.")
+        return
+    value = item[field]
+    if value is None and not required:
+        return
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"The {field} field must be a non-empty string.")
+    if len(value) > length:
+        raise ValueError(f"The {field} field must be at most {length} characters.")
+
+
+def validate_item(item):
+    if isinstance(item, Exception):
+        raise ValueError(f"Invalid JSON: {item}")
+    if not isinstance(item, dict):
+        raise ValueError("The item must be a JSON object.")
+
+
+def validate_id(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("The id must be an integer.")
+    return value
+
+
+def commit_catalog(count_delta=0):
+    if count_delta:
+        adjust_row_count(TestCase, count_delta)
+    db.session.commit()
+    table_versions.bump(TestCase.__tablename__)
+
+
+"""
+    upsert_test_cases(items)
+    creates or updates test cases by name in one transaction. Names are not
+    unique in the table, so existing ones are found with a single IN query
+    on the name index (the lowest id wins when a name is repeated), then
+    new rows go in with one multi-row INSERT and changed descriptions with
+    one executemany UPDATE. A name repeated in the batch keeps its last item.
+"""
+
+
+def upsert_test_cases(items):
+    results = [None] * len(items)
+    by_name = {}
+    for index, item in enumerate(items):
+        try:
+            validate_item(item)
+            validate_text(item, "name", NAME_LENGTH, required=True)
+            validate_text(item, "description", DESCRIPTION_LENGTH, required=False)
+        except ValueError as e:
+            results[index] = failure(index, str(e))
+            continue
+        indexes, _ = by_name.get(item["name"], ([], None))
+        by_name[item["name"]] = (indexes + [index], item)
+
+    existing = {}
+    if by_name:
+        stmt = select(TestCase.name, func.min(TestCase.id)).where(TestCase.name.in_(by_name)).group_by(TestCase.name)
+        existing = dict(db.session.execute(stmt).all())
+
+    new_names = [name for name in by_name if name not in existing]
+    created = {}
+    if new_names:
+        # The names are unique within the batch, so ids are matched by name and
+        # the INSERT can go out as one multi-row statement (no RETURNING order
+        # needed, which SQLite cannot guarantee).
+        stmt = insert(TestCase).returning(TestCase.name, TestCase.id)
+        rows = [{"name": name, "description": by_name[name][1].get("description")} for name in new_names]
+        created = dict(db.session.execute(stmt, rows).all())
+        index_search_rows(TestCase, TestCase.id.in_(created.values()))
+
+    changes = [
+        {"id": existing[name], "description": item["description"]}
+        for name, (_, item) in by_name.items()
+        if name in existing and "description" in item
+    ]
+    if changes:
+        changed = TestCase.id.in_([row["id"] for row in changes])
+        index_search_rows(TestCase, changed, sign=-1)
+        db.session.execute(update(TestCase), changes)
+        index_search_rows(TestCase, changed)
+
+    for name, (indexes, _) in by_name.items():
+        for index in indexes:
+            test_case_id = created.get(name, existing.get(name))
+            results[index] = {"index": index, "success": True, "id": test_case_id, "created": name in created}
+
+    commit_catalog(len(created))
+    return results
+
+
+"""
+    update_test_cases(items)
+    applies {"id", "name"?, "description"?} items with one executemany
+    UPDATE by primary key, after checking every id with one IN query
+"""
+
+
+def update_test_cases(items):
+    results = [None] * len(items)
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            validate_item(item)
+            validate_id(item.get("id"))
+            if "name" not in item and "description" not in item:
+                raise ValueError("The item must contain a 'name' or 'description' field.")
+            validate_text(item, "name", NAME_LENGTH, required=False)
+            if "name" in item and item["name"] is None:
+                raise ValueError("The name field must be a non-empty string.")
+            validate_text(item, "description", DESCRIPTION_LENGTH, required=False)
+        except ValueError as e:
+            results[index] = failure(index, str(e))
+            continue
+        rows.append((index, {key: item[key] for key in ("id", "name", "description") if key in item}))
+
+    found = existing_ids(TestCase, {row["id"] for _, row in rows})
+    changes = []
+    for index, row in rows:
+        if row["id"] not in found:
+            results[index] = failure(index, "The test case was not found in the database.")
+        else:
+            changes.append(row)
+            results[index] = {"index": index, "success": True, "id": row["id"]}
+
+    if changes:
+        changed = TestCase.id.in_({row["id"] for row in changes})
+        index_search_rows(TestCase, changed, sign=-1)
+        # Rows with the same set of keys go out as one executemany each.
+        for keys in {tuple(row) for row in changes}:
+            db.session.execute(update(TestCase), [row for row in changes if tuple(row) == keys])
+        index_search_rows(TestCase, changed)
+    commit_catalog()
+    return results
+
+
+"""
+    delete_test_cases(items)
+    deletes test cases by the id of {"id": ...} items, like update_test_cases
+    takes them, with one DELETE ... WHERE id IN. Ids that are unknown, or
+    still referenced by executions, are reported and skipped.
+"""
+
+
+def delete_test_cases(items):
+    results = [None] * len(items)
+    ids = []
+    for index, item in enumerate(items):
+        try:
+            validate_item(item)
+            ids.append((index, validate_id(item.get("id"))))
+        except ValueError as e:
+            results[index] = failure(index, str(e))
+
+    candidates = {test_case_id for _, test_case_id in ids}
+    found = existing_ids(TestCase, candidates)
+    in_use = set()
+    if found:
+        stmt = select(Execution.test_case_id).where(Execution.test_case_id.in_(found)).distinct()
+        in_use = set(db.session.scalars(stmt))
+
+    deleted = found - in_use
+    for index, test_case_id in ids:
+        if test_case_id not in found:
+            results[index] = failure(index, "The test case was not found in the database.")
+        elif test_case_id in in_use:
+            results[index] = failure(index, "The test case still has executions.")
+        else:
+            results[index] = {"index": index, "success": True, "id": test_case_id}
+
+    if deleted:
+        index_search_rows(TestCase, TestCase.id.in_(deleted), sign=-1)
+        db.session.execute(delete(TestCase).where(TestCase.id.in_(deleted)))
+    commit_catalog(-len(deleted))
+    return results
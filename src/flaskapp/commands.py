@@ -0,0 +1,101 @@
+"""
+Flask CLI commands
+
+"""
+
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+
+from flaskapp.database.models import (
+    rebuild_execution_partitions,
+    rebuild_execution_rollups,
+    rebuild_latest_executions,
+    rebuild_row_counts,
+    rebuild_search_index,
+)
+from flaskapp.partitions import ARCHIVE_WRITERS, archive_executions
+from flaskapp.seed import seed_database
+from flaskapp.spool import drain_spool
+
+
+def register_commands(app):
+    @app.cli.command("recount")
+    def recount():
+        """Recompute the maintained row counters from the tables."""
+        rebuild_row_counts()
+        click.echo("Row counters rebuilt.")
+
+    @app.cli.command("rebuild-rollups")
+    def rebuild_rollups():
+        """Recompute the execution rollups from the execution history."""
+        rebuild_execution_rollups()
+        click.echo("Execution rollups rebuilt.")
+
+    @app.cli.command("rebuild-latest")
+    def rebuild_latest():
+        """Recompute the latest execution per asset and test case."""
+        rebuild_latest_executions()
+        click.echo("Latest executions rebuilt.")
+
+    @app.cli.command("rebuild-partitions")
+    def rebuild_partitions():
+        """Recompute the monthly execution partitions from the history."""
+        rebuild_execution_partitions()
+        click.echo("Execution partitions rebuilt.")
+
+    @app.cli.command("rebuild-search")
+    def rebuild_search():
+        """Reindex the test cases and executions for full-text search."""
+        rebuild_search_index()
+        click.echo("Search index rebuilt.")
+
+    @app.cli.command("archive-executions")
+    @click.option("--older-than", "days", type=int, default=None, help="Retention in days [EXECUTION_RETENTION_DAYS].")
+    @click.option("--directory", default=None, help="Where archives are written [EXECUTION_ARCHIVE_DIR].")
+    @click.option("--format", "archive_format", type=click.Choice(list(ARCHIVE_WRITERS)), default=None)
+    @click.option("--batch-size", type=int, default=None, help="Rows deleted per transaction.")
+    def archive(days, directory, archive_format, batch_size):
+        """Move whole months of old executions to compressed archive files."""
+        config = current_app.config
+        days = config.get("EXECUTION_RETENTION_DAYS", 365) if days is None else days
+        try:
+            archives = archive_executions(
+                datetime.utcnow() - timedelta(days=days),
+                directory or config["EXECUTION_ARCHIVE_DIR"],
+                archive_format or config.get("EXECUTION_ARCHIVE_FORMAT", "csv"),
+                batch_size or config.get("EXECUTION_ARCHIVE_BATCH_SIZE", 1000),
+            )
+        except (ValueError, RuntimeError) as e:
+            raise click.ClickException(str(e))
+        for month, path, rows in archives:
+            click.echo(f"{month}: {rows} executions archived to {path}")
+        click.echo(f"{sum(rows for _, _, rows in archives)} executions archived.")
+
+    @app.cli.command("drain-spool")
+    def drain():
+        """Write every queued execution now."""
+        total = 0
+        while drained := drain_spool():
+            total += drained
+        click.echo(f"{total} queued executions processed.")
+
+    @app.cli.command("seed")
+    @click.option("--test-cases", default=100, show_default=True, help="Test cases to add.")
+    @click.option("--assets", default=10, show_default=True, help="Assets to add.")
+    @click.option("--executions", default=10000, show_default=True, help="Executions to add.")
+    @click.option("--days", default=30, show_default=True, help="Spread executions over this many days.")
+    @click.option("--pass-rate", default=0.9, show_default=True, help="Share of passing executions.")
+    @click.option("--chunk-size", default=10000, show_default=True, help="Rows per INSERT and commit.")
+    @click.option("--seed", "random_seed", type=int, default=None, help="Random seed, for repeatable data.")
+    def seed(test_cases, assets, executions, days, pass_rate, chunk_size, random_seed):
+        """Add synthetic test cases, assets and executions."""
+        try:
+            counts = seed_database(test_cases, assets, executions, days, pass_rate, chunk_size, random_seed)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(
+            f"Added {counts['test_cases']} test cases, {counts['assets']} assets "
+            f"and {counts['executions']} executions."
+        )
@@ -0,0 +1,116 @@
+"""
+Response compression negotiated through Accept-Encoding
+
+"""
+
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/html", "text/plain", "text/csv"}
+
+DEFAULT_LEVELS = {"zstd": 3, "br": 5, "gzip": 6}
+
+
+def available_encodings():
+    encodings = ["gzip"]
+    if brotli is not None:
+        encodings.insert(0, "br")
+    if zstandard is not None:
+        encodings.insert(0, "zstd")
+    return encodings
+
+
+def compress(data, encoding):
+    """
+    compress(data, encoding)
+    compresses bytes at the level COMPRESSION_LEVELS sets for the encoding
+    """
+    level = current_app.config.get("COMPRESSION_LEVELS", {}).get(encoding, DEFAULT_LEVELS[encoding])
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    # mtime=0 keeps the output, and so cached bytes, identical across runs.
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def choose_encoding(flask_request):
+    """
+    choose_encoding(flask_request)
+    the best encoding both the client accepts and this process can produce,
+    in the server preference order of COMPRESSION_ENCODINGS, or None
+    """
+    accepted = flask_request.accept_encodings
+    if not accepted:
+        return None
+    preferred = current_app.config.get("COMPRESSION_ENCODINGS", ("zstd", "br", "gzip"))
+    supported = available_encodings()
+    candidates = [encoding for encoding in preferred if encoding in supported and accepted[encoding]]
+    if not candidates:
+        return None
+    # The client's q-values win, the server order breaks ties.
+    return max(candidates, key=lambda encoding: accepted[encoding])
+
+
+def compressible(response):
+    if not current_app.config.get("COMPRESSION_ENABLED", False):
+        return False
+    return (
+        response.status_code == 200
+        and not response.is_streamed
+        and not response.direct_passthrough
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+    )
+
+
+def apply_encoding(response, encoding, body):
+    """
+    apply_encoding(response, encoding, body)
+    swaps in an already compressed body. The ETag turns weak: the encoded
+    bytes differ, the representation does not, so If-None-Match still hits.
+    """
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def large_enough(size):
+    return size >= current_app.config.get("COMPRESSION_MIN_SIZE", 500)
+
+
+"""
+    compress_response(response)
+    after_request hook compressing bodies of at least COMPRESSION_MIN_SIZE
+    bytes. Responses from the cache arrive already encoded and are skipped.
+"""
+
+
+def compress_response(response):
+    if not compressible(response):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    encoding = choose_encoding(request) if large_enough(len(body)) else None
+    if encoding is None:
+        return response
+    return apply_encoding(response, encoding, compress(body, encoding))
+
+
+def init_compression(app):
+    app.after_request(compress_response)
@@ -7,3 +7,80 @@ database_filename = os.environ.get("DATABASE_FILENAME", "testdb.db")
 BASE_DIR = Path(__file__).resolve().parent.parent
 database_dir = os.path.join(BASE_DIR, "database")
 DATABASE_URI = f"sqlite:///{os.path.join(database_dir, database_filename)}"
+# Create the missing tables on startup, see config.production.
+DATABASE_SCHEMA_INIT = "create_all"
+
+PAGINATION_PER_PAGE = 2
+PAGINATION_MAX_PER_PAGE = 100
+
+EXECUTION_BATCH_CHUNK_SIZE = 500
+EXECUTION_BATCH_MAX_ITEMS = 10000
+TEST_CASE_BATCH_MAX_ITEMS = 10000
+
+# "sync" inserts executions in the request, "queued" spools them for the
+# background writer and answers 202 with a ticket.
+EXECUTION_INGEST_MODE = "sync"
+INGEST_QUEUE_MAX_PENDING = 10000
+INGEST_RETRY_AFTER = 1
+INGEST_WRITER_THREAD = False
+INGEST_WRITER_BATCH_SIZE = 500
+INGEST_WRITER_INTERVAL = 0.2
+INGEST_SPOOL_RETENTION = 86400
+
+# SQLite pragmas, see config.production for the tuned profile.
+SQLITE_JOURNAL_MODE = None
+SQLITE_SYNCHRONOUS = None
+SQLITE_MMAP_SIZE = None
+SQLITE_CACHE_SIZE = None
+SQLITE_TEMP_STORE = None
+SQLITE_BUSY_TIMEOUT = 5000
+
+# Read-only engine used by GET requests, see config.production.
+DATABASE_READER_ENABLED = False
+DATABASE_READER_URI = None
+DATABASE_READER_POOL_SIZE = 5
+
+STREAM_BATCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 10000
+
+# `flask archive-executions` moves whole months older than the retention to
+# compressed files ("csv" is gzipped CSV, "parquet" needs pyarrow).
+EXECUTION_RETENTION_DAYS = 365
+EXECUTION_ARCHIVE_DIR = os.path.join(database_dir, "archive")
+EXECUTION_ARCHIVE_FORMAT = "csv"
+EXECUTION_ARCHIVE_BATCH_SIZE = 1000
+
+# "orjson" when installed, otherwise "stdlib". "http" dates keep the RFC 822
+# format of the API, "iso" lets orjson serialize datetimes natively.
+JSON_PROVIDER = "orjson"
+JSON_DATETIME_FORMAT = "http"
+
+# Responses of at least COMPRESSION_MIN_SIZE bytes are compressed with the
+# first of COMPRESSION_ENCODINGS the client accepts. br and zstd need the
+# brotli and zstandard packages, gzip is always available.
+COMPRESSION_ENABLED = True
+COMPRESSION_MIN_SIZE = 500
+COMPRESSION_ENCODINGS = ("zstd", "br", "gzip")
+COMPRESSION_LEVELS = {"zstd": 3, "br": 5, "gzip": 6}
+
+# Server-Timing headers and /metrics. Without METRICS_SHARED or METRICS_DIR
+# the histograms only cover this process.
+METRICS_ENABLED = True
+METRICS_SERVER_TIMING = True
+METRICS_SHARED = False
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 1.0
+
+# Cached GET responses are dropped as soon as a table they read is written
+# in this process, the TTL bounds how long other processes can serve them.
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+RESPONSE_CACHE_TTL = 30
+
+# "memory", "file" or "redis". Shared backends need shared TABLE_VERSIONS
+# ("shared" mmap file or "redis") so every process sees invalidations.
+CACHE_BACKEND = "memory"
+CACHE_DIR = None
+CACHE_REDIS_URL = None
+TABLE_VERSIONS = "local"
+TABLE_VERSIONS_PATH = None
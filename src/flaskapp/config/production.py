@@ -0,0 +1,96 @@
+import os
+from pathlib import Path
+
+DEBUG = False
+
+database_filename = os.environ.get("DATABASE_FILENAME", "testdb.db")
+BASE_DIR = Path(__file__).resolve().parent.parent
+database_dir = os.path.join(BASE_DIR, "database")
+DATABASE_URI = f"sqlite:///{os.path.join(database_dir, database_filename)}"
+# "none" keeps every DDL out of the workers: the schema is migrated once
+# with `flask db upgrade` before gunicorn starts (see entrypoint.sh).
+# "create_all" creates the missing tables in every create_app() instead.
+DATABASE_SCHEMA_INIT = os.environ.get("DATABASE_SCHEMA_INIT", "none")
+
+PAGINATION_PER_PAGE = 2
+PAGINATION_MAX_PER_PAGE = 100
+
+EXECUTION_BATCH_CHUNK_SIZE = 500
+EXECUTION_BATCH_MAX_ITEMS = 10000
+TEST_CASE_BATCH_MAX_ITEMS = 10000
+
+# "sync" inserts executions in the request, "queued" spools them for the
+# background writer and answers 202 with a ticket.
+EXECUTION_INGEST_MODE = os.environ.get("EXECUTION_INGEST_MODE", "sync")
+INGEST_QUEUE_MAX_PENDING = int(os.environ.get("INGEST_QUEUE_MAX_PENDING", 10000))
+INGEST_RETRY_AFTER = 1
+INGEST_WRITER_THREAD = True
+INGEST_WRITER_BATCH_SIZE = int(os.environ.get("INGEST_WRITER_BATCH_SIZE", 500))
+INGEST_WRITER_INTERVAL = float(os.environ.get("INGEST_WRITER_INTERVAL", 0.2))
+INGEST_SPOOL_RETENTION = int(os.environ.get("INGEST_SPOOL_RETENTION", 86400))
+
+# SQLite tuning profile for many gunicorn workers sharing one database file:
+# WAL lets readers run next to the single writer, synchronous=NORMAL is
+# durable under WAL except on power loss, busy_timeout makes writers wait
+# for the lock instead of failing with "database is locked".
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+# Negative values are KiB, so this is a 64 MiB page cache per connection.
+SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", -64000))
+SQLITE_TEMP_STORE = os.environ.get("SQLITE_TEMP_STORE", "MEMORY")
+SQLITE_BUSY_TIMEOUT = int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000))
+
+# GET requests read through their own query_only engine and pool, so under WAL
+# long list reads no longer queue behind writers for a pooled connection.
+DATABASE_READER_ENABLED = os.environ.get("DATABASE_READER_ENABLED", "true").lower() == "true"
+DATABASE_READER_URI = os.environ.get("DATABASE_READER_URI")
+DATABASE_READER_POOL_SIZE = int(os.environ.get("DATABASE_READER_POOL_SIZE", 10))
+
+STREAM_BATCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 10000
+
+# `flask archive-executions` moves whole months older than the retention to
+# compressed files ("csv" is gzipped CSV, "parquet" needs pyarrow).
+EXECUTION_RETENTION_DAYS = int(os.environ.get("EXECUTION_RETENTION_DAYS", 365))
+EXECUTION_ARCHIVE_DIR = os.environ.get("EXECUTION_ARCHIVE_DIR", os.path.join(database_dir, "archive"))
+EXECUTION_ARCHIVE_FORMAT = os.environ.get("EXECUTION_ARCHIVE_FORMAT", "csv")
+EXECUTION_ARCHIVE_BATCH_SIZE = 1000
+
+# "orjson" when installed, otherwise "stdlib". "http" dates keep the RFC 822
+# format of the API, "iso" lets orjson serialize datetimes natively.
+JSON_PROVIDER = "orjson"
+JSON_DATETIME_FORMAT = "http"
+
+# Responses of at least COMPRESSION_MIN_SIZE bytes are compressed with the
+# first of COMPRESSION_ENCODINGS the client accepts. br and zstd need the
+# brotli and zstandard packages, gzip is always available.
+COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 500))
+COMPRESSION_ENCODINGS = ("zstd", "br", "gzip")
+COMPRESSION_LEVELS = {"zstd": 3, "br": 5, "gzip": 6}
+
+# Server-Timing headers and /metrics. Every gunicorn worker writes its
+# histograms to a directory private to the user and the database, or to
+# METRICS_DIR, and /metrics adds them up (see gunicorn.conf.py).
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+METRICS_SERVER_TIMING = os.environ.get("METRICS_SERVER_TIMING", "true").lower() == "true"
+METRICS_SHARED = True
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = 1.0
+
+# Cached GET responses are dropped as soon as a table they read is written
+# in this process, the TTL bounds how long other processes can serve them.
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+RESPONSE_CACHE_TTL = 30
+
+# gunicorn workers share cached responses and lookups through files under
+# /dev/shm and see each other's writes through an mmap'ed version file.
+# Both live in a directory private to the user and the database unless
+# CACHE_DIR or TABLE_VERSIONS_PATH say otherwise.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "file")
+CACHE_DIR = os.environ.get("CACHE_DIR")
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
+TABLE_VERSIONS = os.environ.get("TABLE_VERSIONS", "shared")
+TABLE_VERSIONS_PATH = os.environ.get("TABLE_VERSIONS_PATH")
@@ -3,36 +3,89 @@ Models for SQLite database
 
 """
 
-from datetime import datetime
+import os
+import weakref
+from datetime import date, datetime
 from typing import List  # noqa
 
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Boolean, DateTime, ForeignKey, String
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    case,
+    column,
+    delete,
+    event,
+    func,
+    inspect,
+    literal,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from flaskapp.database.routing import READER_BIND_KEY, RoutingSession, reader_bind, register_query_only
+from flaskapp.database.sqlite import register_sqlite_pragmas
+from flaskapp.database.versions import table_versions
+
 
 class Base(DeclarativeBase):
     pass
 
 
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
 migrate = Migrate()
 
+# Every engine of this process. A process forked from it (a gunicorn worker
+# of a preloaded app) must not reuse the connections pooled before the fork.
+_engines = weakref.WeakSet()
+
+
+def _drop_inherited_connections():
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+# Windows has no fork.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_drop_inherited_connections)
+
 """
     setup_db(app)
-    binds a flask application and a SQLAlchemy service
+    binds a flask application and a SQLAlchemy service. With
+    DATABASE_SCHEMA_INIT = "create_all" the missing tables are created,
+    with "none" no DDL is sent and the app does not even connect, the
+    schema is left to `flask db upgrade`.
 """
 
 
 def setup_db(app):
     app.config["SQLALCHEMY_DATABASE_URI"] = app.config.get("DATABASE_URI")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    if app.config.get("DATABASE_READER_ENABLED"):
+        app.config["SQLALCHEMY_BINDS"] = {READER_BIND_KEY: reader_bind(app)}
     db.app = app
     db.init_app(app)
-    migrate.init_app(app, db)
+    migrate.init_app(app, db, include_object=include_schema_object)
     with app.app_context():
-        db.create_all()
+        for engine in db.engines.values():
+            register_sqlite_pragmas(engine, app.config)
+            _engines.add(engine)
+        if READER_BIND_KEY in db.engines:
+            register_query_only(db.engines[READER_BIND_KEY])
+        if app.config.get("DATABASE_SCHEMA_INIT", "create_all") == "create_all":
+            db.create_all(bind_key=None)
 
 
 """
@@ -48,6 +101,73 @@ def db_drop_and_create_all(app):
         db.create_all()
 
 
+# ----------------------------------------------------------------------------#
+# Row counts.
+# ----------------------------------------------------------------------------#
+
+
+class RowCount(db.Model):
+    __tablename__ = "row_count"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __init__(self, table_name, count):
+        self.table_name = table_name
+        self.count = count
+
+
+"""
+    count_rows(model)
+    returns the number of rows of a model's table, reading the maintained
+    counter row and falling back to a SELECT COUNT(*) when it is missing.
+    async_count_rows(session, model) does the same through an AsyncSession.
+"""
+
+
+def count_rows(model):
+    count = db.session.scalar(select(RowCount.count).where(RowCount.table_name == model.__tablename__))
+    if count is None:
+        count = db.session.scalar(select(func.count()).select_from(model))
+    return count
+
+
+async def async_count_rows(session, model):
+    count = await session.scalar(select(RowCount.count).where(RowCount.table_name == model.__tablename__))
+    if count is None:
+        count = await session.scalar(select(func.count()).select_from(model))
+    return count
+
+
+"""
+    adjust_row_count(model, delta)
+    moves a model's counter row by delta inside the current transaction,
+    must be called after the matching insert/delete has been flushed so a
+    missing counter row can be seeded with SELECT COUNT(*)
+"""
+
+
+def adjust_row_count(model, delta):
+    result = db.session.execute(
+        update(RowCount).where(RowCount.table_name == model.__tablename__).values(count=RowCount.count + delta)
+    )
+    if result.rowcount == 0:
+        db.session.add(RowCount(model.__tablename__, db.session.scalar(select(func.count()).select_from(model))))
+
+
+"""
+    rebuild_row_counts()
+    recomputes every counter row from the tables themselves
+"""
+
+
+def rebuild_row_counts():
+    for model in (TestCase, Asset, Execution):
+        db.session.merge(RowCount(model.__tablename__, db.session.scalar(select(func.count()).select_from(model))))
+    db.session.commit()
+    table_versions.bump(TestCase.__tablename__, Asset.__tablename__, Execution.__tablename__)
+
+
 # ----------------------------------------------------------------------------#
 # Models.
 # ----------------------------------------------------------------------------#
@@ -55,12 +175,14 @@ def db_drop_and_create_all(app):
 
 class TestCase(db.Model):
     __tablename__ = "test_case"
+    # Names are not unique, but POST /tests/batch upserts by name.
+    __table_args__ = (Index("ix_test_case_name", "name"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(String(500), nullable=True)
     executions: Mapped[List["Execution"]] = relationship(  # noqa
-        "Execution", back_populates="test_case"
+        "Execution", back_populates="test_case", lazy="select"
     )
 
     def __init__(self, name, description):
@@ -73,14 +195,26 @@ class TestCase(db.Model):
 
     def insert(self):
         db.session.add(self)
+        db.session.flush()
+        adjust_row_count(TestCase, 1)
+        index_search_rows(TestCase, TestCase.id == self.id)
         db.session.commit()
+        table_versions.bump(TestCase.__tablename__)
 
     def update(self):
+        index_search_rows(TestCase, TestCase.id == self.id, sign=-1)
+        db.session.flush()
+        index_search_rows(TestCase, TestCase.id == self.id)
         db.session.commit()
+        table_versions.bump(TestCase.__tablename__)
 
     def delete(self):
+        index_search_rows(TestCase, TestCase.id == self.id, sign=-1)
         db.session.delete(self)
+        db.session.flush()
+        adjust_row_count(TestCase, -1)
         db.session.commit()
+        table_versions.bump(TestCase.__tablename__)
 
     def format(self):
         return {"id": self.id, "name": self.name, "description": self.description}
@@ -92,7 +226,7 @@ class Asset(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     executions: Mapped[List["Execution"]] = relationship(  # noqa
-        "Execution", back_populates="asset"
+        "Execution", back_populates="asset", lazy="select"
     )
 
     def __init__(self, name):
@@ -104,14 +238,21 @@ class Asset(db.Model):
 
     def insert(self):
         db.session.add(self)
+        db.session.flush()
+        adjust_row_count(Asset, 1)
         db.session.commit()
+        table_versions.bump(Asset.__tablename__)
 
     def update(self):
         db.session.commit()
+        table_versions.bump(Asset.__tablename__)
 
     def delete(self):
         db.session.delete(self)
+        db.session.flush()
+        adjust_row_count(Asset, -1)
         db.session.commit()
+        table_versions.bump(Asset.__tablename__)
 
     def format(self):
         return {"id": self.id, "name": self.name}
@@ -119,14 +260,25 @@ class Asset(db.Model):
 
 class Execution(db.Model):
     __tablename__ = "execution"
+    __table_args__ = (
+        Index("ix_execution_asset_id_id", "asset_id", "id"),
+        Index("ix_execution_test_case_id_id", "test_case_id", "id"),
+        Index("ix_execution_asset_id_timestamp", "asset_id", "timestamp"),
+        # SQLite appends the rowid (id) to every index, so these also serve
+        # the id ordering of filtered history pages.
+        Index("ix_execution_asset_id_status", "asset_id", "status"),
+        Index("ix_execution_asset_id_test_case_id", "asset_id", "test_case_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     test_case_id: Mapped[int] = mapped_column(ForeignKey("test_case.id"))
+    # Loading these per row is an N+1, join them with contains_eager()/selectinload()
+    # or select the needed columns instead, see history_query().
     test_case: Mapped["TestCase"] = relationship(
-        "TestCase", back_populates="executions"
+        "TestCase", back_populates="executions", lazy="raise_on_sql"
     )
     asset_id: Mapped[int] = mapped_column(ForeignKey("asset.id"))
-    asset: Mapped["Asset"] = relationship("Asset", back_populates="executions")
+    asset: Mapped["Asset"] = relationship("Asset", back_populates="executions", lazy="raise_on_sql")
     timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     status: Mapped[bool] = mapped_column(Boolean, nullable=False)
     details: Mapped[str] = mapped_column(String(500))
@@ -143,14 +295,92 @@ class Execution(db.Model):
 
     def insert(self):
         db.session.add(self)
+        db.session.flush()
+        adjust_row_count(Execution, 1)
+        record_execution_rollups([self.rollup_fields()])
+        record_latest_executions([self.latest_fields()])
+        record_execution_partitions([(self.id, self.timestamp)])
+        index_search_rows(Execution, Execution.id == self.id)
         db.session.commit()
+        table_versions.bump(Execution.__tablename__)
 
     def update(self):
+        # Before anything autoflushes the new values.
+        index_search_rows(Execution, Execution.id == self.id, sign=-1)
+        state = inspect(self)
+        previous = tuple((state.attrs[key].history.deleted or [getattr(self, key)])[0] for key in ROLLUP_FIELDS)
+        current = self.rollup_fields()
+        if previous != current:
+            record_execution_rollups([previous], sign=-1)
+            record_execution_rollups([current])
+            record_execution_partitions([(self.id, previous[2])], sign=-1)
+            record_execution_partitions([(self.id, current[2])])
+        db.session.flush()
+        index_search_rows(Execution, Execution.id == self.id)
+        refresh_latest_executions({previous[:2], current[:2]})
         db.session.commit()
+        table_versions.bump(Execution.__tablename__)
 
     def delete(self):
+        index_search_rows(Execution, Execution.id == self.id, sign=-1)
         db.session.delete(self)
+        db.session.flush()
+        adjust_row_count(Execution, -1)
+        record_execution_rollups([self.rollup_fields()], sign=-1)
+        record_execution_partitions([(self.id, self.timestamp)], sign=-1)
+        refresh_latest_executions({(self.asset_id, self.test_case_id)})
         db.session.commit()
+        table_versions.bump(Execution.__tablename__)
+
+    def rollup_fields(self):
+        return tuple(getattr(self, key) for key in ROLLUP_FIELDS)
+
+    def latest_fields(self):
+        return {
+            "asset_id": self.asset_id,
+            "test_case_id": self.test_case_id,
+            "execution_id": self.id,
+            "status": self.status,
+            "timestamp": self.timestamp,
+            "details": self.details,
+        }
+
+    HISTORY_FIELDS = ("id", "status", "details", "execution_date", "test_case")
+
+    @staticmethod
+    def history_query(asset_id: int, fields=None):
+        """
+        history_query(asset_id, fields=None)
+        selects the columns of an asset's execution history together with the
+        test case name, so rows can be formatted without loading ORM objects.
+        Given a subset of HISTORY_FIELDS only their columns are selected, and
+        test_case is only joined when asked for. The id is always selected,
+        pagination keys on it.
+        """
+        if fields is None:
+            fields = Execution.HISTORY_FIELDS
+        columns = {
+            "status": (Execution.status,),
+            "details": (Execution.details,),
+            "execution_date": (Execution.timestamp,),
+            "test_case": (TestCase.id.label("test_case_id"), TestCase.name.label("test_case_name")),
+        }
+        stmt = select(Execution.id, *(column for field in fields if field != "id" for column in columns[field]))
+        if "test_case" in fields:
+            stmt = stmt.join(Execution.test_case)
+        return stmt.where(Execution.asset_id == asset_id)
+
+    @staticmethod
+    def format_history(row, fields=None):
+        if fields is not None:
+            return {field: HISTORY_VALUES[field](row) for field in fields}
+        return {
+            "id": row.id,
+            "status": row.status,
+            "details": row.details,
+            "execution_date": row.timestamp,
+            "test_case": {"id": row.test_case_id, "name": row.test_case_name},
+        }
 
     def format(self):
         return {
@@ -161,3 +391,506 @@ class Execution(db.Model):
             "status": self.status,
             "details": self.details,
         }
+
+
+HISTORY_VALUES = {
+    "id": lambda row: row.id,
+    "status": lambda row: row.status,
+    "details": lambda row: row.details,
+    "execution_date": lambda row: row.timestamp,
+    "test_case": lambda row: {"id": row.test_case_id, "name": row.test_case_name},
+}
+
+
+# ----------------------------------------------------------------------------#
+# Rollups.
+# ----------------------------------------------------------------------------#
+
+ROLLUP_FIELDS = ("asset_id", "test_case_id", "timestamp", "status")
+
+
+class ExecutionRollup(db.Model):
+    """
+    Passed/failed execution counts per asset, test case and day, kept up to
+    date by every execution write so statistics never rescan the history.
+    """
+
+    __tablename__ = "execution_rollup"
+    # The primary key groups an asset's rows by test case, the day indexes
+    # read the history of an asset or a test case in day order.
+    __table_args__ = (
+        Index("ix_execution_rollup_asset_id_day", "asset_id", "day"),
+        Index("ix_execution_rollup_test_case_id_day", "test_case_id", "day"),
+    )
+
+    asset_id: Mapped[int] = mapped_column(ForeignKey("asset.id"), primary_key=True)
+    test_case_id: Mapped[int] = mapped_column(ForeignKey("test_case.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    passed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+"""
+    record_execution_rollups(executions, sign=1)
+    adds (or with sign=-1 removes) executions given as
+    (asset_id, test_case_id, timestamp, status) tuples to the rollup table,
+    one upsert per asset/test case/day inside the current transaction
+"""
+
+
+def record_execution_rollups(executions, sign=1):
+    totals = {}
+    for asset_id, test_case_id, timestamp, status in executions:
+        counts = totals.setdefault((asset_id, test_case_id, timestamp.date()), [0, 0])
+        counts[0 if status else 1] += sign
+    if not totals:
+        return
+
+    table = ExecutionRollup.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.asset_id, table.c.test_case_id, table.c.day],
+        set_={"passed": table.c.passed + stmt.excluded.passed, "failed": table.c.failed + stmt.excluded.failed},
+    )
+    db.session.execute(
+        stmt,
+        [
+            {"asset_id": asset_id, "test_case_id": test_case_id, "day": day, "passed": passed, "failed": failed}
+            for (asset_id, test_case_id, day), (passed, failed) in totals.items()
+        ],
+    )
+
+
+"""
+    rebuild_execution_rollups()
+    recomputes the whole rollup table from the execution history,
+    used to backfill existing databases
+"""
+
+
+def rebuild_execution_rollups():
+    day = func.date(Execution.timestamp)
+    db.session.execute(delete(ExecutionRollup))
+    db.session.execute(
+        ExecutionRollup.__table__.insert().from_select(
+            ["asset_id", "test_case_id", "day", "passed", "failed"],
+            select(
+                Execution.asset_id,
+                Execution.test_case_id,
+                day,
+                func.sum(case((Execution.status, 1), else_=0)),
+                func.sum(case((Execution.status, 0), else_=1)),
+            ).group_by(Execution.asset_id, Execution.test_case_id, day),
+        )
+    )
+    db.session.commit()
+    table_versions.bump(Execution.__tablename__)
+
+
+# ----------------------------------------------------------------------------#
+# Latest status.
+# ----------------------------------------------------------------------------#
+
+
+class LatestExecution(db.Model):
+    """
+    The most recent execution of every test case on every asset, kept up to
+    date by every execution write so the current state of an asset is read
+    without sorting its history.
+    """
+
+    __tablename__ = "latest_execution"
+
+    asset_id: Mapped[int] = mapped_column(ForeignKey("asset.id"), primary_key=True)
+    test_case_id: Mapped[int] = mapped_column(ForeignKey("test_case.id"), primary_key=True)
+    execution_id: Mapped[int] = mapped_column(ForeignKey("execution.id"), nullable=False)
+    status: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    details: Mapped[str] = mapped_column(String(500))
+
+    STATUS_FIELDS = ("test_case", "execution_id", "status", "execution_date", "details")
+
+    @staticmethod
+    def status_query(asset_id: int, fields=None):
+        """
+        status_query(asset_id, fields=None)
+        selects the latest execution per test case of an asset, narrowed to
+        a subset of STATUS_FIELDS when given. test_case_id is always
+        selected, pagination keys on it.
+        """
+        if fields is None:
+            fields = LatestExecution.STATUS_FIELDS
+        columns = {
+            "test_case": (TestCase.name.label("test_case_name"),),
+            "execution_id": (LatestExecution.execution_id,),
+            "status": (LatestExecution.status,),
+            "execution_date": (LatestExecution.timestamp,),
+            "details": (LatestExecution.details,),
+        }
+        stmt = select(LatestExecution.test_case_id, *(column for field in fields for column in columns[field]))
+        if "test_case" in fields:
+            stmt = stmt.join(TestCase, TestCase.id == LatestExecution.test_case_id)
+        return stmt.where(LatestExecution.asset_id == asset_id)
+
+    @staticmethod
+    def format_status(row, fields=None):
+        if fields is not None:
+            return {field: STATUS_VALUES[field](row) for field in fields}
+        return {
+            "test_case": {"id": row.test_case_id, "name": row.test_case_name},
+            "execution_id": row.execution_id,
+            "status": row.status,
+            "execution_date": row.timestamp,
+            "details": row.details,
+        }
+
+
+STATUS_VALUES = {
+    "test_case": lambda row: {"id": row.test_case_id, "name": row.test_case_name},
+    "execution_id": lambda row: row.execution_id,
+    "status": lambda row: row.status,
+    "execution_date": lambda row: row.timestamp,
+    "details": lambda row: row.details,
+}
+
+
+"""
+    record_latest_executions(executions)
+    upserts new executions, given as latest_fields() dicts, into
+    latest_execution inside the current transaction. A row is only
+    replaced by a newer execution (by timestamp, then id).
+"""
+
+
+def record_latest_executions(executions):
+    latest = {}
+    for execution in executions:
+        key = (execution["asset_id"], execution["test_case_id"])
+        if key not in latest or (execution["timestamp"], execution["execution_id"]) > (
+            latest[key]["timestamp"],
+            latest[key]["execution_id"],
+        ):
+            latest[key] = execution
+    if not latest:
+        return
+
+    table = LatestExecution.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.asset_id, table.c.test_case_id],
+        set_={
+            "execution_id": stmt.excluded.execution_id,
+            "status": stmt.excluded.status,
+            "timestamp": stmt.excluded.timestamp,
+            "details": stmt.excluded.details,
+        },
+        where=tuple_(stmt.excluded.timestamp, stmt.excluded.execution_id)
+        > tuple_(table.c.timestamp, table.c.execution_id),
+    )
+    db.session.execute(stmt, list(latest.values()))
+
+
+def latest_execution_select(*criteria):
+    ranked = (
+        select(
+            Execution.asset_id,
+            Execution.test_case_id,
+            Execution.id.label("execution_id"),
+            Execution.status,
+            Execution.timestamp,
+            Execution.details,
+            func.row_number()
+            .over(
+                partition_by=(Execution.asset_id, Execution.test_case_id),
+                order_by=(Execution.timestamp.desc(), Execution.id.desc()),
+            )
+            .label("position"),
+        )
+        .where(*criteria)
+        .subquery()
+    )
+    columns = ["asset_id", "test_case_id", "execution_id", "status", "timestamp", "details"]
+    return columns, select(*(ranked.c[column] for column in columns)).where(ranked.c.position == 1)
+
+
+"""
+    refresh_latest_executions(pairs)
+    recomputes latest_execution for the given (asset_id, test_case_id)
+    pairs from the history, needed after an execution is changed or removed
+"""
+
+
+def refresh_latest_executions(pairs):
+    for asset_id, test_case_id in pairs:
+        db.session.execute(
+            delete(LatestExecution).where(
+                LatestExecution.asset_id == asset_id, LatestExecution.test_case_id == test_case_id
+            )
+        )
+        columns, stmt = latest_execution_select(
+            Execution.asset_id == asset_id, Execution.test_case_id == test_case_id
+        )
+        db.session.execute(LatestExecution.__table__.insert().from_select(columns, stmt))
+
+
+"""
+    rebuild_latest_executions()
+    recomputes the whole latest_execution table from the execution history,
+    used to backfill existing databases
+"""
+
+
+def rebuild_latest_executions():
+    db.session.execute(delete(LatestExecution))
+    columns, stmt = latest_execution_select()
+    db.session.execute(LatestExecution.__table__.insert().from_select(columns, stmt))
+    db.session.commit()
+    table_versions.bump(Execution.__tablename__)
+
+
+# ----------------------------------------------------------------------------#
+# Monthly partitions.
+# ----------------------------------------------------------------------------#
+
+
+def partition_month(timestamp):
+    return timestamp.strftime("%Y-%m")
+
+
+class ExecutionPartition(db.Model):
+    """
+    One row per calendar month of execution history: the id range its
+    executions fall in and how many of them are still in the execution
+    table, kept up to date by every execution write. Time filtered history
+    queries turn since/until into an id range with it, and whole months are
+    moved out of the table by the archive-executions command.
+    """
+
+    __tablename__ = "execution_partition"
+
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)
+    first_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    archived_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+
+"""
+    record_execution_partitions(executions, sign=1)
+    adds (or with sign=-1 removes) executions given as (id, timestamp)
+    pairs to their months, one upsert per month inside the current
+    transaction. Id ranges only ever widen, so they stay a superset.
+"""
+
+
+def record_execution_partitions(executions, sign=1):
+    months = {}
+    for execution_id, timestamp in executions:
+        month = partition_month(timestamp)
+        first_id, last_id, rows = months.get(month, (execution_id, execution_id, 0))
+        months[month] = (min(first_id, execution_id), max(last_id, execution_id), rows + sign)
+    if not months:
+        return
+
+    table = ExecutionPartition.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.month],
+        set_={
+            "first_id": func.min(table.c.first_id, stmt.excluded.first_id),
+            "last_id": func.max(table.c.last_id, stmt.excluded.last_id),
+            "rows": table.c.rows + stmt.excluded.rows,
+        },
+    )
+    db.session.execute(
+        stmt,
+        [
+            {"month": month, "first_id": first_id, "last_id": last_id, "rows": rows, "archived_rows": 0}
+            for month, (first_id, last_id, rows) in months.items()
+        ],
+    )
+
+
+"""
+    rebuild_execution_partitions()
+    recomputes the id ranges and row counts of every month from the
+    execution history, keeping what was recorded about archived rows
+"""
+
+
+def rebuild_execution_partitions():
+    archived = db.session.execute(
+        select(ExecutionPartition.month, ExecutionPartition.archived_rows, ExecutionPartition.archived_at).where(
+            ExecutionPartition.archived_rows > 0
+        )
+    ).all()
+    month = func.strftime("%Y-%m", Execution.timestamp)
+    db.session.execute(delete(ExecutionPartition))
+    db.session.execute(
+        ExecutionPartition.__table__.insert().from_select(
+            ["month", "first_id", "last_id", "rows", "archived_rows"],
+            select(month, func.min(Execution.id), func.max(Execution.id), func.count(), 0).group_by(month),
+        )
+    )
+    for row in archived:
+        partition = db.session.get(ExecutionPartition, row.month)
+        if partition is None:
+            partition = ExecutionPartition(month=row.month, first_id=0, last_id=0, rows=0)
+            db.session.add(partition)
+        partition.archived_rows = row.archived_rows
+        partition.archived_at = row.archived_at
+    db.session.commit()
+    table_versions.bump(Execution.__tablename__)
+
+
+# ----------------------------------------------------------------------------#
+# Full-text search.
+# ----------------------------------------------------------------------------#
+
+# The text columns of each table indexed in its FTS5 table, `<table>_fts`.
+# The FTS5 tables are external content tables: they keep the index only and
+# read the text back from the table itself.
+SEARCH_COLUMNS = {"test_case": ("name", "description"), "execution": ("details",)}
+# bm25 weights per column, a match in a test case name counts ten times one
+# in its description
+SEARCH_RANKS = {"test_case": "bm25(10.0, 1.0)", "execution": "bm25()"}
+
+
+def search_table(model):
+    """
+    search_table(model)
+    the FTS5 table of a model as a lightweight table clause, with its rowid,
+    its rank and the hidden column named after it that MATCH applies to
+    """
+    name = f"{model.__tablename__}_fts"
+    columns = SEARCH_COLUMNS[model.__tablename__]
+    return table(name, column("rowid", Integer), column("rank"), column(name), *(column(key) for key in columns))
+
+
+"""
+    index_search_rows(model, *criteria, sign=1)
+    adds the rows of a model matching criteria to its full-text index, or
+    with sign=-1 removes them, with one INSERT ... SELECT inside the current
+    transaction. Rows are removed by handing FTS5 the values they were
+    indexed with, so removal must come before the rows are updated or
+    deleted, and never autoflushes pending changes.
+
+    Every write path calls these instead of relying on SQLite triggers: an
+    FTS5 insert made by a trigger flushes a new index segment per row,
+    which made batch ingestion about ten times slower.
+"""
+
+
+def index_search_rows(model, *criteria, sign=1):
+    fts = search_table(model)
+    keys = SEARCH_COLUMNS[model.__tablename__]
+    columns = [model.id, *(getattr(model, key) for key in keys)]
+    if sign > 0:
+        stmt = fts.insert().from_select(["rowid", *keys], select(*columns).where(*criteria))
+    else:
+        stmt = fts.insert().from_select(
+            [fts.name, "rowid", *keys], select(literal("delete"), *columns).where(*criteria)
+        )
+    with db.session.no_autoflush:
+        db.session.execute(stmt)
+
+
+def create_search_tables(connection):
+    """
+    create_search_tables(connection)
+    creates the missing FTS5 tables and fills them from their tables
+    """
+    existing = set(inspect(connection).get_table_names())
+    for table_name, columns in SEARCH_COLUMNS.items():
+        name = f"{table_name}_fts"
+        if name in existing:
+            continue
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE {name} USING fts5({', '.join(columns)}, content='{table_name}', "
+            "content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        connection.exec_driver_sql(f"INSERT INTO {name} ({name}, rank) VALUES ('rank', '{SEARCH_RANKS[table_name]}')")
+        connection.exec_driver_sql(f"INSERT INTO {name} ({name}) VALUES ('rebuild')")
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        create_search_tables(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        for table_name in SEARCH_COLUMNS:
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table_name}_fts")
+
+
+def include_schema_object(obj, name, type_, reflected, compare_to):
+    """
+    include_schema_object(obj, name, type_, reflected, compare_to)
+    keeps the FTS5 tables and their shadow tables out of autogenerated
+    migrations, the metadata does not know about them
+    """
+    search_tables = tuple(f"{table_name}_fts" for table_name in SEARCH_COLUMNS)
+    return not (type_ == "table" and reflected and name.startswith(search_tables))
+
+
+"""
+    rebuild_search_index()
+    reindexes every test case and execution from the tables
+"""
+
+
+def rebuild_search_index():
+    for table_name in SEARCH_COLUMNS:
+        db.session.execute(text(f"INSERT INTO {table_name}_fts ({table_name}_fts) VALUES ('rebuild')"))
+    db.session.commit()
+    table_versions.bump(TestCase.__tablename__, Execution.__tablename__)
+
+
+# ----------------------------------------------------------------------------#
+# Ingestion spool.
+# ----------------------------------------------------------------------------#
+
+
+class ExecutionSpool(db.Model):
+    """
+    Execution payloads accepted by POST /executions in queued mode, waiting
+    for the spool writer to insert them. Each row is a ticket clients poll.
+    """
+
+    __tablename__ = "execution_spool"
+    __table_args__ = (Index("ix_execution_spool_state_id", "state", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    ticket: Mapped[str] = mapped_column(String(32), nullable=False, unique=True)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    state: Mapped[str] = mapped_column(String(16), nullable=False, default="queued")
+    execution_id: Mapped[int] = mapped_column(Integer, nullable=True)
+    error: Mapped[str] = mapped_column(String(500), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    processed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    def __init__(self, ticket, payload):
+        self.ticket = ticket
+        self.payload = payload
+
+    @staticmethod
+    def get_by_ticket(ticket: str):
+        return db.session.scalar(select(ExecutionSpool).where(ExecutionSpool.ticket == ticket))
+
+    def insert(self):
+        db.session.add(self)
+        db.session.commit()
+
+    def format(self):
+        return {
+            "ticket": self.ticket,
+            "status": self.state,
+            "execution_id": self.execution_id,
+            "error": self.error,
+            "created_at": self.created_at,
+            "processed_at": self.processed_at,
+        }
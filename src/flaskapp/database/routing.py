@@ -0,0 +1,66 @@
+"""
+Read/write routing for the SQLAlchemy session
+
+"""
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+READER_BIND_KEY = "reader"
+READ_METHODS = ("GET", "HEAD")
+
+
+class RoutingSession(Session):
+    """
+    Sends the queries of GET/HEAD requests to the read-only engine when one is
+    configured, everything else keeps going to the primary engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_reader(clause):
+            return self._db.engines[READER_BIND_KEY]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_reader(self, clause):
+        if not has_request_context() or request.method not in READ_METHODS:
+            return False
+        if READER_BIND_KEY not in self._db.engines:
+            return False
+        if isinstance(clause, UpdateBase) or self._flushing or self.new or self.dirty or self.deleted:
+            return False
+        return True
+
+
+"""
+    reader_bind(app)
+    builds the SQLALCHEMY_BINDS entry of the read-only engine, reusing the
+    primary database unless DATABASE_READER_URI points somewhere else
+"""
+
+
+def reader_bind(app):
+    return {
+        "url": app.config.get("DATABASE_READER_URI") or app.config["SQLALCHEMY_DATABASE_URI"],
+        "pool_size": app.config.get("DATABASE_READER_POOL_SIZE", 5),
+    }
+
+
+"""
+    register_query_only(engine)
+    makes every connection of the engine refuse writes
+"""
+
+
+def register_query_only(engine):
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_query_only(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA query_only = ON")
+        finally:
+            cursor.close()
@@ -0,0 +1,52 @@
+"""
+SQLite engine tuning
+
+"""
+
+from sqlalchemy import event
+
+# Flask config key -> SQLite pragma applied on every new connection.
+# A setting left to None keeps SQLite's own default.
+SQLITE_PRAGMAS = {
+    "SQLITE_JOURNAL_MODE": "journal_mode",
+    "SQLITE_SYNCHRONOUS": "synchronous",
+    "SQLITE_MMAP_SIZE": "mmap_size",
+    "SQLITE_CACHE_SIZE": "cache_size",
+    "SQLITE_TEMP_STORE": "temp_store",
+    "SQLITE_BUSY_TIMEOUT": "busy_timeout",
+}
+
+
+def pragma_statements(config):
+    statements = []
+    for key, pragma in SQLITE_PRAGMAS.items():
+        value = config.get(key)
+        if value is not None:
+            statements.append(f"PRAGMA {pragma} = {value}")
+    return statements
+
+
+"""
+    register_sqlite_pragmas(engine, config)
+    applies the SQLITE_* settings of a flask config to every connection
+    the engine opens, does nothing for other database backends
+"""
+
+
+def register_sqlite_pragmas(engine, config):
+    if engine.dialect.name != "sqlite":
+        return
+
+    statements = pragma_statements(config)
+    if not statements:
+        return
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+                cursor.fetchall()
+        finally:
+            cursor.close()
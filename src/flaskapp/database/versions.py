@@ -0,0 +1,164 @@
+"""
+Per-table version counters, bumped after every committed write
+
+"""
+
+import hashlib
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import threading
+import zlib
+
+COUNTER = struct.Struct("Q")
+
+
+class LocalVersionStore:
+    """
+    Counters living in this process only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def get(self, tables):
+        return tuple(self._versions.get(table, 0) for table in tables)
+
+
+class MmapVersionStore:
+    """
+    Counters kept in a memory-mapped file, so every process mapping the same
+    path (e.g. all gunicorn workers) sees a bump as soon as it happens.
+    Tables are hashed into a fixed number of slots, a collision only means
+    some extra invalidations.
+    """
+
+    def __init__(self, path, slots=256):
+        import fcntl
+
+        self._fcntl = fcntl
+        self._lock = threading.Lock()
+        self.slots = slots
+        size = slots * COUNTER.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_uid != os.getuid():
+            os.close(self._fd)
+            raise RuntimeError(f"{path} belongs to another user.")
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def _offset(self, table):
+        return zlib.crc32(table.encode()) % self.slots * COUNTER.size
+
+    def bump(self, tables):
+        # lockf locks belong to the process, the thread lock covers this one.
+        with self._lock:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_EX)
+            try:
+                for table in tables:
+                    offset = self._offset(table)
+                    (version,) = COUNTER.unpack_from(self._map, offset)
+                    COUNTER.pack_into(self._map, offset, version + 1)
+            finally:
+                self._fcntl.lockf(self._fd, self._fcntl.LOCK_UN)
+
+    def get(self, tables):
+        return tuple(COUNTER.unpack_from(self._map, self._offset(table))[0] for table in tables)
+
+
+class RedisVersionStore:
+    """
+    Counters kept in Redis (or any server speaking its protocol), shared by
+    processes on every host that can reach it.
+    """
+
+    def __init__(self, url, prefix="flaskapp:version:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def bump(self, tables):
+        pipeline = self.client.pipeline()
+        for table in tables:
+            pipeline.incr(self.prefix + table)
+        pipeline.execute()
+
+    def get(self, tables):
+        return tuple(int(version or 0) for version in self.client.mget([self.prefix + table for table in tables]))
+
+
+class TableVersions:
+    def __init__(self):
+        self.store = LocalVersionStore()
+
+    def bump(self, *tables):
+        self.store.bump(tables)
+
+    def get(self, tables):
+        return self.store.get(tables)
+
+
+table_versions = TableVersions()
+
+
+def database_digest(app):
+    return hashlib.blake2b(app.config["DATABASE_URI"].encode(), digest_size=8).hexdigest()
+
+
+"""
+    private_directory(path)
+    creates a directory only this user can use, and refuses an existing one
+    owned by someone else or writable by others, since the file cache
+    unpickles what it finds there
+"""
+
+
+def private_directory(path):
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise RuntimeError(f"{path} must be a directory owned and only writable by the user running the app.")
+    return path
+
+
+"""
+    runtime_path(app, name)
+    a path in the directory of this user and database, under /dev/shm where
+    available, so two deployments on one host never share version counters
+    or cached responses
+"""
+
+
+def runtime_path(app, name):
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    directory = private_directory(os.path.join(base, f"flaskapp-{os.getuid()}-{database_digest(app)}"))
+    return os.path.join(directory, name)
+
+
+"""
+    init_table_versions(app)
+    picks where the process-wide counters live from TABLE_VERSIONS:
+    "local" (this process), "shared" (an mmap file, at TABLE_VERSIONS_PATH
+    or in the runtime directory of the database) or "redis" (CACHE_REDIS_URL)
+"""
+
+
+def init_table_versions(app):
+    mode = app.config.get("TABLE_VERSIONS", "local")
+    if mode == "shared":
+        path = app.config.get("TABLE_VERSIONS_PATH") or runtime_path(app, "table-versions")
+        table_versions.store = MmapVersionStore(path)
+    elif mode == "redis":
+        table_versions.store = RedisVersionStore(
+            app.config["CACHE_REDIS_URL"], prefix=f"flaskapp:{database_digest(app)}:version:"
+        )
@@ -0,0 +1,174 @@
+"""
+Bulk export of the execution history as CSV, Arrow IPC or Parquet
+
+"""
+
+import csv
+import io
+from importlib.util import find_spec
+
+from flask import Response, current_app, stream_with_context
+from sqlalchemy import select
+
+from flaskapp.database.models import Execution, db
+
+# pyarrow is imported by the writers that need it, it would otherwise be a
+# good part of the import time of every process.
+PYARROW_AVAILABLE = find_spec("pyarrow") is not None
+
+EXPORT_COLUMNS = ("id", "asset_id", "test_case_id", "timestamp", "status", "details")
+
+
+def export_query(*criteria):
+    return select(*(getattr(Execution, column) for column in EXPORT_COLUMNS)).where(*criteria).order_by(Execution.id)
+
+
+# ----------------------------------------------------------------------------#
+# Writers, each turning batches of rows into chunks of the output.
+# ----------------------------------------------------------------------------#
+
+
+class ChunkSink(io.RawIOBase):
+    """
+    A write-only file keeping what the Arrow writers write until drain()
+    hands it out, so their output can be streamed as it is produced.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def csv_row(row):
+    return (row.id, row.asset_id, row.test_case_id, row.timestamp.isoformat(sep=" "), int(row.status), row.details)
+
+
+def csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(csv_row(row) for row in batch)
+        yield buffer.getvalue()
+
+
+def arrow_schema():
+    import pyarrow
+
+    return pyarrow.schema(
+        [
+            ("id", pyarrow.int64()),
+            ("asset_id", pyarrow.int64()),
+            ("test_case_id", pyarrow.int64()),
+            ("timestamp", pyarrow.timestamp("us")),
+            ("status", pyarrow.bool_()),
+            ("details", pyarrow.string()),
+        ]
+    )
+
+
+def arrow_batch(rows, schema):
+    import pyarrow
+
+    # One transpose instead of a getattr per cell.
+    return pyarrow.RecordBatch.from_arrays(
+        [pyarrow.array(values, type=field.type) for values, field in zip(zip(*rows), schema)], schema=schema
+    )
+
+
+def arrow_chunks(batches):
+    import pyarrow.ipc
+
+    sink = ChunkSink()
+    schema = arrow_schema()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        yield sink.drain()
+        for batch in batches:
+            writer.write_batch(arrow_batch(batch, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def parquet_chunks(batches):
+    import pyarrow.parquet
+
+    # Every batch becomes a row group, the footer goes out at the end.
+    sink = ChunkSink()
+    schema = arrow_schema()
+    with pyarrow.parquet.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for batch in batches:
+            writer.write_batch(arrow_batch(batch, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+# name: (mimetype, file extension, writer, needs pyarrow)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv", csv_chunks, False),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows", arrow_chunks, True),
+    "parquet": ("application/vnd.apache.parquet", "parquet", parquet_chunks, True),
+}
+
+
+def export_format(flask_request):
+    """
+    export_format(flask_request)
+    the format asked for with ?format=, or else through the Accept header,
+    CSV by default. Raises ValueError for an unknown format or one that
+    needs pyarrow when it is not installed.
+    """
+    name = flask_request.args.get("format")
+    if name is None:
+        mimetypes = {mimetype: key for key, (mimetype, *_) in EXPORT_FORMATS.items()}
+        name = mimetypes.get(flask_request.accept_mimetypes.best_match(list(mimetypes)), "csv")
+    if name not in EXPORT_FORMATS:
+        raise ValueError(f"The format argument must be one of {', '.join(EXPORT_FORMATS)}.")
+    if EXPORT_FORMATS[name][3] and not PYARROW_AVAILABLE:
+        raise ValueError(f"The {name} format is not available, the server is missing pyarrow.")
+    return name
+
+
+"""
+    export_response(stmt, name)
+    streams the rows of a select statement in an EXPORT_FORMATS format. Rows
+    are fetched EXPORT_BATCH_SIZE at a time and every batch is written out
+    before the next one is read, so memory does not grow with the table.
+"""
+
+
+def export_response(stmt, name):
+    mimetype, extension, writer, _ = EXPORT_FORMATS[name]
+    batch_size = current_app.config.get("EXPORT_BATCH_SIZE", 10000)
+    # Core rows from the session's connection, the ORM would only add a
+    # loading step per row for a select of plain columns.
+    result = db.session.connection().execute(stmt.execution_options(yield_per=batch_size))
+
+    def generate():
+        try:
+            yield from writer(result.partitions())
+        finally:
+            result.close()
+
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=executions.{extension}"
+    return response
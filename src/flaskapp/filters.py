@@ -0,0 +1,103 @@
+"""
+Query string filters for the execution history
+
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+from flaskapp.database.models import Execution
+
+ORDERS = ("asc", "desc")
+
+
+def parse_timestamp(value):
+    """
+    parse_timestamp(value)
+    reads an ISO date or datetime, aware values are converted to the naive
+    UTC timestamps executions are stored with
+    """
+    # fromisoformat only reads a trailing Z from Python 3.11 on.
+    if value[-1:] in ("Z", "z"):
+        value = value[:-1] + "+00:00"
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)  # noqa: UP017 (datetime.UTC is 3.11+)
+    return timestamp
+
+
+def is_date(value):
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def execution_criteria(flask_request):
+    """
+    execution_criteria(flask_request)
+    turns the optional `status`, `test_case_id`, `since` and `until`
+    arguments of a request into WHERE clauses on Execution, raises
+    ValueError when one cannot be parsed. Both bounds are inclusive, an
+    until date without a time includes the whole day.
+    """
+    criteria = []
+    args = flask_request.args
+
+    status = args.get("status")
+    if status is not None:
+        if status.lower() not in ("true", "false", "1", "0"):
+            raise ValueError("The status argument must be true or false.")
+        criteria.append(Execution.status == (status.lower() in ("true", "1")))
+
+    test_case_id = args.get("test_case_id")
+    if test_case_id is not None:
+        if not test_case_id.isdigit():
+            raise ValueError("The test_case_id argument must be an integer.")
+        criteria.append(Execution.test_case_id == int(test_case_id))
+
+    since, until = execution_time_range(flask_request)
+    if since is not None:
+        criteria.append(Execution.timestamp >= since)
+    if until is not None:
+        if is_date(args["until"]):
+            # A date without a time takes in that whole day.
+            criteria.append(Execution.timestamp < until + timedelta(days=1))
+        else:
+            criteria.append(Execution.timestamp <= until)
+
+    return criteria
+
+
+def asset_criteria(flask_request):
+    """
+    asset_criteria(flask_request)
+    the optional `asset_id` argument of the endpoints spanning every asset
+    """
+    asset_id = flask_request.args.get("asset_id")
+    if asset_id is None:
+        return []
+    if not asset_id.isdigit():
+        raise ValueError("The asset_id argument must be an integer.")
+    return [Execution.asset_id == int(asset_id)]
+
+
+def execution_time_range(flask_request):
+    """
+    execution_time_range(flask_request)
+    the parsed `since` and `until` arguments, None when missing
+    """
+    args = flask_request.args
+    try:
+        since = parse_timestamp(args["since"]) if args.get("since") else None
+        until = parse_timestamp(args["until"]) if args.get("until") else None
+    except ValueError:
+        raise ValueError("The since and until arguments must be ISO dates or datetimes.")
+    return since, until
+
+
+def execution_order(flask_request):
+    order = flask_request.args.get("order", "asc").lower()
+    if order not in ORDERS:
+        raise ValueError(f"The order argument must be one of {', '.join(ORDERS)}.")
+    return order
@@ -0,0 +1,174 @@
+"""
+Bulk ingestion of execution results
+
+"""
+
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert, select
+
+from flaskapp.database.models import (
+    ROLLUP_FIELDS,
+    Asset,
+    Execution,
+    TestCase,
+    adjust_row_count,
+    db,
+    index_search_rows,
+    record_execution_partitions,
+    record_execution_rollups,
+    record_latest_executions,
+)
+from flaskapp.database.versions import table_versions
+
+REQUIRED_EXECUTION_FIELDS = ("status", "details", "asset_id", "test_case_id")
+MAX_DETAILS_LENGTH = Execution.__table__.c.details.type.length
+
+
+def parse_batch(flask_request):
+    """
+    parse_batch(flask_request)
+    reads a batch body sent either as a JSON array or as NDJSON
+    (one JSON object per line), returning a list of items.
+    Lines that cannot be decoded are kept as exceptions so they can be
+    reported next to the item index they belong to.
+    """
+    if flask_request.mimetype == "application/x-ndjson":
+        items = []
+        for line in flask_request.stream:
+            if not line.strip():
+                continue
+            try:
+                items.append(current_app.json.loads(line))
+            except ValueError as e:
+                items.append(e)
+        return items
+
+    body = flask_request.get_json()
+    if not isinstance(body, list):
+        raise ValueError("The request body must be a JSON array or NDJSON stream.")
+    return body
+
+
+def parse_id(value):
+    """
+    parse_id(value)
+    reads an asset or test case id sent as a JSON integer or, as the API
+    always accepted, a string of digits. Floats and booleans are refused
+    instead of being truncated.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        return int(value)
+    raise ValueError("The asset_id and test_case_id fields must be integers.")
+
+
+def validate_execution(item):
+    if isinstance(item, Exception):
+        raise ValueError(f"Invalid JSON: {item}")
+    if not isinstance(item, dict) or any(field not in item for field in REQUIRED_EXECUTION_FIELDS):
+        raise ValueError("The item must contain 'status', 'details', 'asset_id', and 'test_case_id' fields.")
+    if item["status"] not in [True, False]:
+        raise ValueError("The status field must be a boolean.")
+    asset_id = parse_id(item["asset_id"])
+    test_case_id = parse_id(item["test_case_id"])
+    if not isinstance(item["details"], str) or len(item["details"]) > MAX_DETAILS_LENGTH:
+        raise ValueError(f"The details field must be a string of at most {MAX_DETAILS_LENGTH} characters.")
+    return {
+        "asset_id": asset_id,
+        "test_case_id": test_case_id,
+        "status": item["status"],
+        "details": item["details"],
+    }
+
+
+def existing_ids(model, ids):
+    if not ids:
+        return set()
+    return set(db.session.scalars(select(model.id).where(model.id.in_(ids))))
+
+
+def prepare_executions(items):
+    """
+    prepare_executions(items)
+    validates a list of execution payloads, checking every
+    asset_id/test_case_id with one IN query per table.
+    Returns the result list, filled in for the rejected items, and the
+    (index, row) pairs that can be inserted.
+    """
+    results = [None] * len(items)
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            rows.append((index, validate_execution(item)))
+        except ValueError as e:
+            results[index] = {"index": index, "success": False, "error": str(e)}
+
+    asset_ids = existing_ids(Asset, {row["asset_id"] for _, row in rows})
+    test_case_ids = existing_ids(TestCase, {row["test_case_id"] for _, row in rows})
+
+    valid_rows = []
+    for index, row in rows:
+        if row["asset_id"] not in asset_ids:
+            results[index] = {"index": index, "success": False, "error": "The asset was not found in the database."}
+        elif row["test_case_id"] not in test_case_ids:
+            results[index] = {
+                "index": index,
+                "success": False,
+                "error": "The test case was not found in the database.",
+            }
+        else:
+            valid_rows.append((index, row))
+
+    return results, valid_rows
+
+
+def insert_executions(rows, results):
+    """
+    insert_executions(rows, results)
+    inserts (index, row) pairs with two INSERT statements and maintains the
+    counters, rollups, latest executions, partitions and search index,
+    without committing. Rows without a timestamp are stamped with the
+    current time.
+    """
+    timestamp = datetime.utcnow()
+    for _, row in rows:
+        row.setdefault("timestamp", timestamp)
+
+    # SQLite does not define the order of RETURNING rows, so a sorted RETURNING
+    # would go out one INSERT per row. Inserting the first row takes the write
+    # lock, no other connection can add rows until we commit, so the ids
+    # after it are ours to assign and the rest go out as one executemany.
+    first_id = db.session.scalar(insert(Execution).returning(Execution.id), rows[0][1])
+    ids = range(first_id, first_id + len(rows))
+    if len(rows) > 1:
+        db.session.execute(
+            insert(Execution), [{**row, "id": execution_id} for (_, row), execution_id in zip(rows[1:], ids[1:])]
+        )
+    adjust_row_count(Execution, len(rows))
+    record_execution_rollups(tuple(row[key] for key in ROLLUP_FIELDS) for _, row in rows)
+    record_latest_executions({**row, "execution_id": execution_id} for (_, row), execution_id in zip(rows, ids))
+    record_execution_partitions((execution_id, row["timestamp"]) for (_, row), execution_id in zip(rows, ids))
+    index_search_rows(Execution, Execution.id.between(ids[0], ids[-1]))
+
+    for (index, _), execution_id in zip(rows, ids):
+        results[index] = {"index": index, "success": True, "id": execution_id}
+
+
+def ingest_executions(items):
+    """
+    ingest_executions(items)
+    validates and inserts a list of execution payloads, committing in
+    chunks of EXECUTION_BATCH_CHUNK_SIZE. Returns one result dict per item.
+    """
+    results, valid_rows = prepare_executions(items)
+
+    chunk_size = current_app.config.get("EXECUTION_BATCH_CHUNK_SIZE", 500)
+    for start in range(0, len(valid_rows), chunk_size):
+        insert_executions(valid_rows[start : start + chunk_size], results)
+        db.session.commit()
+        table_versions.bump(Execution.__tablename__)
+
+    return results
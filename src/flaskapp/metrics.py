@@ -0,0 +1,337 @@
+"""
+Request timing, SQL instrumentation and Prometheus metrics
+
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from flaskapp.database.models import db
+from flaskapp.database.versions import private_directory, runtime_path
+
+METRICS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+ARCHIVE_FILENAME = "metrics-archive.json"
+
+# name: (help, buckets)
+HISTOGRAMS = {
+    "flaskapp_request_duration_seconds": (
+        "Time spent handling a request.",
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    ),
+    "flaskapp_request_sql_duration_seconds": (
+        "Time spent in SQL statements per request.",
+        (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    ),
+    "flaskapp_request_sql_queries": (
+        "SQL statements sent per request.",
+        (0, 1, 2, 3, 5, 10, 20, 50, 100),
+    ),
+    "flaskapp_request_serialization_duration_seconds": (
+        "Time spent encoding JSON responses per request.",
+        (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+    ),
+}
+
+
+def to_snapshot(samples):
+    """
+    to_snapshot(samples)
+    turns {(name, labels): sample} into JSON-friendly lists
+    """
+    return [[name, [list(label) for label in labels], list(sample)] for (name, labels), sample in samples.items()]
+
+
+class Histograms:
+    """
+    The histograms of this process, one sample per metric name and label
+    set. A sample is its cumulative bucket counts followed by count and sum.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, labels)
+        with self._lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = [0] * (len(buckets) + 2)
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    sample[index] += 1
+            sample[-2] += 1
+            sample[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return to_snapshot(self.samples)
+
+    def clear(self):
+        with self._lock:
+            self.samples.clear()
+
+
+histograms = Histograms()
+
+
+def merge_snapshots(snapshots):
+    merged = {}
+    for snapshot in snapshots:
+        for name, labels, sample in snapshot:
+            if name not in HISTOGRAMS or len(sample) != len(HISTOGRAMS[name][1]) + 2:
+                continue
+            key = (name, tuple(tuple(label) for label in labels))
+            total = merged.setdefault(key, [0] * len(sample))
+            for index, value in enumerate(sample):
+                total[index] += value
+    return merged
+
+
+# ----------------------------------------------------------------------------#
+# Multiprocess directory.
+# ----------------------------------------------------------------------------#
+
+
+def process_file(directory, pid=None):
+    return os.path.join(directory, f"metrics-{pid or os.getpid()}.json")
+
+
+def write_snapshot(path, snapshot):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+"""
+    flush_metrics(directory)
+    writes the histograms of this process to its own file in the shared
+    directory, so /metrics in any worker can add them up
+"""
+
+
+def flush_metrics(directory):
+    write_snapshot(process_file(directory), histograms.snapshot())
+
+
+def collect_metrics(directory=None):
+    if directory is None:
+        return merge_snapshots([histograms.snapshot()])
+    flush_metrics(directory)
+    paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json")]
+    return merge_snapshots(read_snapshot(path) for path in paths)
+
+
+"""
+    mark_process_dead(directory, pid)
+    folds the file of an exited worker into the archive file, so the totals
+    keep counting its requests while the directory stays one file per live
+    worker. Called from the gunicorn master (see gunicorn.conf.py).
+"""
+
+
+def mark_process_dead(directory, pid):
+    path = process_file(directory, pid)
+    if not os.path.exists(path):
+        return
+    archive = os.path.join(directory, ARCHIVE_FILENAME)
+    merged = merge_snapshots([read_snapshot(archive), read_snapshot(path)])
+    write_snapshot(archive, to_snapshot(merged))
+    os.remove(path)
+
+
+def reset_metrics_dir(directory):
+    private_directory(directory)
+    for name in os.listdir(directory):
+        if name.endswith(".json"):
+            os.remove(os.path.join(directory, name))
+
+
+"""
+    metrics_dir(app)
+    the directory the processes of the app add their histograms up in:
+    METRICS_DIR, or with METRICS_SHARED one in the runtime directory of the
+    user and database. None when the histograms only cover this process.
+"""
+
+
+def metrics_dir(app):
+    if not app.config.get("METRICS_ENABLED", False):
+        return None
+    if app.config.get("METRICS_DIR"):
+        return private_directory(app.config["METRICS_DIR"])
+    if app.config.get("METRICS_SHARED", False):
+        return private_directory(runtime_path(app, "metrics"))
+    return None
+
+
+# ----------------------------------------------------------------------------#
+# Exposition.
+# ----------------------------------------------------------------------------#
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_bound(bound):
+    return repr(float(bound))
+
+
+def render_metrics(merged):
+    """
+    render_metrics(merged)
+    writes merged histogram samples in the Prometheus text format
+    """
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (sample_name, labels), sample in sorted(merged.items()):
+            if sample_name != name:
+                continue
+            label_text = ",".join(f'{key}="{escape_label(value)}"' for key, value in labels)
+            prefix = f"{label_text}," if label_text else ""
+            for bound, count in zip(buckets, sample):
+                lines.append(f'{name}_bucket{{{prefix}le="{format_bound(bound)}"}} {count}')
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {sample[-2]}')
+            lines.append(f"{name}_count{{{label_text}}} {sample[-2]}")
+            lines.append(f"{name}_sum{{{label_text}}} {sample[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------------#
+# Request hooks.
+# ----------------------------------------------------------------------------#
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    # The spool writer thread and CLI commands have no request to charge.
+    if has_request_context() and "metrics_start" in g:
+        g.sql_queries += 1
+        g.sql_time += elapsed
+
+
+def handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute.
+    if exception_context.connection is not None and exception_context.connection.info.get("query_start"):
+        exception_context.connection.info["query_start"].pop()
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+def instrument_json(provider):
+    """
+    instrument_json(provider)
+    times every jsonify() of the request, which is where responses are
+    encoded, by wrapping the response method of the app's JSON provider
+    """
+    response = provider.response
+
+    def timed_response(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return response(*args, **kwargs)
+        finally:
+            if has_request_context() and "metrics_start" in g:
+                g.serialize_time += time.perf_counter() - start
+
+    provider.response = timed_response
+
+
+def start_request_timer():
+    g.metrics_start = time.perf_counter()
+    g.sql_queries = 0
+    g.sql_time = 0.0
+    g.serialize_time = 0.0
+
+
+def server_timing():
+    total = time.perf_counter() - g.metrics_start
+    return (
+        f'db;dur={g.sql_time * 1000:.2f};desc="{g.sql_queries} queries", '
+        f"serialize;dur={g.serialize_time * 1000:.2f}, "
+        f"app;dur={max(total - g.sql_time - g.serialize_time, 0) * 1000:.2f}, "
+        f"total;dur={total * 1000:.2f}"
+    ), total
+
+
+def record_request(response):
+    if "metrics_start" not in g:
+        return response
+
+    header, total = server_timing()
+    if current_app.config.get("METRICS_SERVER_TIMING", True):
+        response.headers["Server-Timing"] = header
+
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    if route == "/metrics":
+        return response
+    labels = (("method", request.method), ("route", route), ("status", str(response.status_code)))
+    histograms.observe("flaskapp_request_duration_seconds", labels, total)
+    histograms.observe("flaskapp_request_sql_duration_seconds", labels, g.sql_time)
+    histograms.observe("flaskapp_request_sql_queries", labels, g.sql_queries)
+    histograms.observe("flaskapp_request_serialization_duration_seconds", labels, g.serialize_time)
+
+    directory = current_app.extensions["metrics"]["directory"]
+    interval = current_app.config.get("METRICS_FLUSH_INTERVAL", 1.0)
+    now = time.monotonic()
+    if directory and now - current_app.extensions["metrics"]["flushed"] >= interval:
+        current_app.extensions["metrics"]["flushed"] = now
+        flush_metrics(directory)
+    return response
+
+
+"""
+    init_metrics(app)
+    when METRICS_ENABLED, times every request and its SQL statements and
+    JSON encoding, adds a Server-Timing header and serves the per-route
+    histograms on /metrics. With METRICS_DIR set, the histograms of every
+    process writing to that directory are added up, see metrics_dir.
+"""
+
+
+def init_metrics(app):
+    if not app.config.get("METRICS_ENABLED", False):
+        return
+
+    app.extensions["metrics"] = {"flushed": 0.0, "directory": metrics_dir(app)}
+
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+
+    instrument_json(app.json)
+    app.before_request(start_request_timer)
+    app.after_request(record_request)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        body = render_metrics(collect_metrics(app.extensions["metrics"]["directory"]))
+        return app.response_class(body, content_type=METRICS_MIMETYPE)
@@ -0,0 +1,50 @@
+"""add execution rollup
+
+Revision ID: 7c3993cab2fd
+Revises: b4f53460e732
+Create Date: 2026-10-18 16:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3993cab2fd'
+down_revision = 'b4f53460e732'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'execution_rollup' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('execution_rollup',
+        sa.Column('asset_id', sa.Integer(), nullable=False),
+        sa.Column('test_case_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('passed', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['asset_id'], ['asset.id'], ),
+        sa.ForeignKeyConstraint(['test_case_id'], ['test_case.id'], ),
+        sa.PrimaryKeyConstraint('asset_id', 'test_case_id', 'day')
+        )
+        with op.batch_alter_table('execution_rollup', schema=None) as batch_op:
+            batch_op.create_index('ix_execution_rollup_test_case_id_day', ['test_case_id', 'day'], unique=False)
+
+    # Backfill from the existing history.
+    op.execute(
+        "DELETE FROM execution_rollup"
+    )
+    op.execute(
+        "INSERT INTO execution_rollup (asset_id, test_case_id, day, passed, failed) "
+        "SELECT asset_id, test_case_id, date(timestamp), "
+        "SUM(CASE WHEN status THEN 1 ELSE 0 END), SUM(CASE WHEN status THEN 0 ELSE 1 END) "
+        "FROM execution GROUP BY asset_id, test_case_id, date(timestamp)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('execution_rollup', schema=None) as batch_op:
+        batch_op.drop_index('ix_execution_rollup_test_case_id_day')
+
+    op.drop_table('execution_rollup')
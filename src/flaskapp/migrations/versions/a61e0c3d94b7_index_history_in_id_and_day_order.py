@@ -0,0 +1,32 @@
+"""index history in id and day order
+
+Revision ID: a61e0c3d94b7
+Revises: f3b8a2d61c47
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a61e0c3d94b7'
+down_revision = 'f3b8a2d61c47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('execution', schema=None) as batch_op:
+        batch_op.drop_index('ix_execution_test_case_id_timestamp', if_exists=True)
+        batch_op.create_index('ix_execution_test_case_id_id', ['test_case_id', 'id'], unique=False, if_not_exists=True)
+    with op.batch_alter_table('execution_rollup', schema=None) as batch_op:
+        batch_op.create_index('ix_execution_rollup_asset_id_day', ['asset_id', 'day'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    with op.batch_alter_table('execution_rollup', schema=None) as batch_op:
+        batch_op.drop_index('ix_execution_rollup_asset_id_day')
+    with op.batch_alter_table('execution', schema=None) as batch_op:
+        batch_op.drop_index('ix_execution_test_case_id_id')
+        batch_op.create_index('ix_execution_test_case_id_timestamp', ['test_case_id', 'timestamp'], unique=False)
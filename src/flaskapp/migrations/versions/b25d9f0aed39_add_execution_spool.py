@@ -0,0 +1,38 @@
+"""add execution spool
+
+Revision ID: b25d9f0aed39
+Revises: fb19e39fdf30
+Create Date: 2026-10-18 17:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b25d9f0aed39'
+down_revision = 'fb19e39fdf30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'execution_spool' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('execution_spool',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('ticket', sa.String(length=32), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('state', sa.String(length=16), nullable=False),
+        sa.Column('execution_id', sa.Integer(), nullable=True),
+        sa.Column('error', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('ticket')
+        )
+    with op.batch_alter_table('execution_spool', schema=None) as batch_op:
+        batch_op.create_index('ix_execution_spool_state_id', ['state', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_table('execution_spool')
@@ -0,0 +1,30 @@
+"""add execution lookup indexes
+
+Revision ID: b4f53460e732
+Revises: dbe4160e9f29
+Create Date: 2026-10-18 15:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4f53460e732'
+down_revision = 'dbe4160e9f29'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('execution', schema=None) as batch_op:
+        batch_op.create_index('ix_execution_asset_id_id', ['asset_id', 'id'], unique=False, if_not_exists=True)
+        batch_op.create_index('ix_execution_test_case_id_timestamp', ['test_case_id', 'timestamp'], unique=False, if_not_exists=True)
+        batch_op.create_index('ix_execution_asset_id_timestamp', ['asset_id', 'timestamp'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    with op.batch_alter_table('execution', schema=None) as batch_op:
+        batch_op.drop_index('ix_execution_asset_id_timestamp')
+        batch_op.drop_index('ix_execution_test_case_id_timestamp')
+        batch_op.drop_index('ix_execution_asset_id_id')
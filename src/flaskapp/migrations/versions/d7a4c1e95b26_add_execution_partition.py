@@ -0,0 +1,43 @@
+"""add execution partition
+
+Revision ID: d7a4c1e95b26
+Revises: ebe52959a908
+Create Date: 2026-10-18 19:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a4c1e95b26'
+down_revision = 'ebe52959a908'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'execution_partition' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('execution_partition',
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('first_id', sa.Integer(), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.Column('rows', sa.Integer(), nullable=False),
+        sa.Column('archived_rows', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('month')
+        )
+
+    # Backfill from the existing history.
+    op.execute(
+        "DELETE FROM execution_partition"
+    )
+    op.execute(
+        "INSERT INTO execution_partition (month, first_id, last_id, rows, archived_rows) "
+        "SELECT strftime('%Y-%m', timestamp), min(id), max(id), count(*), 0 FROM execution "
+        "GROUP BY strftime('%Y-%m', timestamp)"
+    )
+
+
+def downgrade():
+    op.drop_table('execution_partition')
@@ -0,0 +1,61 @@
+"""initial schema
+
+Revision ID: dbe4160e9f29
+Revises:
+Create Date: 2026-10-18 15:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'dbe4160e9f29'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so the tables usually exist already
+    # by the time `flask db upgrade` gets to run.
+    existing_tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'test_case' not in existing_tables:
+        op.create_table('test_case',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'asset' not in existing_tables:
+        op.create_table('asset',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'execution' not in existing_tables:
+        op.create_table('execution',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('test_case_id', sa.Integer(), nullable=False),
+        sa.Column('asset_id', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.Boolean(), nullable=False),
+        sa.Column('details', sa.String(length=500), nullable=False),
+        sa.ForeignKeyConstraint(['asset_id'], ['asset.id'], ),
+        sa.ForeignKeyConstraint(['test_case_id'], ['test_case.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'row_count' not in existing_tables:
+        op.create_table('row_count',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name')
+        )
+
+
+def downgrade():
+    op.drop_table('row_count')
+    op.drop_table('execution')
+    op.drop_table('asset')
+    op.drop_table('test_case')
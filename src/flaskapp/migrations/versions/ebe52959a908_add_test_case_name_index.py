@@ -0,0 +1,26 @@
+"""add test case name index
+
+Revision ID: ebe52959a908
+Revises: f39ec00642a2
+Create Date: 2026-10-18 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ebe52959a908'
+down_revision = 'f39ec00642a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('test_case', schema=None) as batch_op:
+        batch_op.create_index('ix_test_case_name', ['name'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    with op.batch_alter_table('test_case', schema=None) as batch_op:
+        batch_op.drop_index('ix_test_case_name')
@@ -0,0 +1,28 @@
+"""add execution filter indexes
+
+Revision ID: f39ec00642a2
+Revises: b25d9f0aed39
+Create Date: 2026-10-18 17:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f39ec00642a2'
+down_revision = 'b25d9f0aed39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('execution', schema=None) as batch_op:
+        batch_op.create_index('ix_execution_asset_id_status', ['asset_id', 'status'], unique=False, if_not_exists=True)
+        batch_op.create_index('ix_execution_asset_id_test_case_id', ['asset_id', 'test_case_id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    with op.batch_alter_table('execution', schema=None) as batch_op:
+        batch_op.drop_index('ix_execution_asset_id_test_case_id')
+        batch_op.drop_index('ix_execution_asset_id_status')
@@ -0,0 +1,41 @@
+"""add search index
+
+Revision ID: f3b8a2d61c47
+Revises: d7a4c1e95b26
+Create Date: 2026-10-18 21:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8a2d61c47'
+down_revision = 'd7a4c1e95b26'
+branch_labels = None
+depends_on = None
+
+SEARCH_TABLES = {
+    'test_case': ('name, description', 'bm25(10.0, 1.0)'),
+    'execution': ('details', 'bm25()'),
+}
+
+
+def upgrade():
+    existing = sa.inspect(op.get_bind()).get_table_names()
+    for table_name, (columns, rank) in SEARCH_TABLES.items():
+        name = f'{table_name}_fts'
+        if name in existing:
+            continue
+        op.execute(
+            f"CREATE VIRTUAL TABLE {name} USING fts5({columns}, content='{table_name}', "
+            "content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(f"INSERT INTO {name} ({name}, rank) VALUES ('rank', '{rank}')")
+        # Backfill from the existing rows.
+        op.execute(f"INSERT INTO {name} ({name}) VALUES ('rebuild')")
+
+
+def downgrade():
+    for table_name in SEARCH_TABLES:
+        op.execute(f'DROP TABLE IF EXISTS {table_name}_fts')
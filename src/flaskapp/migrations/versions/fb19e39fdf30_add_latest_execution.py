@@ -0,0 +1,47 @@
+"""add latest execution
+
+Revision ID: fb19e39fdf30
+Revises: 7c3993cab2fd
+Create Date: 2026-10-18 16:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fb19e39fdf30'
+down_revision = '7c3993cab2fd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'latest_execution' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('latest_execution',
+        sa.Column('asset_id', sa.Integer(), nullable=False),
+        sa.Column('test_case_id', sa.Integer(), nullable=False),
+        sa.Column('execution_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Boolean(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('details', sa.String(length=500), nullable=True),
+        sa.ForeignKeyConstraint(['asset_id'], ['asset.id'], ),
+        sa.ForeignKeyConstraint(['execution_id'], ['execution.id'], ),
+        sa.ForeignKeyConstraint(['test_case_id'], ['test_case.id'], ),
+        sa.PrimaryKeyConstraint('asset_id', 'test_case_id')
+        )
+
+    # Backfill from the existing history.
+    op.execute(
+        "DELETE FROM latest_execution"
+    )
+    op.execute(
+        "INSERT INTO latest_execution (asset_id, test_case_id, execution_id, status, timestamp, details) "
+        "SELECT asset_id, test_case_id, id, status, timestamp, details FROM ("
+        "SELECT *, row_number() OVER (PARTITION BY asset_id, test_case_id ORDER BY timestamp DESC, id DESC) AS position "
+        "FROM execution) WHERE position = 1"
+    )
+
+
+def downgrade():
+    op.drop_table('latest_execution')
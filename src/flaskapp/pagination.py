@@ -0,0 +1,106 @@
+"""
+Pagination helpers for list endpoints
+
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from flask import current_app
+
+from flaskapp.database.models import db
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: int | None
+
+
+class RankedPage(NamedTuple):
+    items: list
+    next_page: int | None
+
+
+def get_per_page(flask_request):
+    """
+    get_per_page(flask_request)
+    reads the requested page size, falling back to PAGINATION_PER_PAGE
+    and never exceeding PAGINATION_MAX_PER_PAGE
+    """
+    default = current_app.config.get("PAGINATION_PER_PAGE", 2)
+    maximum = current_app.config.get("PAGINATION_MAX_PER_PAGE", 100)
+    per_page = flask_request.args.get("per_page", default, type=int)
+    return min(max(per_page, 1), maximum)
+
+
+def page_statement(flask_request, stmt, key_column, descending=False):
+    """
+    page_statement(flask_request, stmt, key_column, descending=False)
+    orders a select statement by key_column and limits it to the requested
+    page plus one row, returning the statement and the page size
+    """
+    per_page = get_per_page(flask_request)
+    cursor = flask_request.args.get("cursor", type=int)
+
+    stmt = stmt.order_by(key_column.desc() if descending else key_column)
+    if cursor is not None:
+        stmt = stmt.where(key_column < cursor if descending else key_column > cursor)
+    else:
+        page = max(flask_request.args.get("page", 1, type=int), 1)
+        stmt = stmt.offset((page - 1) * per_page)
+
+    return stmt.limit(per_page + 1), per_page
+
+
+def to_page(items, per_page, key_column):
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = getattr(items[-1], key_column.key)
+
+    return Page(items, next_cursor)
+
+
+def paginate(flask_request, stmt, key_column, scalars=True, descending=False):
+    """
+    paginate(flask_request, stmt, key_column, scalars=True, descending=False)
+    runs a select statement one page at a time, ordered by key_column
+    (newest first with descending=True).
+
+    When a `cursor` argument is given the page starts right after that key
+    (keyset pagination), otherwise the classic `page` argument is turned into
+    an OFFSET. One extra row is fetched to know whether a next page exists.
+    Column projections pass scalars=False to get the result rows back.
+    """
+    stmt, per_page = page_statement(flask_request, stmt, key_column, descending)
+    result = db.session.execute(stmt)
+    items = result.scalars().all() if scalars else result.all()
+    return to_page(items, per_page, key_column)
+
+
+async def async_paginate(session, flask_request, stmt, key_column, scalars=True, descending=False):
+    """
+    async_paginate(session, flask_request, stmt, key_column, scalars=True, descending=False)
+    paginate() for an AsyncSession
+    """
+    stmt, per_page = page_statement(flask_request, stmt, key_column, descending)
+    result = await session.execute(stmt)
+    items = result.scalars().all() if scalars else result.all()
+    return to_page(items, per_page, key_column)
+
+
+def paginate_ranked(flask_request, stmt, rank_column, key_column):
+    """
+    paginate_ranked(flask_request, stmt, rank_column, key_column)
+    runs a select statement ordered by a relevance rank, best first, one
+    `page` at a time. Ranks are not unique, so key_column breaks the ties
+    and there is no cursor: pages are always turned into an OFFSET.
+    """
+    per_page = get_per_page(flask_request)
+    page = max(flask_request.args.get("page", 1, type=int), 1)
+    stmt = stmt.order_by(rank_column, key_column).offset((page - 1) * per_page).limit(per_page + 1)
+    items = db.session.execute(stmt).all()
+    if len(items) > per_page:
+        return RankedPage(items[:per_page], page + 1)
+    return RankedPage(items, None)
@@ -0,0 +1,234 @@
+"""
+Monthly partitions of the execution history: pruning and archival
+
+"""
+
+import gzip
+import os
+import tempfile
+from array import array
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, false, func, select, update
+
+from flaskapp.database.models import (
+    Execution,
+    ExecutionPartition,
+    LatestExecution,
+    RowCount,
+    adjust_row_count,
+    count_rows,
+    db,
+    index_search_rows,
+    partition_month,
+)
+from flaskapp.database.versions import table_versions
+from flaskapp.export import PYARROW_AVAILABLE, csv_chunks, export_query, parquet_chunks
+from flaskapp.filters import execution_time_range
+
+ARCHIVE_EXTENSIONS = {"csv": "csv.gz", "parquet": "parquet"}
+
+
+# ----------------------------------------------------------------------------#
+# Pruning.
+# ----------------------------------------------------------------------------#
+
+
+def bounds_query(since, until):
+    """
+    bounds_query(since, until)
+    selects, in one statement, the id range of the months overlapping
+    [since, until], the rows the partition table accounts for and the
+    maintained execution count
+    """
+    in_range = (
+        ExecutionPartition.month.between(
+            partition_month(since) if since else "0000-00", partition_month(until) if until else "9999-99"
+        ),
+        ExecutionPartition.rows > 0,
+    )
+    return select(
+        select(func.min(ExecutionPartition.first_id)).where(*in_range).scalar_subquery(),
+        select(func.max(ExecutionPartition.last_id)).where(*in_range).scalar_subquery(),
+        select(func.total(ExecutionPartition.rows)).scalar_subquery(),
+        select(RowCount.count).where(RowCount.table_name == Execution.__tablename__).scalar_subquery(),
+    )
+
+
+def prune_criteria(bounds, id_column=Execution.id):
+    """
+    prune_criteria(bounds, id_column=Execution.id)
+    turns a bounds_query() row into WHERE clauses on the execution id, or
+    on id_column when the query is driven by another table holding it.
+    The partitions are only trusted when they account for every execution,
+    a database that was never backfilled is not pruned.
+    """
+    first_id, last_id, partitioned, total = bounds
+    if total is None or int(partitioned) != total:
+        return []
+    if first_id is None:
+        return [false()]
+    return [id_column.between(first_id, last_id)]
+
+
+def partition_criteria(flask_request, id_column=Execution.id):
+    """
+    partition_criteria(flask_request, id_column=Execution.id)
+    the id range of the months a since/until request can match, so the
+    history query seeks the (asset_id, id) index instead of filtering every
+    row of the asset on its timestamp
+    """
+    since, until = execution_time_range(flask_request)
+    if since is None and until is None:
+        return []
+    return prune_criteria(db.session.execute(bounds_query(since, until)).one(), id_column)
+
+
+async def async_partition_criteria(session, flask_request):
+    since, until = execution_time_range(flask_request)
+    if since is None and until is None:
+        return []
+    return prune_criteria((await session.execute(bounds_query(since, until))).one())
+
+
+# ----------------------------------------------------------------------------#
+# Archive files.
+# ----------------------------------------------------------------------------#
+
+
+def write_csv(path, batches):
+    with open(path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as compressed:
+            for chunk in csv_chunks(batches):
+                compressed.write(chunk.encode())
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def write_parquet(path, batches):
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Parquet archives need the pyarrow package.")
+    with open(path, "wb") as raw:
+        for chunk in parquet_chunks(batches):
+            raw.write(chunk)
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+ARCHIVE_WRITERS = {"csv": write_csv, "parquet": write_parquet}
+
+
+# ----------------------------------------------------------------------------#
+# Archival.
+# ----------------------------------------------------------------------------#
+
+
+def partitions_complete():
+    return int(db.session.scalar(select(func.total(ExecutionPartition.rows)))) == count_rows(Execution)
+
+
+def month_bounds(month):
+    start = datetime.strptime(month, "%Y-%m")
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+"""
+    archive_month(month, directory, archive_format="csv", batch_size=1000)
+    writes the executions of a month to a compressed file in directory, then
+    deletes them from the execution table batch_size rows per transaction.
+    The export is a single read, which under WAL never blocks writers, and
+    each delete holds the write lock for one short batch only. Executions
+    still referenced by latest_execution stay in the table. Rollups are
+    left alone, so statistics keep covering the archived history.
+    Returns (path, rows), (None, 0) when nothing was left to archive.
+"""
+
+
+def archive_month(month, directory, archive_format="csv", batch_size=1000):
+    partition = db.session.get(ExecutionPartition, month)
+    start, end = month_bounds(month)
+    latest = select(LatestExecution.execution_id)
+    stmt = export_query(
+        Execution.id.between(partition.first_id, partition.last_id),
+        Execution.timestamp >= start,
+        Execution.timestamp < end,
+        Execution.id.not_in(latest),
+    )
+
+    ids = array("q")
+
+    def batches():
+        result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            ids.extend(row.id for row in rows)
+            yield rows
+
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp")
+    os.close(fd)
+    try:
+        ARCHIVE_WRITERS[archive_format](tmp_path, batches())
+        # Ends the read transaction before the deletes start.
+        db.session.commit()
+        if not ids:
+            os.remove(tmp_path)
+            return None, 0
+        path = os.path.join(directory, f"executions-{month}-{ids[0]}.{ARCHIVE_EXTENSIONS[archive_format]}")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    archived = 0
+    for offset in range(0, len(ids), batch_size):
+        chunk = ids[offset : offset + batch_size].tolist()
+        criteria = (Execution.id.in_(chunk), Execution.id.not_in(latest))
+        index_search_rows(Execution, *criteria, sign=-1)
+        deleted = db.session.execute(
+            delete(Execution).where(*criteria).execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.execute(
+            update(ExecutionPartition)
+            .where(ExecutionPartition.month == month)
+            .values(
+                rows=ExecutionPartition.rows - deleted,
+                archived_rows=ExecutionPartition.archived_rows + deleted,
+                archived_at=datetime.utcnow(),
+            )
+        )
+        adjust_row_count(Execution, -deleted)
+        db.session.commit()
+        table_versions.bump(Execution.__tablename__)
+        archived += deleted
+
+    return path, archived
+
+
+"""
+    archive_executions(before, directory, archive_format="csv", batch_size=1000)
+    archives every month that ended before `before`, oldest first, and
+    returns (month, path, rows) for each archive written
+"""
+
+
+def archive_executions(before, directory, archive_format="csv", batch_size=1000):
+    if archive_format not in ARCHIVE_WRITERS:
+        raise ValueError(f"The archive format must be one of {', '.join(ARCHIVE_WRITERS)}.")
+    if archive_format == "parquet" and not PYARROW_AVAILABLE:
+        raise RuntimeError("Parquet archives need the pyarrow package.")
+    if not partitions_complete():
+        raise RuntimeError("The execution partitions are out of date, run `flask rebuild-partitions` first.")
+
+    months = db.session.scalars(
+        select(ExecutionPartition.month)
+        .where(ExecutionPartition.month < partition_month(before), ExecutionPartition.rows > 0)
+        .order_by(ExecutionPartition.month)
+    ).all()
+
+    archives = []
+    for month in months:
+        path, rows = archive_month(month, directory, archive_format, batch_size)
+        if rows:
+            archives.append((month, path, rows))
+    return archives
@@ -0,0 +1,79 @@
+"""
+Full-text search over test cases and executions
+
+"""
+
+import re
+
+from sqlalchemy import select
+
+from flaskapp.database.models import Execution, TestCase, search_table
+
+SEARCH_TYPES = ("tests", "executions")
+SEARCH_ORDERS = ("recent", "rank")
+WORD = re.compile(r"(\w+)(\*?)")
+
+
+def search_terms(flask_request):
+    """
+    search_terms(flask_request)
+    turns the `q` argument into an FTS5 query matching the rows holding
+    every word of it. Words are quoted, so the punctuation of an error
+    message is never read as query syntax, and a trailing * makes a word a
+    prefix. Raises ValueError when q has no word.
+    """
+    words = WORD.findall(flask_request.args.get("q", ""))
+    if not words:
+        raise ValueError("The q argument must contain at least one word.")
+    return " ".join(f'"{word}"{star}' for word, star in words)
+
+
+def search_options(flask_request):
+    """
+    search_options(flask_request)
+    the `type` (tests by default) and `order` of a search. Test cases are
+    always ranked, executions come newest first unless order=rank.
+    """
+    search_type = flask_request.args.get("type", "tests").lower()
+    if search_type not in SEARCH_TYPES:
+        raise ValueError(f"The type argument must be one of {', '.join(SEARCH_TYPES)}.")
+    order = flask_request.args.get("order", "rank" if search_type == "tests" else "recent").lower()
+    if order not in SEARCH_ORDERS:
+        raise ValueError(f"The order argument must be one of {', '.join(SEARCH_ORDERS)}.")
+    return search_type, order
+
+
+"""
+    search_query(model, terms, *columns)
+    selects columns of the rows of a model matching an FTS5 query, driven
+    by the model's FTS5 table, and returns the statement together with that
+    table. Its rowid is the id of the row, selected as `id`, and ordering
+    by it walks the matches newest first without sorting them.
+"""
+
+
+def search_query(model, terms, *columns):
+    fts = search_table(model)
+    stmt = (
+        select(fts.c.rowid.label("id"), *columns)
+        .join_from(fts, model, model.id == fts.c.rowid)
+        .where(fts.c[fts.name].match(terms))
+    )
+    return stmt, fts
+
+
+def test_case_search(terms):
+    return search_query(TestCase, terms, TestCase.name, TestCase.description)
+
+
+def execution_search(terms, *criteria):
+    stmt, fts = search_query(
+        Execution,
+        terms,
+        Execution.test_case_id,
+        Execution.asset_id,
+        Execution.timestamp,
+        Execution.status,
+        Execution.details,
+    )
+    return stmt.where(*criteria), fts
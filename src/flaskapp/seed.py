@@ -0,0 +1,113 @@
+"""
+Synthetic data generator for load tests and benchmarks
+
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from flaskapp.database.models import (
+    Asset,
+    Execution,
+    TestCase,
+    db,
+    rebuild_execution_partitions,
+    rebuild_execution_rollups,
+    rebuild_latest_executions,
+    rebuild_row_counts,
+    rebuild_search_index,
+)
+
+DETAILS = (
+    "Success",
+    "Failure",
+    "Timed out waiting for the device",
+    "Assertion failed: expected 200, got 500",
+    "Skipped dependency setup, retried once",
+)
+
+
+def chunked(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def bulk_insert(model, rows, chunk_size):
+    """
+    bulk_insert(model, rows, chunk_size)
+    inserts an iterable of dicts with one executemany per chunk,
+    committing every chunk so memory stays flat for millions of rows
+    """
+    total = 0
+    for chunk in chunked(rows, chunk_size):
+        db.session.execute(insert(model), chunk)
+        db.session.commit()
+        total += len(chunk)
+    return total
+
+
+def next_id(model):
+    return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+"""
+    seed_database(test_cases, assets, executions, days=30, pass_rate=0.9,
+                  chunk_size=10000, seed=None)
+    appends synthetic test cases, assets and executions. Executions are
+    spread over the last `days` days in timestamp order and pick a random
+    existing asset and test case. The counters, rollups, latest
+    executions, partitions and search index are rebuilt once at the end
+    instead of row by row.
+"""
+
+
+def seed_database(test_cases, assets, executions, days=30, pass_rate=0.9, chunk_size=10000, seed=None):
+    rng = random.Random(seed)
+
+    first = next_id(TestCase)
+    bulk_insert(
+        TestCase,
+        (
+            {"name": f"Test Case {number}", "description": f"Generated test case {number}" if number % 2 else None}
+            for number in range(first, first + test_cases)
+        ),
+        chunk_size,
+    )
+    first = next_id(Asset)
+    bulk_insert(Asset, ({"name": f"Asset {number}"} for number in range(first, first + assets)), chunk_size)
+
+    asset_ids = db.session.scalars(select(Asset.id)).all()
+    test_case_ids = db.session.scalars(select(TestCase.id)).all()
+    if executions and (not asset_ids or not test_case_ids):
+        raise ValueError("Executions need at least one asset and one test case.")
+
+    start = datetime.utcnow() - timedelta(days=days)
+    step = timedelta(days=days) / max(executions, 1)
+
+    def generate():
+        for number in range(executions):
+            passed = rng.random() < pass_rate
+            yield {
+                "asset_id": rng.choice(asset_ids),
+                "test_case_id": rng.choice(test_case_ids),
+                "status": passed,
+                "details": DETAILS[0] if passed else rng.choice(DETAILS[1:]),
+                "timestamp": start + step * number,
+            }
+
+    inserted = bulk_insert(Execution, generate(), chunk_size)
+
+    rebuild_row_counts()
+    rebuild_execution_rollups()
+    rebuild_latest_executions()
+    rebuild_execution_partitions()
+    rebuild_search_index()
+    return {"test_cases": test_cases, "assets": assets, "executions": inserted}
@@ -0,0 +1,120 @@
+"""
+JSON serialization: Flask JSON providers and precompiled model serializers
+
+"""
+
+from datetime import date
+from functools import lru_cache
+from operator import attrgetter
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import inspect
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    The stdlib json provider with a configurable datetime format:
+    JSON_DATETIME_FORMAT = "http" keeps Flask's RFC 822 dates,
+    "iso" writes ISO 8601 instead.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.datetime_format = app.config.get("JSON_DATETIME_FORMAT", "http")
+
+    def default(self, o):
+        if self.datetime_format == "iso" and isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Serializes with orjson, which handles datetimes natively in "iso" mode.
+    Calls passing explicit json.dumps/json.loads arguments fall back to the
+    stdlib implementation.
+    """
+
+    def options(self):
+        option = 0
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.datetime_format != "iso":
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.options()
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option) + b"\n", mimetype=self.mimetype
+        )
+
+
+"""
+    json_provider(app)
+    picks the JSON provider named by JSON_PROVIDER, orjson is only used
+    when it is installed
+"""
+
+
+def json_provider(app):
+    if app.config.get("JSON_PROVIDER", "orjson") == "orjson" and orjson is not None:
+        return OrjsonProvider(app)
+    return JSONProvider(app)
+
+
+"""
+    model_serializer(model, fields=None)
+    compiles a function turning a model instance into a dict of its mapped
+    columns (or of the given fields) with a single attrgetter call,
+    serializers are cached per model and field tuple
+"""
+
+
+@lru_cache(maxsize=None)  # noqa: UP033 (functools.cache needs Python 3.9)
+def model_serializer(model, fields=None):
+    keys = fields or tuple(attr.key for attr in inspect(model).column_attrs)
+    getter = attrgetter(*keys)
+
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda obj: {key: getter(obj)}
+    return lambda obj: dict(zip(keys, getter(obj)))
+
+
+"""
+    requested_fields(flask_request, allowed)
+    reads a sparse fieldset from the `fields` argument (`?fields=id,name`),
+    returning a tuple in the order asked for, or None when every field is
+    wanted. Raises ValueError for a field missing from allowed.
+"""
+
+
+def requested_fields(flask_request, allowed):
+    value = flask_request.args.get("fields")
+    if not value:
+        return None
+
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(",") if field.strip()))
+    unknown = [field for field in fields if field not in allowed]
+    if unknown or not fields:
+        raise ValueError(f"The fields argument accepts {', '.join(allowed)}.")
+    return fields
@@ -0,0 +1,202 @@
+"""
+Write-behind queue for execution ingestion
+
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import OperationalError
+
+from flaskapp.database.models import Execution, ExecutionSpool, db
+from flaskapp.database.versions import table_versions
+from flaskapp.ingest import insert_executions, prepare_executions
+
+
+class SpoolFull(Exception):
+    pass
+
+
+def pending_count():
+    return db.session.scalar(select(func.count()).where(ExecutionSpool.state == "queued"))
+
+
+def enqueue_execution(payload):
+    """
+    enqueue_execution(payload)
+    stores a validated execution payload in the spool and returns its
+    ticket, raises SpoolFull once INGEST_QUEUE_MAX_PENDING payloads wait
+    """
+    if pending_count() >= current_app.config.get("INGEST_QUEUE_MAX_PENDING", 10000):
+        raise SpoolFull()
+
+    entry = ExecutionSpool(uuid.uuid4().hex, current_app.json.dumps(payload))
+    entry.insert()
+    ensure_spool_writer(current_app._get_current_object())
+    return entry.ticket
+
+
+def drain_spool(batch_size=None):
+    """
+    drain_spool(batch_size=None)
+    inserts up to batch_size queued payloads and records each ticket's
+    outcome, all in a single transaction so a payload is written exactly
+    once. When the batch cannot be written its payloads are retried one by
+    one, so a bad payload fails its own ticket instead of holding back the
+    queue. Returns the number of tickets processed.
+    """
+    batch_size = batch_size or current_app.config.get("INGEST_WRITER_BATCH_SIZE", 500)
+    ids = db.session.scalars(
+        select(ExecutionSpool.id).where(ExecutionSpool.state == "queued").order_by(ExecutionSpool.id).limit(batch_size)
+    ).all()
+    if not ids:
+        return 0
+
+    try:
+        return write_spool_entries(ids)
+    except OperationalError:
+        # A locked or unavailable database, the writer tries again later.
+        db.session.rollback()
+        raise
+    except Exception:
+        db.session.rollback()
+        if len(ids) == 1:
+            return fail_spool_entry(ids[0])
+        logging.exception("A spool batch could not be written, retrying its payloads one by one.")
+
+    processed = 0
+    for entry_id in ids:
+        try:
+            processed += write_spool_entries([entry_id])
+        except OperationalError:
+            db.session.rollback()
+            raise
+        except Exception:
+            db.session.rollback()
+            processed += fail_spool_entry(entry_id)
+    return processed
+
+
+def write_spool_entries(ids):
+    # Taking the write lock first means another writer that read the same ids
+    # only gets the rows that are still queued once it is its turn.
+    db.session.execute(
+        update(ExecutionSpool)
+        .where(ExecutionSpool.id.in_(ids), ExecutionSpool.state == "queued")
+        .values(state="processing")
+    )
+    entries = db.session.scalars(
+        select(ExecutionSpool)
+        .where(ExecutionSpool.id.in_(ids), ExecutionSpool.state == "processing")
+        .order_by(ExecutionSpool.id)
+    ).all()
+
+    results, valid_rows = prepare_executions([current_app.json.loads(entry.payload) for entry in entries])
+    # Executions are dated when they were reported, not when the writer
+    # gets to them.
+    for index, row in valid_rows:
+        row["timestamp"] = entries[index].created_at
+    if valid_rows:
+        insert_executions(valid_rows, results)
+
+    now = datetime.utcnow()
+    for entry, result in zip(entries, results):
+        entry.state = "done" if result["success"] else "failed"
+        entry.execution_id = result.get("id")
+        entry.error = result.get("error")
+        entry.processed_at = now
+    db.session.commit()
+    if valid_rows:
+        table_versions.bump(Execution.__tablename__)
+
+    return len(entries)
+
+
+def fail_spool_entry(entry_id):
+    logging.exception("Spooled execution %s could not be written.", entry_id)
+    db.session.execute(
+        update(ExecutionSpool)
+        .where(ExecutionSpool.id == entry_id, ExecutionSpool.state == "queued")
+        .values(state="failed", error="The execution could not be written.", processed_at=datetime.utcnow())
+    )
+    db.session.commit()
+    return 1
+
+
+def prune_spool():
+    retention = timedelta(seconds=current_app.config.get("INGEST_SPOOL_RETENTION", 86400))
+    db.session.execute(
+        delete(ExecutionSpool).where(
+            ExecutionSpool.state.in_(("done", "failed")), ExecutionSpool.processed_at < datetime.utcnow() - retention
+        )
+    )
+    db.session.commit()
+
+
+def run_spool_writer(app):
+    interval = app.config.get("INGEST_WRITER_INTERVAL", 0.2)
+    while True:
+        drained = 0
+        try:
+            with app.app_context():
+                drained = drain_spool()
+                if not drained:
+                    prune_spool()
+        except Exception:
+            logging.exception("The execution spool writer failed.")
+        if not drained:
+            time.sleep(interval)
+
+
+_writer_lock = threading.Lock()
+_writer = None
+
+
+"""
+    ensure_spool_writer(app)
+    starts the background writer thread of this process if it is not
+    running, forked gunicorn workers each start their own
+"""
+
+
+def ensure_spool_writer(app):
+    global _writer
+    if not app.config.get("INGEST_WRITER_THREAD", True):
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(
+                target=run_spool_writer, args=(app,), name=f"spool-writer-{os.getpid()}", daemon=True
+            )
+            _writer.start()
+
+
+"""
+    init_spool(app)
+    in queued mode, the first request of every process starts its spool
+    writer when executions are still queued, e.g. by a previous run, so
+    they do not wait for the next POST /executions. A process serving no
+    requests leaves them to `flask drain-spool`.
+"""
+
+
+def init_spool(app):
+    if app.config.get("EXECUTION_INGEST_MODE", "sync") != "queued" or not app.config.get("INGEST_WRITER_THREAD", True):
+        return
+    # Not in create_app itself: a preloaded gunicorn master would fork its
+    # workers with the writer thread running.
+    checked = set()
+
+    @app.before_request
+    def resume_spool_writer():
+        if os.getpid() in checked:
+            return
+        checked.add(os.getpid())
+        if pending_count():
+            ensure_spool_writer(app)
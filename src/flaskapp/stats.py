@@ -0,0 +1,72 @@
+"""
+Pass/fail statistics read from the execution rollups
+
+"""
+
+from datetime import date
+
+from sqlalchemy import func, select
+
+from flaskapp.database.models import ExecutionRollup, db
+
+BUCKET_FORMATS = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+
+
+def format_stats(passed, failed):
+    total = passed + failed
+    return {
+        "passed": passed,
+        "failed": failed,
+        "total": total,
+        "pass_rate": round(passed / total, 4) if total else None,
+    }
+
+
+def day_range(flask_request):
+    """
+    day_range(flask_request)
+    turns the optional `since`/`until` ISO dates of a request into rollup
+    criteria, raises ValueError when one cannot be parsed
+    """
+    criteria = []
+    since = flask_request.args.get("since")
+    if since:
+        criteria.append(ExecutionRollup.day >= date.fromisoformat(since[:10]))
+    until = flask_request.args.get("until")
+    if until:
+        criteria.append(ExecutionRollup.day <= date.fromisoformat(until[:10]))
+    return criteria
+
+
+def rollup_totals(*criteria):
+    passed, failed = db.session.execute(
+        select(
+            func.coalesce(func.sum(ExecutionRollup.passed), 0),
+            func.coalesce(func.sum(ExecutionRollup.failed), 0),
+        ).where(*criteria)
+    ).one()
+    return format_stats(passed, failed)
+
+
+def rollup_buckets(bucket, *criteria):
+    """
+    rollup_buckets(bucket, *criteria)
+    groups the matching rollups by day, week or month. SQLite adds them up
+    per day in index order and the days are folded into buckets here, a
+    GROUP BY on the bucket label would sort every row in a temporary B-tree.
+    """
+    rows = db.session.execute(
+        select(ExecutionRollup.day, func.sum(ExecutionRollup.passed), func.sum(ExecutionRollup.failed))
+        .where(*criteria)
+        .group_by(ExecutionRollup.day)
+        .order_by(ExecutionRollup.day)
+    )
+    # Days come in order, so buckets are created in order too.
+    buckets = {}
+    for day, passed, failed in rows:
+        counts = buckets.setdefault(day.strftime(BUCKET_FORMATS[bucket]), [0, 0])
+        counts[0] += passed
+        counts[1] += failed
+    return [
+        {"bucket": bucket_name, **format_stats(passed, failed)} for bucket_name, (passed, failed) in buckets.items()
+    ]
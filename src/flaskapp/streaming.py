@@ -0,0 +1,42 @@
+"""
+Streaming NDJSON responses for large result sets
+
+"""
+
+from flask import Response, current_app, stream_with_context
+
+from flaskapp.database.models import db
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def wants_stream(flask_request):
+    """
+    wants_stream(flask_request)
+    clients ask for a stream with ?stream=1 or Accept: application/x-ndjson
+    """
+    if flask_request.args.get("stream", "0").lower() in ("1", "true", "yes"):
+        return True
+    best = flask_request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def stream_ndjson(stmt, formatter):
+    """
+    stream_ndjson(stmt, formatter)
+    runs a select statement with a server-side cursor and sends one JSON
+    document per row as rows are fetched, STREAM_BATCH_SIZE rows at a time,
+    so memory use does not depend on the number of rows
+    """
+    batch_size = current_app.config.get("STREAM_BATCH_SIZE", 1000)
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    dumps = current_app.json.dumps
+
+    def generate():
+        try:
+            for partition in result.partitions():
+                yield "".join(f"{dumps(formatter(row))}\n" for row in partition)
+        finally:
+            result.close()
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
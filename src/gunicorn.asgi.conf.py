@@ -0,0 +1,17 @@
+import multiprocessing
+import os
+import runpy
+
+# gunicorn -c gunicorn.asgi.conf.py flaskapp.asgi:app
+# The settings and hooks of gunicorn.conf.py with one uvicorn event loop per
+# core. The async views need no threads, the routes served through
+# WsgiToAsgi run on the loop's default thread pool.
+globals().update(
+    (name, value)
+    for name, value in runpy.run_path(os.path.join(os.path.dirname(__file__), "gunicorn.conf.py")).items()
+    if not name.startswith("__")
+)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = multiprocessing.cpu_count()
+threads = 1
@@ -1,4 +1,11 @@
 import multiprocessing
+import time
+
+# The master builds the app once and forks every worker (and every
+# max_requests replacement) from it, so workers neither import the app nor
+# touch the schema. The connections pooled in the master are dropped in the
+# forked workers.
+preload_app = True
 
 max_requests = 1000
 max_requests_jitter = 50
@@ -9,3 +16,29 @@ workers = (multiprocessing.cpu_count() * 2) + 1
 threads = workers
 
 timeout = 600
+
+
+def on_starting(server):
+    # Imported here, not at the top, so loading this file builds no app.
+    from flaskapp import app
+    from flaskapp.metrics import metrics_dir, reset_metrics_dir
+
+    server.metrics_dir = metrics_dir(app)
+    if server.metrics_dir:
+        # Histograms of a previous run would be added to the new totals.
+        reset_metrics_dir(server.metrics_dir)
+
+
+def child_exit(server, worker):
+    from flaskapp.metrics import mark_process_dead
+
+    if server.metrics_dir:
+        mark_process_dead(server.metrics_dir, worker.pid)
+
+
+def pre_fork(server, worker):
+    worker.forked_at = time.monotonic()
+
+
+def post_worker_init(worker):
+    worker.log.info("Worker %s ready in %.0f ms", worker.pid, (time.monotonic() - worker.forked_at) * 1000)
@@ -1,14 +1,35 @@
 import os
+import shutil
+import tempfile
+from importlib.util import find_spec
 
 import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
-from flaskapp import create_app
-from flaskapp.database.models import db
+
+def pytest_configure(config):
+    """
+    Points the app at a copy of the bundled database before any test module
+    imports flaskapp, which builds the app and creates missing tables, so a
+    test run never writes to the database in the tree.
+    """
+    database_dir = os.path.join(os.path.dirname(find_spec("flaskapp").origin), "database")
+    source = os.path.join(database_dir, os.environ.get("DATABASE_FILENAME", "testdb.db"))
+    config.database_copy_dir = tempfile.mkdtemp(prefix="flaskapp-tests-")
+    os.environ["DATABASE_FILENAME"] = shutil.copy(source, config.database_copy_dir)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(config.database_copy_dir, ignore_errors=True)
 
 
 @pytest.fixture(scope="session")
 def app_with_db():
     """Session-wide test `Flask` application."""
+    from flaskapp import create_app
+    from flaskapp.database.models import db
+
     config_override = {
         "TESTING": True,
         # Allows for override of database to separate test from dev environments
@@ -36,3 +57,52 @@ def app_with_db():
         except Exception:
             connection.close()
         engines[key] = engine
+
+
+@pytest.fixture
+def captured_sql(app_with_db):
+    """Records every SQL statement sent to the database during a test."""
+    # Responses cached by earlier tests would hide their queries.
+    app_with_db.extensions["response_cache"].clear()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters, executemany))
+
+    event.listen(Engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def seed():
+    """`seed_database` arguments of `app`, test modules override it."""
+    return {"test_cases": 4, "assets": 3, "executions": 300, "days": 60, "seed": 5}
+
+
+@pytest.fixture
+def app_config():
+    """Config of `app` on top of its own database, test modules override it."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, seed, app_config):
+    """`Flask` application on its own seeded database, for tests whose writes must really commit or roll back."""
+    from flaskapp import create_app
+    from flaskapp.database.models import db
+    from flaskapp.seed import seed_database
+
+    app = create_app(
+        {"DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}", "RESPONSE_CACHE_ENABLED": False, **app_config}
+    )
+    with app.app_context():
+        seed_database(**seed)
+    yield app
+    with app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
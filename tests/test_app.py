@@ -1,3 +1,6 @@
+import json
+from datetime import datetime
+
 import pytest
 
 
@@ -156,3 +159,338 @@ def test_add_execution_results(client):
     assert body["success"] is True
     assert body["execution"]
     assert body["total_executions"]
+
+
+def test_retrieve_tests_with_cursor(client):
+    """Test keyset pagination of tests"""
+    response = client.get("/tests?per_page=1")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert len(body["test_cases"]) == 1
+    assert body["next_cursor"] == body["test_cases"][0]["id"]
+
+    response = client.get(f"/tests?per_page=1&cursor={body['next_cursor']}")
+    next_body = response.get_json()
+
+    assert response.status_code == 200
+    assert next_body["test_cases"][0]["id"] > body["test_cases"][0]["id"]
+
+
+def test_retrieve_tests_per_page_is_capped(client, app_with_db):
+    """Test per_page cannot exceed the configured maximum"""
+    maximum = app_with_db.config["PAGINATION_MAX_PER_PAGE"]
+    response = client.get(f"/tests?per_page={maximum + 50}")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert len(body["test_cases"]) <= maximum
+
+
+def test_get_execution_results_with_cursor(client):
+    """Test keyset pagination of execution results"""
+    response = client.get("/executions/1?per_page=1")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert len(body["executions"]) == 1
+    assert body["next_cursor"]
+
+    response = client.get(f"/executions/1?per_page=1&cursor={body['next_cursor']}")
+    next_body = response.get_json()
+
+    assert response.status_code == 200
+    assert next_body["executions"][0]["id"] > body["executions"][0]["id"]
+    assert next_body["total_executions"] == body["total_executions"]
+
+
+def test_get_execution_results_filtered_by_status(client):
+    """Test filtering execution results by status"""
+    response = client.get("/executions/1?status=false&per_page=100")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["executions"]
+    assert all(execution["status"] is False for execution in body["executions"])
+    assert body["total_executions"] == len(body["executions"])
+
+
+def test_get_execution_results_filtered_by_test_case(client):
+    """Test filtering execution results by test case"""
+    response = client.get("/executions/1?test_case_id=1&per_page=100")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert {execution["test_case"]["id"] for execution in body["executions"]} == {1}
+
+
+def test_get_execution_results_by_time_range(client):
+    """Test since and until restrict execution results to a time range"""
+    total = client.get("/executions/1").get_json()["total_executions"]
+
+    response = client.get("/executions/1?since=2000-01-01T00:00:00Z&until=2100-01-01")
+    assert response.get_json()["total_executions"] == total
+
+    response = client.get("/executions/1?since=2100-01-01")
+    assert response.status_code == 404
+
+
+def test_get_execution_results_on_one_day(client):
+    """Test since and until set to the same date include that whole day"""
+    execution = client.get("/executions/1?per_page=1").get_json()["executions"][0]
+    day = datetime.strptime(execution["execution_date"], "%a, %d %b %Y %H:%M:%S GMT").date().isoformat()
+
+    response = client.get(f"/executions/1?since={day}&until={day}&per_page=100")
+
+    assert response.status_code == 200
+    assert execution["id"] in [e["id"] for e in response.get_json()["executions"]]
+
+
+def test_get_execution_results_newest_first(client):
+    """Test descending order with keyset pagination"""
+    body = client.get("/executions/1?order=desc&per_page=2").get_json()
+    ids = [execution["id"] for execution in body["executions"]]
+    assert ids == sorted(ids, reverse=True)
+
+    next_body = client.get(f"/executions/1?order=desc&per_page=2&cursor={body['next_cursor']}").get_json()
+    assert next_body["executions"][0]["id"] < ids[-1]
+
+
+@pytest.mark.parametrize("query", ["status=maybe", "test_case_id=one", "since=yesterday", "order=sideways"])
+def test_400_get_execution_results_bad_filter(client, query):
+    """Test invalid filters are rejected"""
+    response = client.get(f"/executions/1?{query}")
+
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+def test_get_test_cases_sparse_fieldset(client, captured_sql):
+    """Test ?fields= narrows both the SELECT and the test cases"""
+    response = client.get("/tests?fields=name")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert all(list(test_case) == ["name"] for test_case in body["test_cases"])
+    assert body["next_cursor"]
+    selects = [statement for statement, _, _ in captured_sql if "FROM test_case" in statement]
+    assert selects and all("description" not in statement for statement in selects)
+
+
+def test_get_test_case_sparse_fieldset(client):
+    """Test ?fields= on a single test case"""
+    response = client.get("/tests/1?fields=id,name")
+
+    assert response.status_code == 200
+    assert response.get_json()["test_case"] == {"id": 1, "name": client.get("/tests/1").get_json()["test_case"]["name"]}
+
+
+def test_get_execution_results_sparse_fieldset(client, captured_sql):
+    """Test ?fields= on execution results skips the details and the test case join"""
+    response = client.get("/executions/1?fields=id,status")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert all(set(execution) == {"id", "status"} for execution in body["executions"])
+    selects = [statement for statement, _, _ in captured_sql if "FROM execution" in statement]
+    assert selects and all("details" not in statement and "JOIN" not in statement for statement in selects)
+
+
+@pytest.mark.parametrize("url", ["/tests?fields=secret", "/tests/1?fields=id,secret", "/executions/1?fields=asset"])
+def test_400_unknown_sparse_field(client, url):
+    """Test unknown fields are rejected"""
+    response = client.get(url)
+
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+def test_total_test_cases_follows_inserts_and_deletes(client):
+    """Test the maintained test case counter"""
+    before = client.get("/tests").get_json()["total_test_cases"]
+
+    response = client.post("/tests", json={"name": "Counted Test Case"})
+    body = response.get_json()
+    assert body["total_test_cases"] == before + 1
+
+    response = client.delete(f"/tests/{body['test_case']['id']}")
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["total_test_cases"] == before
+
+
+def test_retrieve_tests_without_total(client):
+    """Test opting out of totals"""
+    response = client.get("/tests?with_total=false")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert "total_test_cases" not in body
+
+
+def test_recount_command(app_with_db, client):
+    """Test rebuilding the row counters from the CLI"""
+    result = app_with_db.test_cli_runner().invoke(args=["recount"])
+
+    assert result.exit_code == 0
+    assert client.get("/tests").get_json()["total_test_cases"]
+
+
+def test_add_execution_results_batch(client):
+    """Test add execution results in one batch"""
+    response = client.post(
+        "/executions/batch",
+        json=[
+            {"asset_id": 1, "test_case_id": 1, "status": True, "details": "Success"},
+            {"asset_id": "2", "test_case_id": "3", "status": False, "details": "Failure"},
+            {"asset_id": 10000, "test_case_id": 1, "status": True, "details": "Success"},
+            {"asset_id": 1, "test_case_id": 1, "status": "yes", "details": "Success"},
+        ],
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["success"] is True
+    assert body["inserted"] == 2
+    assert body["failed"] == 2
+    assert [result["success"] for result in body["results"]] == [True, True, False, False]
+    assert body["results"][1]["id"] > body["results"][0]["id"]
+    assert body["total_executions"]
+
+
+def test_add_execution_results_batch_bad_details(client):
+    """Test details that are not a short string fail their item, not the batch"""
+    response = client.post(
+        "/executions/batch",
+        json=[
+            {"asset_id": 1, "test_case_id": 1, "status": True, "details": {"x": 1}},
+            {"asset_id": 1, "test_case_id": 1, "status": True, "details": "x" * 501},
+            {"asset_id": 1, "test_case_id": 1, "status": True, "details": "Success"},
+        ],
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["inserted"] == 1
+    assert [result["success"] for result in body["results"]] == [False, False, True]
+    assert body["results"][0]["error"].startswith("The details field must be a string")
+
+
+def test_add_execution_results_batch_bad_ids(client):
+    """Test ids that are not integers fail their item instead of being truncated"""
+    response = client.post(
+        "/executions/batch",
+        json=[
+            {"asset_id": 1.9, "test_case_id": 1, "status": True, "details": "Success"},
+            {"asset_id": 1, "test_case_id": True, "status": True, "details": "Success"},
+            {"asset_id": 1, "test_case_id": "1.0", "status": True, "details": "Success"},
+        ],
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["inserted"] == 0
+    assert {result["error"] for result in body["results"]} == {"The asset_id and test_case_id fields must be integers."}
+
+
+def test_422_add_execution_with_float_id(client):
+    """Test a float asset id is refused instead of being truncated"""
+    execution = {"asset_id": 1.9, "test_case_id": 1, "status": True, "details": "Success"}
+    response = client.post("/executions", json=execution)
+
+    assert response.status_code == 422
+    assert response.get_json()["message"] == "The asset_id and test_case_id fields must be integers."
+
+
+def test_add_execution_results_batch_ndjson(client):
+    """Test add execution results from an NDJSON stream"""
+    lines = [
+        '{"asset_id": 1, "test_case_id": 2, "status": true, "details": "Success"}',
+        "not json",
+    ]
+    response = client.post(
+        "/executions/batch",
+        data="\n".join(lines),
+        content_type="application/x-ndjson",
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["inserted"] == 1
+    assert body["results"][1]["success"] is False
+    assert body["results"][1]["error"].startswith("Invalid JSON")
+
+
+def test_add_execution_results_batch_statement_count(client, captured_sql):
+    """Test a batch is not inserted one statement per execution"""
+    execution = {"asset_id": 1, "test_case_id": 1, "status": True, "details": "Success"}
+    response = client.post("/executions/batch", json=[execution] * 20)
+    ids = [result["id"] for result in response.get_json()["results"]]
+    inserts = [statement for statement, _, _ in captured_sql if statement.startswith("INSERT INTO execution ")]
+
+    assert ids == list(range(ids[0], ids[0] + 20))
+    assert len(inserts) == 2
+
+
+def test_400_add_execution_results_batch_not_a_list(client):
+    """Test the batch endpoint rejects a single object"""
+    response = client.post("/executions/batch", json={"asset_id": 1})
+    body = response.get_json()
+
+    assert response.status_code == 400
+    assert body["success"] is False
+
+
+def test_get_execution_results_statement_count(app_with_db, client, captured_sql):
+    """Test listing executions does not issue a query per row"""
+    client.get("/executions/1?per_page=1")
+    single_row = len(captured_sql)
+    captured_sql.clear()
+    # Both requests start cold, the first one would have cached the asset lookup.
+    app_with_db.extensions["response_cache"].clear()
+
+    response = client.get("/executions/1?per_page=50")
+    body = response.get_json()
+
+    assert len(body["executions"]) > 1
+    assert len(captured_sql) == single_row
+
+
+def test_stream_execution_results(client):
+    """Test streaming execution results as NDJSON"""
+    total = client.get("/executions/1").get_json()["total_executions"]
+
+    response = client.get("/executions/1?stream=1")
+    lines = response.get_data(as_text=True).splitlines()
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert len(lines) == total
+    assert json.loads(lines[0])["test_case"]["id"]
+
+
+def test_stream_filtered_execution_results(client):
+    """Test streaming applies the same filters"""
+    response = client.get("/executions/1?stream=1&status=false&order=desc")
+    executions = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert executions
+    assert all(execution["status"] is False for execution in executions)
+    assert [execution["id"] for execution in executions] == sorted((e["id"] for e in executions), reverse=True)
+
+
+def test_stream_execution_results_with_accept_header(client):
+    """Test streaming execution results is negotiated through Accept"""
+    response = client.get("/executions/1", headers={"Accept": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.is_streamed
+
+
+def test_execution_dates_keep_the_http_format(client):
+    """Test the JSON provider keeps RFC 822 dates in responses"""
+    response = client.get("/executions/1")
+    body = response.get_json()
+
+    assert body["executions"][0]["execution_date"].endswith("GMT")
@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("asgiref")
+
+from flaskapp import create_app  # noqa: E402
+from flaskapp.asgi import AsyncApp  # noqa: E402
+from flaskapp.database.models import db  # noqa: E402
+from flaskapp.seed import seed_database  # noqa: E402
+
+
+class Response:
+    def __init__(self, messages):
+        start = messages[0]
+        self.status_code = start["status"]
+        self.headers = {name.decode(): value.decode() for name, value in start["headers"]}
+        self.data = b"".join(message.get("body", b"") for message in messages[1:])
+
+    def get_json(self):
+        return json.loads(self.data)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({"DATABASE_URI": f"sqlite:///{tmp_path / 'asgi.db'}"})
+    with app.app_context():
+        seed_database(test_cases=5, assets=2, executions=40, seed=1)
+    yield app
+    with app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def call(app):
+    """Sends requests through the ASGI app, all on one event loop."""
+    asgi = AsyncApp(app)
+    loop = asyncio.new_event_loop()
+
+    def send_request(method, path, query="", headers=(), body=b""):
+        if body:
+            headers = [*headers, ("Content-Length", str(len(body)))]
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "root_path": "",
+            "query_string": query.encode(),
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+            "server": ("testserver", 80),
+            "client": ("127.0.0.1", 50000),
+        }
+        messages = []
+        requests = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        loop.run_until_complete(asgi(scope, receive, send))
+        return Response(messages)
+
+    yield send_request
+    loop.run_until_complete(asgi.engine.dispose())
+    loop.close()
+
+
+@pytest.mark.parametrize(
+    "path, query",
+    [
+        ("/tests", "per_page=3"),
+        ("/tests", "fields=name&cursor=2"),
+        ("/tests", "page=999"),
+        ("/tests/2", ""),
+        ("/tests/2", "fields=id,description"),
+        ("/tests/999", ""),
+        ("/executions/1", "order=desc&per_page=5"),
+        ("/executions/1", "status=failed&fields=id,status"),
+        ("/executions/1", "order=sideways"),
+        ("/executions/999", ""),
+        ("/assets/1/status", "per_page=10"),
+        ("/assets/999/status", ""),
+    ],
+)
+def test_async_views_match_the_sync_app(app, call, path, query):
+    """Test the async views answer like the Flask views they replace"""
+    expected = app.test_client().get(f"{path}?{query}", headers={"Accept-Encoding": "identity"})
+    app.extensions["response_cache"].clear()
+
+    response = call("GET", path, query)
+
+    assert response.status_code == expected.status_code
+    assert response.get_json() == expected.get_json()
+
+
+def test_async_views_keep_the_request_hooks(call):
+    """Test async responses go through the cache and metrics hooks"""
+    first = call("GET", "/tests")
+    second = call("GET", "/tests", headers=[("If-None-Match", first.headers["etag"])])
+
+    assert first.status_code == 200
+    assert 'desc="0 queries"' not in first.headers["server-timing"]
+    assert second.status_code == 304
+    assert second.data == b""
+
+
+def test_streams_and_writes_go_to_the_sync_app(call):
+    """Test requests without an async view are served through WsgiToAsgi"""
+    total = call("GET", "/tests").get_json()["total_test_cases"]
+
+    created = call("POST", "/tests", headers=[("Content-Type", "application/json")], body=b'{"name": "Over ASGI"}')
+    stream = call("GET", "/executions/1", "stream=1")
+
+    assert created.status_code == 200
+    assert call("GET", "/tests").get_json()["total_test_cases"] == total + 1
+    assert stream.headers["content-type"] == "application/x-ndjson"
+    assert all(json.loads(line)["id"] for line in stream.data.splitlines())
@@ -0,0 +1,67 @@
+from flaskapp.database import models
+
+
+def latest_statuses(client, asset_id):
+    body = client.get(f"/assets/{asset_id}/status?per_page=100").get_json()
+    return {row["test_case"]["id"]: row for row in body["test_cases"]}
+
+
+def test_asset_status_lists_each_test_case_once(client):
+    """Test the status of an asset has one row per executed test case"""
+    response = client.get("/assets/1/status?per_page=100")
+    body = response.get_json()
+    test_case_ids = [row["test_case"]["id"] for row in body["test_cases"]]
+
+    assert response.status_code == 200
+    assert body["asset"]["id"] == 1
+    assert test_case_ids
+    assert len(test_case_ids) == len(set(test_case_ids))
+
+
+def test_asset_status_follows_new_executions(client):
+    """Test single and batch inserts replace the latest execution"""
+    client.post("/executions", json={"asset_id": 3, "test_case_id": 2, "status": False, "details": "Broken"})
+    assert latest_statuses(client, 3)[2]["status"] is False
+
+    response = client.post(
+        "/executions/batch",
+        json=[
+            {"asset_id": 3, "test_case_id": 2, "status": False, "details": "Still broken"},
+            {"asset_id": 3, "test_case_id": 2, "status": True, "details": "Fixed"},
+        ],
+    )
+    latest = latest_statuses(client, 3)[2]
+
+    assert latest["status"] is True
+    assert latest["details"] == "Fixed"
+    assert latest["execution_id"] == response.get_json()["results"][1]["id"]
+
+
+def test_asset_status_sparse_fieldset(client):
+    """Test ?fields= narrows the status rows"""
+    response = client.get("/assets/1/status?fields=status,execution_id")
+    rows = response.get_json()["test_cases"]
+
+    assert response.status_code == 200
+    assert rows
+    assert all(set(row) == {"status", "execution_id"} for row in rows)
+
+
+def test_404_status_of_nonexistent_asset(client):
+    """Test the status of a missing asset"""
+    response = client.get("/assets/10000/status")
+
+    assert response.status_code == 404
+
+
+def test_deleting_the_latest_execution_restores_the_previous_one(app, client):
+    """Test removing an execution recomputes the latest status"""
+    before = latest_statuses(client, 1)[1]
+    with app.app_context():
+        execution = models.Execution(test_case_id=1, asset_id=1, status=False, details="Temporary")
+        execution.insert()
+        assert latest_statuses(client, 1)[1]["execution_id"] == execution.id
+
+        models.Execution.get(execution.id).delete()
+
+    assert latest_statuses(client, 1)[1]["execution_id"] == before["execution_id"]
@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+import shutil
+import stat
+import sys
+
+import pytest
+from flask import Flask
+
+from flaskapp.cache import FileCache, MemoryCache, cached_row
+from flaskapp.database import models
+from flaskapp.database.versions import MmapVersionStore, runtime_path
+
+
+@pytest.fixture
+def client(app_with_db):
+    return app_with_db.test_client()
+
+
+def test_etag_revalidation_skips_the_database(client, captured_sql):
+    """Test a matching If-None-Match is answered from the cache"""
+    response = client.get("/tests/1")
+    etag = response.headers["ETag"]
+    captured_sql.clear()
+
+    response = client.get("/tests/1", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert captured_sql == []
+
+
+def test_writes_invalidate_cached_responses(client):
+    """Test a write to a table changes the responses depending on it"""
+    before = client.get("/tests/1")
+
+    client.patch("/tests/1", json={"name": "Cache Busting Name"})
+    after = client.get("/tests/1", headers={"If-None-Match": before.headers["ETag"]})
+
+    assert after.status_code == 200
+    assert after.get_json()["test_case"]["name"] == "Cache Busting Name"
+    assert after.headers["ETag"] != before.headers["ETag"]
+
+
+def test_errors_are_not_cached(client, captured_sql):
+    """Test only successful responses are cached"""
+    client.get("/tests/10000")
+    captured_sql.clear()
+
+    response = client.get("/tests/10000")
+
+    assert response.status_code == 404
+    assert captured_sql
+
+
+def test_response_cache_evicts_least_recently_used():
+    """Test the cache keeps at most max_entries entries"""
+    cache = MemoryCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_response_cache_expires_entries():
+    """Test entries older than the TTL are dropped"""
+    cache = MemoryCache(max_entries=2, ttl=-1)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+
+
+def test_file_cache_is_shared_between_instances(tmp_path):
+    """Test two processes pointing at one directory share entries"""
+    writer = FileCache(str(tmp_path), ttl=60)
+    reader = FileCache(str(tmp_path), ttl=60)
+    writer.set(("row", "asset", 1), {"id": 1, "name": "First Asset"})
+
+    assert reader.get(("row", "asset", 1)) == {"id": 1, "name": "First Asset"}
+    assert reader.get(("row", "asset", 2)) is None
+
+
+def test_file_cache_expires_entries(tmp_path):
+    """Test expired files are neither returned nor kept"""
+    cache = FileCache(str(tmp_path), ttl=-1)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_file_cache_refuses_a_directory_others_can_write(tmp_path):
+    """Test the cache never unpickles files from a directory other users can write to"""
+    directory = tmp_path / "cache"
+    directory.mkdir()
+    directory.chmod(0o777)
+
+    with pytest.raises(RuntimeError):
+        FileCache(str(directory))
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="No getuid on Windows.")
+def test_runtime_paths_are_private_to_the_database(tmp_path):
+    """Test deployments on different databases never share versions or cache entries"""
+    apps = [Flask(__name__) for _ in range(3)]
+    apps[0].config["DATABASE_URI"] = apps[1].config["DATABASE_URI"] = f"sqlite:///{tmp_path / 'a.db'}"
+    apps[2].config["DATABASE_URI"] = f"sqlite:///{tmp_path / 'b.db'}"
+
+    paths = [runtime_path(app, "table-versions") for app in apps]
+    try:
+        assert paths[0] == paths[1] != paths[2]
+        assert all(stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700 for path in paths)
+    finally:
+        for path in paths:
+            shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="No fcntl on Windows.")
+def test_mmap_versions_are_seen_by_other_processes(tmp_path):
+    """Test a bump in a child process reaches the parent's mapping"""
+    store = MmapVersionStore(str(tmp_path / "versions"))
+    before = store.get(("execution",))
+
+    child = multiprocessing.get_context("fork").Process(target=bump_in_child, args=(str(tmp_path / "versions"),))
+    child.start()
+    child.join()
+
+    assert child.exitcode == 0
+    assert store.get(("execution",)) == (before[0] + 1,)
+    assert store.get(("asset",)) == (0,)
+
+
+def bump_in_child(path):
+    MmapVersionStore(path).bump(("execution",))
+
+
+def test_cached_row_is_invalidated_by_writes(app_with_db):
+    """Test cached lookups follow writes to their table"""
+    with app_with_db.app_context():
+        test_case = models.TestCase("Cached Lookup", None)
+        test_case.insert()
+        assert cached_row(models.TestCase, test_case.id)["name"] == "Cached Lookup"
+
+        test_case.name = "Renamed Lookup"
+        test_case.update()
+        assert cached_row(models.TestCase, test_case.id)["name"] == "Renamed Lookup"
+
+        test_case.delete()
+        assert cached_row(models.TestCase, test_case.id) is None
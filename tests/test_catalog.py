@@ -0,0 +1,98 @@
+import pytest
+
+
+@pytest.fixture
+def client(app_with_db):
+    return app_with_db.test_client()
+
+
+def test_upsert_test_cases_by_name(client):
+    """Test POST /tests/batch creates new names and updates existing ones"""
+    existing = client.post("/tests", json={"name": "Existing Sync"}).get_json()["test_case"]["id"]
+    before = client.get("/tests").get_json()["total_test_cases"]
+    response = client.post(
+        "/tests/batch",
+        json=[
+            {"name": "Existing Sync", "description": "Synced description"},
+            {"name": "Synced Test", "description": "From source control"},
+            {"description": "No name"},
+        ],
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["succeeded"] == 2
+    assert body["failed"] == 1
+    assert body["results"][0] == {"index": 0, "success": True, "id": existing, "created": False}
+    assert body["results"][1]["created"] is True
+    assert body["total_test_cases"] == before + 1
+
+    updated = client.get(f"/tests/{body['results'][0]['id']}").get_json()["test_case"]
+    assert updated["description"] == "Synced description"
+
+
+def test_upsert_keeps_the_last_item_of_a_repeated_name(client):
+    """Test a name repeated in one batch becomes a single test case"""
+    response = client.post(
+        "/tests/batch",
+        json=[{"name": "Repeated Sync", "description": "old"}, {"name": "Repeated Sync", "description": "new"}],
+    )
+    results = response.get_json()["results"]
+
+    assert results[0]["id"] == results[1]["id"]
+    assert client.get(f"/tests/{results[0]['id']}").get_json()["test_case"]["description"] == "new"
+
+
+def test_update_test_cases_batch(client):
+    """Test PATCH /tests/batch updates by id and reports unknown ids"""
+    created = client.post("/tests/batch", json=[{"name": "Patch Me"}]).get_json()["results"][0]["id"]
+    response = client.patch(
+        "/tests/batch",
+        json=[{"id": created, "name": "Patched", "description": "Done"}, {"id": 99999, "name": "Missing"}, {"id": 1}],
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert [result["success"] for result in body["results"]] == [True, False, False]
+    assert client.get(f"/tests/{created}").get_json()["test_case"] == {
+        "id": created,
+        "name": "Patched",
+        "description": "Done",
+    }
+
+
+def test_delete_test_cases_batch(client):
+    """Test DELETE /tests/batch takes {"id"} items like PATCH and skips unknown and still used test cases"""
+    results = client.post("/tests/batch", json=[{"name": "Delete A"}, {"name": "Delete B"}]).get_json()["results"]
+    ids = [result["id"] for result in results]
+    before = client.get("/tests").get_json()["total_test_cases"]
+
+    items = [{"id": test_case_id} for test_case_id in ids] + [{"id": 99999}, {"id": 1}, {"id": "x"}, ids[0]]
+    response = client.delete("/tests/batch", json=items)
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["succeeded"] == 2
+    assert [result["error"] for result in body["results"][2:]] == [
+        "The test case was not found in the database.",
+        "The test case still has executions.",
+        "The id must be an integer.",
+        "The item must be a JSON object.",
+    ]
+    assert body["total_test_cases"] == before - 2
+    assert all(client.get(f"/tests/{test_case_id}").status_code == 404 for test_case_id in ids)
+
+
+def test_test_case_batch_runs_one_statement_per_kind(client, captured_sql):
+    """Test a batch upsert does not send one INSERT per item"""
+    client.post("/tests/batch", json=[{"name": f"Bulk {number}"} for number in range(50)])
+    inserts = [statement for statement, _, _ in captured_sql if statement.startswith("INSERT INTO test_case ")]
+
+    assert len(inserts) == 1
+
+
+def test_400_test_case_batch_not_a_list(client):
+    """Test a batch body must be a list"""
+    response = client.post("/tests/batch", json={"name": "Not a list"})
+
+    assert response.status_code == 400
@@ -0,0 +1,89 @@
+import gzip
+
+import pytest
+
+from flaskapp import cache
+
+LARGE = "/executions/1?per_page=100"
+
+
+@pytest.fixture
+def client(app_with_db):
+    app_with_db.extensions["response_cache"].clear()
+    return app_with_db.test_client()
+
+
+def test_large_response_is_gzipped(client):
+    """Test large responses are compressed for clients accepting gzip"""
+    plain = client.get(LARGE)
+    response = client.get(LARGE, headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert len(response.get_data()) < len(plain.get_data())
+
+
+def test_uncached_response_is_gzipped(client):
+    """Test responses outside the cache are compressed after the request"""
+    execution = {"asset_id": 1, "test_case_id": 1, "status": True, "details": "Compressed"}
+    response = client.post("/executions/batch", json=[execution] * 20, headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(gzip.decompress(response.get_data())) > len(response.get_data())
+
+
+def test_response_without_accept_encoding_is_not_compressed(client):
+    """Test clients that do not ask for compression get identity bodies"""
+    response = client.get(LARGE)
+
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+def test_small_response_is_not_compressed(app_with_db, client):
+    """Test responses under COMPRESSION_MIN_SIZE are sent as they are"""
+    response = client.get("/tests/1", headers={"Accept-Encoding": "gzip"})
+
+    assert len(response.get_data()) < app_with_db.config["COMPRESSION_MIN_SIZE"]
+    assert "Content-Encoding" not in response.headers
+
+
+def test_refused_encoding_is_not_used(client):
+    """Test q=0 excludes an encoding"""
+    response = client.get(LARGE, headers={"Accept-Encoding": "gzip;q=0"})
+
+    assert "Content-Encoding" not in response.headers
+
+
+def test_cached_response_is_compressed_once(client, monkeypatch):
+    """Test hits reuse the compressed bytes kept in the cache entry"""
+    calls = []
+    compress = cache.compress
+    monkeypatch.setattr(cache, "compress", lambda data, encoding: calls.append(encoding) or compress(data, encoding))
+
+    first = client.get(LARGE, headers={"Accept-Encoding": "gzip"})
+    second = client.get(LARGE, headers={"Accept-Encoding": "gzip"})
+
+    assert calls == ["gzip"]
+    assert second.get_data() == first.get_data()
+
+
+def test_compressed_etag_revalidates(client):
+    """Test the weak ETag of a compressed response still gets a 304"""
+    response = client.get(LARGE, headers={"Accept-Encoding": "gzip"})
+    etag = response.headers["ETag"]
+
+    assert etag.startswith("W/")
+    response = client.get(LARGE, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_brotli_is_preferred_when_installed(client):
+    """Test br wins over gzip when both are accepted"""
+    brotli = pytest.importorskip("brotli")
+    response = client.get(LARGE, headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.get_data())
@@ -0,0 +1,78 @@
+import csv
+import io
+
+import pytest
+from sqlalchemy import func, select
+
+from flaskapp.database import models
+
+
+def execution_count(app, *criteria):
+    with app.app_context():
+        return models.db.session.scalar(select(func.count()).select_from(models.Execution).where(*criteria))
+
+
+def test_csv_export_by_default(app, client):
+    """Test the export is a CSV of every execution, in id order"""
+    response = client.get("/export/executions")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert response.headers["Content-Disposition"] == "attachment; filename=executions.csv"
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == execution_count(app)
+    assert [int(row["id"]) for row in rows] == sorted(int(row["id"]) for row in rows)
+    assert set(rows[0]) == {"id", "asset_id", "test_case_id", "timestamp", "status", "details"}
+
+
+def test_export_filters(app, client):
+    """Test asset_id and the history filters narrow the export"""
+    response = client.get("/export/executions?asset_id=1&status=false")
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == execution_count(app, models.Execution.asset_id == 1, models.Execution.status.is_(False))
+    assert {(row["asset_id"], row["status"]) for row in rows} == {("1", "0")}
+
+
+@pytest.mark.parametrize("query", ["format=xml", "asset_id=one", "status=maybe", "since=yesterday"])
+def test_bad_arguments(client, query):
+    """Test unknown formats and bad filters are rejected with 400"""
+    response = client.get(f"/export/executions?{query}")
+
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+@pytest.mark.parametrize("name", ["arrow", "parquet"])
+def test_columnar_exports(app, client, monkeypatch, name):
+    """Test Arrow and Parquet exports are typed and written batch by batch"""
+    pyarrow = pytest.importorskip("pyarrow")
+    ipc = pytest.importorskip("pyarrow.ipc")
+    parquet_module = pytest.importorskip("pyarrow.parquet")
+
+    monkeypatch.setitem(app.config, "EXPORT_BATCH_SIZE", 64)
+    response = client.get(f"/export/executions?format={name}")
+
+    assert response.status_code == 200
+    data = pyarrow.BufferReader(response.get_data())
+    if name == "arrow":
+        batches = list(ipc.open_stream(data))
+        table = pyarrow.Table.from_batches(batches)
+    else:
+        parquet = parquet_module.ParquetFile(data)
+        batches = [parquet.read_row_group(group) for group in range(parquet.num_row_groups)]
+        table = parquet.read()
+    assert table.num_rows == execution_count(app)
+    assert len(batches) == -(-table.num_rows // 64)
+    assert str(table.schema.field("timestamp").type) == "timestamp[us]"
+    assert str(table.schema.field("status").type) == "bool"
+
+
+def test_format_from_accept_header(client):
+    """Test the Accept header picks the format when format= is missing"""
+    pytest.importorskip("pyarrow")
+
+    response = client.get("/export/executions", headers={"Accept": "application/vnd.apache.parquet"})
+
+    assert response.mimetype == "application/vnd.apache.parquet"
+    assert response.get_data()[:4] == b"PAR1"
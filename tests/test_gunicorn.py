@@ -1,3 +1,4 @@
+import runpy
 import sys
 from unittest import mock
 
@@ -15,3 +16,33 @@ def test_config_imports():
             run()
 
     assert excinfo.value.args[0] == 0
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Windows doesn't have what it takes.")
+def test_asgi_config_imports():
+    pytest.importorskip("uvicorn")
+    pytest.importorskip("aiosqlite")
+    from gunicorn.app.wsgiapp import run
+
+    argv = ["gunicorn", "--check-config", "flaskapp.asgi:app", "-c", "src/gunicorn.asgi.conf.py"]
+
+    with mock.patch.object(sys, "argv", argv):
+        with pytest.raises(SystemExit) as excinfo:
+            run()
+
+    assert excinfo.value.args[0] == 0
+
+
+@pytest.mark.parametrize("config", ["src/gunicorn.conf.py", "src/gunicorn.asgi.conf.py"])
+def test_configs_preload_the_app(config):
+    """Test workers fork from the app the master built"""
+    assert runpy.run_path(config)["preload_app"] is True
+
+
+def test_asgi_config_extends_the_wsgi_config():
+    """Test the ASGI config keeps the hooks of the WSGI one and swaps the worker"""
+    config = runpy.run_path("src/gunicorn.asgi.conf.py")
+
+    assert {"on_starting", "child_exit", "pre_fork", "post_worker_init"} <= config.keys()
+    assert config["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert config["threads"] == 1
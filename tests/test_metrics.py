@@ -0,0 +1,90 @@
+import os
+import re
+import shutil
+import stat
+import sys
+
+import pytest
+from flask import Flask
+
+from flaskapp import metrics
+
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=[\d.]+, app;dur=[\d.]+, total;dur=[\d.]+'
+)
+
+
+@pytest.fixture
+def client(app_with_db):
+    app_with_db.extensions["response_cache"].clear()
+    metrics.histograms.clear()
+    return app_with_db.test_client()
+
+
+def test_server_timing_counts_queries(client):
+    """Test responses carry a Server-Timing header with the SQL statement count"""
+    response = client.get("/tests")
+    match = SERVER_TIMING.fullmatch(response.headers["Server-Timing"])
+
+    assert match
+    assert int(match.group(1)) >= 1
+
+
+def test_cached_response_sends_no_queries(client):
+    """Test a cache hit reports no SQL time"""
+    client.get("/tests")
+    response = client.get("/tests")
+
+    assert SERVER_TIMING.fullmatch(response.headers["Server-Timing"]).group(1) == "0"
+
+
+def test_metrics_endpoint_exposes_route_histograms(client):
+    """Test /metrics renders per-route histograms in the Prometheus format"""
+    client.get("/tests")
+    client.get("/tests/1")
+    response = client.get("/metrics")
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert "# TYPE flaskapp_request_duration_seconds histogram" in body
+    assert 'flaskapp_request_duration_seconds_count{method="GET",route="/tests",status="200"} 1' in body
+    assert 'route="/tests/<int:test_case_id>"' in body
+    assert 'flaskapp_request_sql_queries_bucket{method="GET",route="/tests",status="200",le="+Inf"} 1' in body
+
+
+def test_metrics_are_added_up_across_processes(tmp_path):
+    """Test the multiprocess directory sums live and exited workers"""
+    labels = (("method", "GET"), ("route", "/tests"), ("status", "200"))
+    for pid, value in ((101, 0.02), (102, 0.3)):
+        histograms = metrics.Histograms()
+        histograms.observe("flaskapp_request_duration_seconds", labels, value)
+        metrics.write_snapshot(metrics.process_file(str(tmp_path), pid), histograms.snapshot())
+
+    metrics.mark_process_dead(str(tmp_path), 101)
+    assert not os.path.exists(metrics.process_file(str(tmp_path), 101))
+
+    metrics.histograms.clear()
+    merged = metrics.collect_metrics(str(tmp_path))
+    sample = merged[("flaskapp_request_duration_seconds", labels)]
+
+    assert sample[-2] == 2
+    assert sample[-1] == pytest.approx(0.32)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="No getuid on Windows.")
+def test_shared_metrics_dir_is_private(tmp_path):
+    """Test shared histograms live in a directory only this user can write to"""
+    app = Flask(__name__)
+    app.config.update(METRICS_ENABLED=True, METRICS_SHARED=True, DATABASE_URI=f"sqlite:///{tmp_path / 'a.db'}")
+    directory = metrics.metrics_dir(app)
+    try:
+        assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    finally:
+        shutil.rmtree(os.path.dirname(directory), ignore_errors=True)
+
+    app.config["METRICS_DIR"] = str(tmp_path / "metrics")
+    os.mkdir(app.config["METRICS_DIR"])
+    os.chmod(app.config["METRICS_DIR"], 0o777)
+    with pytest.raises(RuntimeError):
+        metrics.metrics_dir(app)
@@ -0,0 +1,36 @@
+import sqlalchemy as sa
+from flask_migrate import downgrade, upgrade
+
+from flaskapp import create_app
+from flaskapp.database.models import db
+
+MIGRATIONS_DIR = "src/flaskapp/migrations"
+
+
+def test_migrations_upgrade_and_downgrade(tmp_path):
+    """Test the Alembic revisions build the schema from an empty database"""
+    app = create_app({"DATABASE_URI": f"sqlite:///{tmp_path / 'migrations.db'}"})
+
+    with app.app_context():
+        db.drop_all()
+        upgrade(directory=MIGRATIONS_DIR)
+
+        indexes = {index["name"] for index in sa.inspect(db.engine).get_indexes("execution")}
+        assert {
+            "ix_execution_asset_id_id",
+            "ix_execution_test_case_id_id",
+            "ix_execution_asset_id_timestamp",
+            "ix_execution_asset_id_status",
+            "ix_execution_asset_id_test_case_id",
+        } <= indexes
+        assert "ix_execution_rollup_asset_id_day" in {
+            index["name"] for index in sa.inspect(db.engine).get_indexes("execution_rollup")
+        }
+        assert "ix_test_case_name" in {index["name"] for index in sa.inspect(db.engine).get_indexes("test_case")}
+        tables = set(sa.inspect(db.engine).get_table_names())
+        assert {"execution_rollup", "latest_execution", "execution_spool", "execution_partition"} <= tables
+        assert {"test_case_fts", "execution_fts"} <= tables
+
+        downgrade(directory=MIGRATIONS_DIR, revision="base")
+        assert sa.inspect(db.engine).get_table_names() == ["alembic_version"]
+        db.engine.dispose()
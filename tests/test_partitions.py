@@ -0,0 +1,145 @@
+import csv
+import gzip
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select
+
+from flaskapp.database import models
+from flaskapp.partitions import archive_executions
+
+
+@pytest.fixture
+def seed():
+    return {"test_cases": 4, "assets": 2, "executions": 600, "days": 120, "seed": 3}
+
+
+def partitions(app):
+    with app.app_context():
+        return {
+            partition.month: partition
+            for partition in models.db.session.scalars(select(models.ExecutionPartition)).all()
+        }
+
+
+def execution_count(app):
+    with app.app_context():
+        return models.db.session.scalar(select(func.count()).select_from(models.Execution))
+
+
+def test_partitions_track_every_execution(app, client):
+    """Test the monthly partitions account for seeded and new executions"""
+    assert sum(partition.rows for partition in partitions(app).values()) == 600
+
+    client.post("/executions", json={"asset_id": 1, "test_case_id": 1, "status": True, "details": "Success"})
+    client.post(
+        "/executions/batch", json=[{"asset_id": 2, "test_case_id": 2, "status": False, "details": "Failure"}] * 3
+    )
+
+    current = partitions(app)[datetime.utcnow().strftime("%Y-%m")]
+    assert sum(partition.rows for partition in partitions(app).values()) == 604
+    with app.app_context():
+        assert current.last_id == models.db.session.scalar(select(func.max(models.Execution.id)))
+
+
+def test_time_range_is_pruned_to_an_id_range(app, client):
+    """Test since/until queries seek the id range of the matching months"""
+    since = (datetime.utcnow() - timedelta(days=50)).date().isoformat()
+    until = (datetime.utcnow() - timedelta(days=40)).date().isoformat()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = models.db.engine
+        expected = models.db.session.scalar(
+            select(func.count())
+            .select_from(models.Execution)
+            .where(
+                models.Execution.asset_id == 1,
+                models.Execution.timestamp >= datetime.fromisoformat(since),
+                models.Execution.timestamp < datetime.fromisoformat(until) + timedelta(days=1),
+            )
+        )
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(f"/executions/1?since={since}&until={until}&per_page=100")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert response.get_json()["total_executions"] == expected
+    assert len(response.get_json()["executions"]) == expected
+    assert any("execution.id BETWEEN" in statement for statement in statements)
+
+
+def test_range_without_partitions_is_empty(client):
+    """Test a range before the first month is answered without rows"""
+    response = client.get("/executions/1?until=2001-01-01")
+
+    assert response.status_code == 404
+
+
+def test_incomplete_partitions_are_not_trusted(app, client):
+    """Test a database whose partitions miss executions is not pruned"""
+    with app.app_context():
+        models.db.session.execute(models.ExecutionPartition.__table__.delete())
+        models.db.session.commit()
+
+    response = client.get("/executions/1?until=2100-01-01&per_page=1")
+
+    assert response.status_code == 200
+    assert response.get_json()["total_executions"] > 0
+
+
+def test_archive_moves_old_months_to_files(app, client, tmp_path):
+    """Test archiving writes old months to gzipped CSV and deletes them"""
+    before = execution_count(app)
+    with app.app_context():
+        latest = set(models.db.session.scalars(select(models.LatestExecution.execution_id)))
+        cutoff = datetime.utcnow() - timedelta(days=40)
+        archives = archive_executions(cutoff, str(tmp_path / "archive"), batch_size=50)
+
+    archived = sum(rows for _, _, rows in archives)
+    assert archives
+    assert all(month < cutoff.strftime("%Y-%m") for month, _, _ in archives)
+    assert execution_count(app) == before - archived
+
+    archived_ids = set()
+    for _, path, rows in archives:
+        with gzip.open(path, "rt", newline="") as f:
+            lines = list(csv.DictReader(f))
+        assert len(lines) == rows
+        archived_ids.update(int(line["id"]) for line in lines)
+    assert not archived_ids & latest
+
+    for month, _, rows in archives:
+        assert partitions(app)[month].archived_rows == rows
+    totals = [client.get(f"/executions/{asset_id}?per_page=1").get_json()["total_executions"] for asset_id in (1, 2)]
+    assert sum(totals) == execution_count(app)
+    assert client.get("/assets/1/status").get_json()["test_cases"]
+
+
+def test_archive_command(app, tmp_path):
+    """Test flask archive-executions reports the archived months"""
+    result = app.test_cli_runner().invoke(
+        args=["archive-executions", "--older-than", "40", "--directory", str(tmp_path / "archive")]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "executions archived." in result.output
+    assert list((tmp_path / "archive").glob("executions-*.csv.gz"))
+
+
+def test_parquet_archive(app, tmp_path):
+    """Test archives can be written as Parquet"""
+    parquet = pytest.importorskip("pyarrow.parquet")
+    with app.app_context():
+        archives = archive_executions(datetime.utcnow() - timedelta(days=40), str(tmp_path), "parquet")
+
+    table = parquet.read_table(archives[0][1])
+    assert table.num_rows == archives[0][2]
+    assert str(table.schema.field("timestamp").type) == "timestamp[us]"
+    assert str(table.schema.field("status").type) == "bool"
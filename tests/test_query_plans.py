@@ -0,0 +1,95 @@
+import re
+
+import pytest
+
+from flaskapp.database.models import db
+
+# Tables that grow without bound, reading them must always go through an
+# index, in the order the statement asks for.
+HOT_TABLES = {"execution", "execution_rollup", "latest_execution"}
+
+SCAN = re.compile(r"^SCAN (\w+)")
+READ = re.compile(r"^(?:SCAN|SEARCH) (\w+)")
+TEMP_BTREE = re.compile(r"^USE TEMP B-TREE")
+
+
+def query_plan(statement, parameters):
+    return [row[-1] for row in db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+def assert_no_hot_scans(app, statements, full_scans=()):
+    """
+    assert_no_hot_scans(app, statements, full_scans=())
+    fails when a statement scans a hot table other than those in full_scans,
+    or sorts rows of a hot table in a temporary B-tree. Full-text matches
+    are exempt from the latter, no index holds their relevance order.
+    """
+    scanned = HOT_TABLES - set(full_scans)
+    with app.app_context():
+        for statement, parameters, executemany in statements:
+            if executemany or not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = query_plan(statement, parameters)
+            for detail in plan:
+                match = SCAN.match(detail)
+                assert not (match and match.group(1) in scanned), f"{detail!r} for {statement!r}"
+            ranked = any("VIRTUAL TABLE" in detail for detail in plan)
+            if not ranked and any(match and match.group(1) in HOT_TABLES for match in map(READ.match, plan)):
+                assert not any(map(TEMP_BTREE.match, plan)), f"{plan!r} for {statement!r}"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/tests",
+        "/tests?cursor=1",
+        "/tests/1",
+        "/executions/1",
+        "/executions/1?cursor=2",
+        "/executions/1?status=false",
+        "/executions/1?fields=id,status",
+        "/executions/1?test_case_id=2&order=desc",
+        "/executions/1?since=2024-01-01&until=2030-01-01",
+        "/assets/1/status",
+        "/assets/1/status?cursor=1",
+        "/stats/assets/1",
+        "/stats/assets/1?since=2024-01-01",
+        "/stats/assets/1/history",
+        "/stats/assets/1/history?bucket=month",
+        "/stats/tests/1",
+        "/stats/tests/1/history?bucket=week",
+        "/search?q=generated",
+        "/search?q=failure&type=executions",
+        "/search?q=failure&type=executions&order=rank",
+        "/export/executions?asset_id=1",
+        "/export/executions?asset_id=1&since=2024-01-01",
+        "/export/executions?test_case_id=1",
+    ],
+)
+def test_read_queries_use_indexes(app, client, captured_sql, url):
+    """Test the SQL behind read endpoints never scans or sorts hot tables"""
+    response = client.get(url)
+    response.get_data()
+
+    assert response.status_code == 200
+    assert captured_sql
+    assert_no_hot_scans(app, captured_sql)
+
+
+def test_full_export_reads_in_id_order(app, client, captured_sql):
+    """Test an unfiltered export reads every execution, without sorting them"""
+    response = client.get("/export/executions")
+    response.get_data()
+
+    assert response.status_code == 200
+    assert_no_hot_scans(app, captured_sql, full_scans={"execution"})
+
+
+def test_write_queries_use_indexes(app, client, captured_sql):
+    """Test the SQL behind write endpoints never scans hot tables"""
+    execution = {"asset_id": 1, "test_case_id": 1, "status": True, "details": "Success"}
+    assert client.post("/executions", json=execution).status_code == 200
+    assert client.post("/executions/batch", json=[execution]).status_code == 200
+    assert client.delete("/tests/batch", json=[{"id": 1}]).status_code == 200
+
+    assert_no_hot_scans(app, captured_sql)
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from flaskapp import create_app
+from flaskapp.database import models
+from flaskapp.database.models import db
+
+
+@pytest.fixture
+def app_with_reader(tmp_path):
+    app = create_app({"DATABASE_URI": f"sqlite:///{tmp_path / 'routing.db'}", "DATABASE_READER_ENABLED": True})
+    with app.app_context():
+        models.TestCase("Routed Test Case", None).insert()
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_get_requests_use_the_reader(app_with_reader):
+    """Test GET requests are routed to the read-only engine"""
+    with app_with_reader.test_request_context("/tests/1", method="GET"):
+        assert db.session.get_bind() is db.engines["reader"]
+        assert models.TestCase.get(1).name == "Routed Test Case"
+
+
+def test_writes_stay_on_the_primary(app_with_reader):
+    """Test non-GET requests keep using the primary engine"""
+    with app_with_reader.test_request_context("/tests", method="POST"):
+        assert db.session.get_bind() is db.engine
+        models.TestCase("Primary Test Case", None).insert()
+
+
+def test_reader_refuses_writes(app_with_reader):
+    """Test the read-only engine cannot modify the database"""
+    with app_with_reader.app_context():
+        with db.engines["reader"].connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text("DELETE FROM test_case"))
+
+
+def test_get_endpoint_through_the_reader(app_with_reader):
+    """Test a GET endpoint is served from the read-only engine"""
+    response = app_with_reader.test_client().get("/tests")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["test_cases"][0]["name"] == "Routed Test Case"
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from flaskapp import create_app
+from flaskapp.database import models
+from flaskapp.partitions import archive_executions
+
+
+@pytest.fixture
+def seed():
+    return {"test_cases": 10, "assets": 2, "executions": 400, "days": 90, "seed": 7}
+
+
+def assert_index_in_sync(app):
+    # With rank 1, FTS5 checks its index against the rows of the content table.
+    with app.app_context():
+        for table_name in models.SEARCH_COLUMNS:
+            models.db.session.execute(
+                text(f"INSERT INTO {table_name}_fts ({table_name}_fts, rank) VALUES ('integrity-check', 1)")
+            )
+
+
+def search(client, query):
+    response = client.get(f"/search?{query}")
+    return response.status_code, response.get_json()
+
+
+def test_test_cases_are_ranked(client):
+    """Test a match in a test case name ranks above one in a description"""
+    client.post("/tests", json={"name": "Checkout flow", "description": "Pays with a saved login"})
+    client.post("/tests", json={"name": "Login with SSO", "description": "Signs in"})
+
+    status, body = search(client, "q=login")
+
+    assert status == 200
+    assert [test_case["name"] for test_case in body["test_cases"]] == ["Login with SSO", "Checkout flow"]
+    assert body["next_page"] is None
+
+
+def test_executions_newest_first_with_filters(app, client):
+    """Test execution matches come newest first, filtered and paged by cursor"""
+    query = "q=timed device&type=executions&status=false&asset_id=1&per_page=2"
+    status, first = search(client, query)
+    _, second = search(client, f"{query}&cursor={first['next_cursor']}")
+
+    assert status == 200
+    assert first["next_cursor"] == first["executions"][-1]["id"]
+    executions = first["executions"] + second["executions"]
+    ids = [execution["id"] for execution in executions]
+    assert ids == sorted(ids, reverse=True)
+    assert all(execution["asset_id"] == 1 and execution["status"] is False for execution in executions)
+    assert all(execution["details"] == "Timed out waiting for the device" for execution in executions)
+
+
+def test_execution_time_range(client):
+    """Test since/until narrow execution matches to their months"""
+    until = (datetime.utcnow() - timedelta(days=60)).replace(microsecond=0)
+
+    status, body = search(client, f"q=expected&type=executions&until={until.isoformat()}&per_page=100")
+
+    assert status == 200
+    assert body["executions"]
+    assert all(datetime.strptime(e["timestamp"], "%a, %d %b %Y %H:%M:%S GMT") <= until for e in body["executions"])
+
+
+def test_ranked_execution_pages(client):
+    """Test order=rank pages through every match once"""
+    ids = []
+    page = 1
+    while page:
+        _, body = search(client, f"q=failure&type=executions&order=rank&per_page=7&page={page}")
+        ids += [execution["id"] for execution in body["executions"]]
+        page = body["next_page"]
+
+    assert ids
+    assert len(ids) == len(set(ids))
+
+
+def test_query_syntax_is_not_interpreted(client):
+    """Test punctuation and FTS5 operators in q are searched as words"""
+    status, body = search(client, 'q=Assertion failed: "expected 200, got 500" OR NOT -x*&type=executions')
+
+    assert status == 404
+    status, body = search(client, "q=assertion failed: expected 200, got 500&type=executions")
+    assert status == 200
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["", "q=", "q=%22-%22", "q=login&type=assets", "q=login&order=best", "q=login&type=executions&status=maybe"],
+)
+def test_bad_search_arguments(client, query):
+    """Test searches without a word or with unknown options are rejected"""
+    status, body = search(client, query)
+
+    assert status == 400
+    assert body["success"] is False
+
+
+def test_index_follows_every_write(app, client, tmp_path):
+    """Test single and batch writes, deletes and archives keep the index in sync"""
+    created = client.post("/tests", json={"name": "Flaky printer", "description": "Paper jam"}).get_json()
+    test_case_id = created["test_case"]["id"]
+    client.patch(f"/tests/{test_case_id}", json={"name": "Stable printer"})
+    client.post("/tests/batch", json=[{"name": "Scanner"}, {"name": "Test Case 1", "description": "Renamed by batch"}])
+    client.patch("/tests/batch", json=[{"id": 2, "name": "Fax"}])
+    client.delete("/tests/batch", json=[{"id": test_case_id}])
+    client.post("/executions", json={"asset_id": 1, "test_case_id": 3, "status": False, "details": "Toner low"})
+    client.post("/executions/batch", json=[{"asset_id": 2, "test_case_id": 3, "status": False, "details": "Toner out"}])
+    with app.app_context():
+        archive_executions(datetime.utcnow() - timedelta(days=40), str(tmp_path / "archive"))
+
+    assert_index_in_sync(app)
+    assert search(client, "q=printer")[0] == 404
+    assert search(client, "q=renamed batch")[1]["test_cases"][0]["name"] == "Test Case 1"
+    assert search(client, "q=fax")[1]["test_cases"][0]["id"] == 2
+    assert len(search(client, "q=toner&type=executions")[1]["executions"]) == 2
+
+
+def test_model_updates_and_deletes(app, client):
+    """Test the ORM update and delete paths reindex the changed rows"""
+    with app.app_context():
+        execution = models.Execution.get(1)
+        execution.details = "Rewritten by hand"
+        execution.update()
+        models.Execution.get(2).delete()
+
+    assert_index_in_sync(app)
+    assert search(client, "q=rewritten&type=executions")[1]["executions"][0]["id"] == 1
+
+
+def test_rebuild_restores_a_missing_index(app, client):
+    """Test the search index is created and filled on startup when missing"""
+    with app.app_context():
+        models.db.session.execute(text("DROP TABLE execution_fts"))
+        models.db.session.commit()
+
+    app = create_app({"DATABASE_URI": app.config["DATABASE_URI"], "RESPONSE_CACHE_ENABLED": False})
+
+    assert_index_in_sync(app)
+    assert search(app.test_client(), "q=success&type=executions")[0] == 200
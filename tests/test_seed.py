@@ -0,0 +1,28 @@
+from sqlalchemy import func, select
+
+from flaskapp.database import models
+
+
+def counts(app):
+    with app.app_context():
+        return {
+            model: models.db.session.scalar(select(func.count()).select_from(model))
+            for model in (models.TestCase, models.Asset, models.Execution)
+        }
+
+
+def test_seed_adds_rows_and_rebuilds_counters(app_with_db):
+    """Test flask seed bulk inserts rows and keeps the counters right"""
+    before = counts(app_with_db)
+    result = app_with_db.test_cli_runner().invoke(
+        args=["seed", "--test-cases", "5", "--assets", "2", "--executions", "50", "--chunk-size", "7", "--seed", "1"]
+    )
+    after = counts(app_with_db)
+
+    assert result.exit_code == 0, result.output
+    assert after[models.TestCase] == before[models.TestCase] + 5
+    assert after[models.Asset] == before[models.Asset] + 2
+    assert after[models.Execution] == before[models.Execution] + 50
+
+    client = app_with_db.test_client()
+    assert client.get("/tests").get_json()["total_test_cases"] == after[models.TestCase]
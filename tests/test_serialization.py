@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from flaskapp.database import models
+from flaskapp.serialization import JSONProvider, OrjsonProvider, model_serializer, orjson
+
+PROVIDERS = [JSONProvider, pytest.param(OrjsonProvider, marks=pytest.mark.skipif(orjson is None, reason="no orjson"))]
+
+
+@pytest.mark.parametrize("provider_class", PROVIDERS)
+@pytest.mark.parametrize(
+    "datetime_format, expected",
+    [("http", '{"at":"Sat, 02 Mar 2024 17:35:30 GMT"}'), ("iso", '{"at":"2024-03-02T17:35:30"}')],
+)
+def test_providers_serialize_datetimes(provider_class, datetime_format, expected):
+    """Test both providers agree on the configured datetime format"""
+    app = Flask(__name__)
+    app.config["JSON_DATETIME_FORMAT"] = datetime_format
+    provider = provider_class(app)
+
+    with app.app_context():
+        response = provider.response({"at": datetime(2024, 3, 2, 17, 35, 30)})
+
+    assert response.get_data(as_text=True).strip() == expected
+
+
+def test_model_serializer_matches_format():
+    """Test compiled serializers produce the same dict as format()"""
+    test_case = models.TestCase("Serialized", "Description")
+    test_case.id = 7
+
+    assert model_serializer(models.TestCase)(test_case) == test_case.format()
+    assert model_serializer(models.TestCase, ("id",))(test_case) == {"id": 7}
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from flaskapp import create_app, spool
+from flaskapp.database import models
+
+
+@pytest.fixture
+def queued(app_with_db):
+    app_with_db.config.update(EXECUTION_INGEST_MODE="queued", INGEST_WRITER_THREAD=False)
+    yield app_with_db
+    app_with_db.config.update(EXECUTION_INGEST_MODE="sync", INGEST_QUEUE_MAX_PENDING=10000)
+
+
+@pytest.fixture
+def app_config():
+    # `app` has its own database, where a failed batch rolls back for real.
+    return {"EXECUTION_INGEST_MODE": "queued", "INGEST_WRITER_THREAD": False}
+
+
+@pytest.fixture
+def seed():
+    return {"test_cases": 3, "assets": 2, "executions": 10, "seed": 3}
+
+
+def enqueue(client, details):
+    response = client.post("/executions", json={"asset_id": 1, "test_case_id": 2, "status": True, "details": details})
+    return response.get_json()["ticket"]
+
+
+def test_queued_execution_is_written_by_the_spool_writer(queued):
+    """Test a queued execution gets a ticket, then an id once the spool is drained"""
+    client = queued.test_client()
+    response = client.post("/executions", json={"asset_id": 1, "test_case_id": 2, "status": True, "details": "Spooled"})
+    ticket = response.get_json()["ticket"]
+
+    assert response.status_code == 202
+    assert client.get(f"/executions/tickets/{ticket}").get_json()["status"] == "queued"
+
+    result = queued.test_cli_runner().invoke(args=["drain-spool"])
+    assert result.exit_code == 0
+
+    body = client.get(f"/executions/tickets/{ticket}").get_json()
+    assert body["status"] == "done"
+    with queued.app_context():
+        execution = models.db.session.get(models.Execution, body["execution_id"])
+        assert execution.details == "Spooled"
+
+
+def test_queued_execution_is_validated_before_spooling(queued):
+    """Test a queued execution pointing at a missing asset is rejected right away"""
+    response = queued.test_client().post(
+        "/executions", json={"asset_id": 999, "test_case_id": 2, "status": True, "details": "Spooled"}
+    )
+
+    assert response.status_code == 422
+
+
+def test_bad_details_are_rejected_before_spooling(queued):
+    """Test a queued execution whose details are not a string never reaches the spool"""
+    response = queued.test_client().post(
+        "/executions", json={"asset_id": 1, "test_case_id": 2, "status": True, "details": {"x": 1}}
+    )
+
+    assert response.status_code == 400
+
+
+def test_bad_payload_fails_only_its_ticket(app, client, monkeypatch):
+    """Test a payload that cannot be written fails its ticket and the others are still written"""
+    insert_executions = spool.insert_executions
+
+    def fail_on_poison(rows, results):
+        if any(row["details"] == "Poison" for _, row in rows):
+            raise ValueError("Cannot write this one.")
+        insert_executions(rows, results)
+
+    monkeypatch.setattr(spool, "insert_executions", fail_on_poison)
+    tickets = [enqueue(client, details) for details in ("Before", "Poison", "After")]
+
+    result = app.test_cli_runner().invoke(args=["drain-spool"])
+
+    assert result.exit_code == 0
+    bodies = [client.get(f"/executions/tickets/{ticket}").get_json() for ticket in tickets]
+    assert [body["status"] for body in bodies] == ["done", "failed", "done"]
+    assert bodies[1]["error"] == "The execution could not be written."
+
+
+def test_queued_execution_is_dated_when_reported(app, client):
+    """Test the spool writer stamps executions with their ticket's creation time"""
+    ticket = enqueue(client, "Reported long ago")
+    reported = (datetime.utcnow() - timedelta(days=40)).replace(microsecond=0)
+    with app.app_context():
+        models.db.session.execute(
+            update(models.ExecutionSpool).where(models.ExecutionSpool.ticket == ticket).values(created_at=reported)
+        )
+        models.db.session.commit()
+
+    app.test_cli_runner().invoke(args=["drain-spool"])
+
+    execution_id = client.get(f"/executions/tickets/{ticket}").get_json()["execution_id"]
+    with app.app_context():
+        assert models.db.session.get(models.Execution, execution_id).timestamp == reported
+
+
+def test_writer_resumes_a_spool_left_by_a_previous_run(app, client, monkeypatch):
+    """Test the first request after a restart starts the writer when executions are still queued"""
+    ticket = enqueue(client, "Queued before the restart")
+    started = []
+    monkeypatch.setattr(spool, "ensure_spool_writer", started.append)
+
+    restarted = create_app(
+        {
+            "DATABASE_URI": app.config["DATABASE_URI"],
+            "RESPONSE_CACHE_ENABLED": False,
+            "EXECUTION_INGEST_MODE": "queued",
+            "INGEST_WRITER_THREAD": True,
+        }
+    )
+    for _ in range(2):
+        restarted.test_client().get(f"/executions/tickets/{ticket}")
+
+    assert started == [restarted]
+
+
+def test_full_spool_answers_503(queued):
+    """Test the spool refuses new executions once too many are pending"""
+    queued.config["INGEST_QUEUE_MAX_PENDING"] = 0
+    response = queued.test_client().post(
+        "/executions", json={"asset_id": 1, "test_case_id": 2, "status": True, "details": "Spooled"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.get_json()["success"] is False
+
+
+def test_404_unknown_ticket(queued):
+    """Test an unknown ticket returns 404"""
+    response = queued.test_client().get("/executions/tickets/missing")
+
+    assert response.status_code == 404
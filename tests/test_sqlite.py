@@ -0,0 +1,38 @@
+from sqlalchemy import text
+
+from flaskapp import create_app
+from flaskapp.database.models import db
+from flaskapp.database.sqlite import pragma_statements
+
+
+def test_pragma_statements_skip_unset_settings():
+    """Test only configured pragmas are emitted"""
+    statements = pragma_statements({"SQLITE_SYNCHRONOUS": "NORMAL", "SQLITE_MMAP_SIZE": None})
+
+    assert statements == ["PRAGMA synchronous = NORMAL"]
+
+
+def test_production_profile_is_applied_on_connect(tmp_path):
+    """Test the tuned SQLite profile reaches every new connection"""
+    app = create_app(
+        {
+            "DATABASE_URI": f"sqlite:///{tmp_path / 'tuned.db'}",
+            "SQLITE_JOURNAL_MODE": "WAL",
+            "SQLITE_SYNCHRONOUS": "NORMAL",
+            "SQLITE_MMAP_SIZE": 1048576,
+            "SQLITE_CACHE_SIZE": -2000,
+            "SQLITE_TEMP_STORE": "MEMORY",
+            "SQLITE_BUSY_TIMEOUT": 1234,
+        }
+    )
+
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            # NORMAL = 1, MEMORY = 2
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert connection.execute(text("PRAGMA mmap_size")).scalar() == 1048576
+            assert connection.execute(text("PRAGMA cache_size")).scalar() == -2000
+            assert connection.execute(text("PRAGMA temp_store")).scalar() == 2
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        db.engine.dispose()
@@ -0,0 +1,65 @@
+import os
+
+import flask_migrate
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine
+
+from flaskapp import create_app
+from flaskapp.database import models
+
+MIGRATIONS_DIR = "src/flaskapp/migrations"
+
+
+@pytest.fixture
+def statements():
+    sent = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    yield sent
+    event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_no_schema_init_sends_no_sql(tmp_path, statements):
+    """Test DATABASE_SCHEMA_INIT = "none" builds the app without touching the database"""
+    database = tmp_path / "startup.db"
+
+    app = create_app({"DATABASE_URI": f"sqlite:///{database}", "DATABASE_SCHEMA_INIT": "none"})
+
+    assert statements == []
+    with app.app_context():
+        assert inspect(models.db.engine).get_table_names() == []
+        models.db.session.remove()
+
+
+def test_upgrade_builds_the_schema(tmp_path):
+    """Test `flask db upgrade` creates what create_all would, search index included"""
+    app = create_app({"DATABASE_URI": f"sqlite:///{tmp_path / 'startup.db'}", "DATABASE_SCHEMA_INIT": "none"})
+
+    with app.app_context():
+        flask_migrate.upgrade(directory=MIGRATIONS_DIR)
+        tables = set(inspect(models.db.engine).get_table_names())
+        models.db.session.remove()
+
+    assert {"test_case", "asset", "execution", "test_case_fts", "execution_fts"} <= tables
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Needs fork.")
+def test_forked_process_drops_pooled_connections(tmp_path):
+    """Test a process forked from a built app opens its own connections"""
+    app = create_app({"DATABASE_URI": f"sqlite:///{tmp_path / 'startup.db'}"})
+    with app.app_context():
+        engines = list(models.db.engines.values())
+        models.db.session.remove()
+    assert any(engine.pool.checkedin() for engine in engines)
+
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if all(engine.pool.checkedin() == 0 for engine in engines) else 1)
+    _, status = os.waitpid(pid, 0)
+
+    assert status == 0
+    assert any(engine.pool.checkedin() for engine in engines)
@@ -0,0 +1,54 @@
+def test_asset_stats_match_the_history(client):
+    """Test asset statistics agree with the execution history"""
+    executions = [line for line in client.get("/executions/1?stream=1").get_data(as_text=True).splitlines() if line]
+    response = client.get("/stats/assets/1")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["asset"]["id"] == 1
+    assert body["stats"]["total"] == len(executions)
+    assert body["stats"]["passed"] + body["stats"]["failed"] == body["stats"]["total"]
+
+
+def test_asset_stats_follow_new_executions(client):
+    """Test the rollups are maintained by single and batch inserts"""
+    before = client.get("/stats/tests/2").get_json()["stats"]
+
+    execution = {"asset_id": 1, "test_case_id": 2, "status": False, "details": "Failure"}
+    client.post("/executions", json=execution)
+    client.post("/executions/batch", json=[execution, {**execution, "status": True}])
+    after = client.get("/stats/tests/2").get_json()["stats"]
+
+    assert after["failed"] == before["failed"] + 2
+    assert after["passed"] == before["passed"] + 1
+
+
+def test_stats_history_buckets(client):
+    """Test time-bucketed statistics"""
+    daily = client.get("/stats/assets/1/history").get_json()["history"]
+    monthly = client.get("/stats/assets/1/history?bucket=month").get_json()["history"]
+
+    assert daily
+    assert sum(row["total"] for row in daily) == sum(row["total"] for row in monthly)
+    assert all(len(row["bucket"]) == 7 for row in monthly)
+
+
+def test_stats_time_range(client):
+    """Test since/until restrict the statistics"""
+    body = client.get("/stats/assets/1?since=2000-01-01&until=2000-01-31").get_json()
+
+    assert body["stats"] == {"passed": 0, "failed": 0, "total": 0, "pass_rate": None}
+
+
+def test_400_stats_with_invalid_bucket(client):
+    """Test unknown buckets are rejected"""
+    response = client.get("/stats/tests/1/history?bucket=decade")
+
+    assert response.status_code == 400
+
+
+def test_404_stats_of_nonexistent_asset(client):
+    """Test statistics of a missing asset"""
+    response = client.get("/stats/assets/10000")
+
+    assert response.status_code == 404